@@ -0,0 +1,210 @@
+# ==================== TRAINING BENCHMARK SUITE ====================
+# Trains every experiment definition in the simulator over a fixed set of seeds and
+# measures both engine speed and learning quality:
+#
+#   steps/sec, episodes/sec, wall time   – how fast the host engine trains
+#   peak memory                          – tracemalloc peak of one traced run
+#   episodes to convergence              – when the reward curve settles (see below)
+#   final reward                         – mean reward of the last episodes
+#
+# Results are saved as JSON so two versions can be compared:
+#   python Benchmark.py --out bench_new.json
+#   python Benchmark.py --out bench_new.json --compare bench_old.json   (exit 1 on regression)
+#
+# Fault sweeps measure how much a simulated fault rate slows learning:
+#   python Benchmark.py --experiments 3 --fault dropout_rate --levels 0 0.05 0.1 0.2
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from Experiments import EXPERIMENTS, get_experiment
+from Simulator import FAULT_KEYS
+from Train import train
+
+DEFAULT_SEEDS = [0, 1, 2, 3, 4]
+CONVERGENCE_WINDOW = 3          # Same smoothing window as Graphs.py
+CONVERGENCE_TOL = 0.1           # Settled = every later window mean within 10% of the final one
+FINAL_EPISODES = 5              # Episodes averaged for the final reward
+
+# Regression thresholds used by --compare
+MAX_SPEED_DROP = 0.15           # steps/sec may drop at most 15%
+MAX_CONVERGENCE_RISE = 0.20     # episodes-to-convergence may rise at most 20%
+MAX_REWARD_DROP = 0.10          # final reward may drop at most 10% (of its magnitude)
+
+
+# === LEARNING-CURVE METRICS ===
+def convergence_episode(rewards, window=CONVERGENCE_WINDOW, tol=CONVERGENCE_TOL):
+    """First episode after which the rolling mean reward stays within tol of its final value."""
+    rewards = np.asarray(rewards, dtype=float)
+    if len(rewards) < window:
+        return len(rewards)
+    rolling = np.convolve(rewards, np.ones(window) / window, mode="valid")
+    final = rolling[-1]
+    band = tol * max(abs(final), 1.0)
+    outside = np.flatnonzero(np.abs(rolling - final) > band)
+    first = 0 if len(outside) == 0 else outside[-1] + 1
+    return int(first + window)          # rolling[i] covers episodes i+1 .. i+window
+
+
+def final_reward(rewards, last=FINAL_EPISODES):
+    return float(np.mean(rewards[-last:]))
+
+
+# === BENCHMARK ONE EXPERIMENT ===
+def bench_experiment(key, seeds, rule=None, episodes=None, profile=None):
+    exp = get_experiment(key)
+    walls, steps, eps, conv, finals = [], [], [], [], []
+    faults = {}
+    for seed in seeds:
+        start = time.perf_counter()
+        result = train(exp, seed, rule=rule, episodes=episodes, profile=profile)
+        walls.append(time.perf_counter() - start)
+        rewards = [row[1] for row in result["rows"]]
+        steps.append(result["steps"])
+        eps.append(len(rewards))
+        conv.append(convergence_episode(rewards))
+        finals.append(final_reward(rewards))
+        for name, count in result["faults"].items():
+            faults[name] = faults.get(name, 0) + count
+
+    import tracemalloc
+
+    tracemalloc.start()
+    train(exp, seeds[0], rule=rule, episodes=episodes, profile=profile)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    wall = sum(walls)
+    return {
+        "experiment": exp.name,
+        "rule": rule or exp.rule,
+        "runs": len(seeds),
+        "wall_s": round(wall, 4),
+        "steps_per_s": round(sum(steps) / wall, 1),
+        "episodes_per_s": round(sum(eps) / wall, 2),
+        "peak_mem_kb": round(peak / 1024, 1),
+        "episodes_to_convergence": round(float(np.mean(conv)), 2),
+        "episodes_to_convergence_runs": conv,
+        "final_reward": round(float(np.mean(finals)), 3),
+        "final_reward_std": round(float(np.std(finals)), 3),
+        "faults": faults,
+    }
+
+
+def git_version():
+    import subprocess
+
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def run_suite(keys, seeds, rule=None, episodes=None):
+    import platform
+
+    return {
+        "version": git_version(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seeds": list(seeds),
+        "results": {key: bench_experiment(key, seeds, rule, episodes) for key in keys},
+    }
+
+
+def fault_sweep(keys, seeds, fault, levels, rule=None, episodes=None):
+    """Benchmark every experiment at each level of one fault rate (other faults off)."""
+    import platform
+
+    if fault not in FAULT_KEYS:
+        raise ValueError("Unknown fault '{}' (choose from {})".format(fault, ", ".join(FAULT_KEYS)))
+    results = {}
+    for key in keys:
+        for level in levels:
+            res = bench_experiment(key, seeds, rule, episodes, {fault: level})
+            res["experiment"] = "{} @{}".format(res["experiment"], level)
+            results["{}@{}={}".format(key, fault, level)] = res
+    return {
+        "version": git_version(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seeds": list(seeds),
+        "fault": fault,
+        "results": results,
+    }
+
+
+# === REGRESSION CHECK ===
+def compare(new, old):
+    """List of human-readable regressions of new vs old benchmark results."""
+    problems = []
+    for key, res in new["results"].items():
+        base = old["results"].get(key)
+        if base is None:
+            continue
+        if res["steps_per_s"] < base["steps_per_s"] * (1 - MAX_SPEED_DROP):
+            problems.append("Exp {}: steps/sec {} → {}".format(key, base["steps_per_s"], res["steps_per_s"]))
+        if res["episodes_to_convergence"] > base["episodes_to_convergence"] * (1 + MAX_CONVERGENCE_RISE):
+            problems.append("Exp {}: episodes to convergence {} → {}".format(
+                key, base["episodes_to_convergence"], res["episodes_to_convergence"]))
+        if res["final_reward"] < base["final_reward"] - MAX_REWARD_DROP * max(abs(base["final_reward"]), 1.0):
+            problems.append("Exp {}: final reward {} → {}".format(key, base["final_reward"], res["final_reward"]))
+    return problems
+
+
+def print_table(report):
+    print("=" * 100)
+    print("BENCHMARK {} | seeds {}".format(report["version"], report["seeds"]))
+    print("=" * 100)
+    print("{:20} {:>9} {:>10} {:>9} {:>10} {:>12} {:>12}".format(
+        "Experiment", "wall s", "steps/s", "eps/s", "peak KB", "conv. ep", "final rew"))
+    print("-" * 100)
+    for res in report["results"].values():
+        print("{:20} {:9.3f} {:10.1f} {:9.2f} {:10.1f} {:12.2f} {:12.2f}".format(
+            res["experiment"], res["wall_s"], res["steps_per_s"], res["episodes_per_s"],
+            res["peak_mem_kb"], res["episodes_to_convergence"], res["final_reward"]))
+    print("-" * 100)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark training speed and sample efficiency.")
+    parser.add_argument("--experiments", nargs="+", default=list(EXPERIMENTS), help="default: all")
+    parser.add_argument("--seeds", nargs="+", type=int, default=DEFAULT_SEEDS)
+    parser.add_argument("--rule", default=None, help="override every experiment's update rule")
+    parser.add_argument("--episodes", type=int, default=None)
+    parser.add_argument("--out", default="benchmark.json")
+    parser.add_argument("--compare", default=None, help="earlier benchmark JSON to check for regressions")
+    parser.add_argument("--fault", default=None, help="sweep one fault rate: " + ", ".join(FAULT_KEYS))
+    parser.add_argument("--levels", nargs="+", type=float, default=[0.0, 0.05, 0.1, 0.2])
+    args = parser.parse_args(argv)
+
+    if args.fault:
+        report = fault_sweep(args.experiments, args.seeds, args.fault, args.levels, args.rule, args.episodes)
+    else:
+        report = run_suite(args.experiments, args.seeds, args.rule, args.episodes)
+    print_table(report)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Results saved as: {}".format(args.out))
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        problems = compare(report, old)
+        for p in problems:
+            print("REGRESSION " + p)
+        if not problems:
+            print("No regressions vs {}".format(old["version"]))
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# ==================== SIMULATOR CALIBRATION FROM REAL ROBOT TRACES ====================
+# Fits a Simulator.py profile from console captures of real training runs.
+#
+# 1. Set TRACE_STEPS = True in the hub script and run it.
+# 2. Save the console output to a text file (other lines are ignored).
+# 3. python Calibrate.py 3 run1.txt run2.txt --out profile_exp3.json
+# 4. python Train.py 3 --profile profile_exp3.json
+#
+# Trace line (printed by the hub scripts):
+#   TRACE,episode,step,state,action,next_state,A,B,C,distance,move_ms
+# step 0 (action -1) is the pose and distance reading right after the episode reset.
+#
+# Fitted per experiment:
+#   position_noise  – spread of the final motor angle around its target
+#   settle_ms       – per action: measured motor time minus ideal travel time (mean, std)
+#   displacement    – per (state, action): change in distance reading (mean, std)
+#   sensor_noise    – raw reading spread, from moves that do not push the bug forward. The
+#                     traced distance is the median of exp.distance_samples readings (hub
+#                     and simulator alike), so its spread is scaled back up by median_gain()
+#   stall_rate      – share of moves that ended far from their target
+#   dropout_rate    – share of raw distance readings lost (a filtered reading of n samples
+#                     is lost only when all n are, so the logged loss rate is p ** n)
+
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+from Experiments import A, B, C, LOST_MM, get_experiment
+from Simulator import DEFAULT_PROFILE
+
+MIN_SAMPLES = 3          # Fewer samples than this keep the default for that entry
+STALL_DEG = 45           # Position error beyond this is a stall, not noise
+STILL_MM = 2.0           # |mean displacement| below this counts as "no forward push"
+GAIN_DRAWS = 200000      # Simulated windows behind median_gain()
+
+
+def parse_traces(paths):
+    """Read TRACE lines from console captures; returns a list of episodes (lists of step dicts)."""
+    episodes = []
+    for path in paths:
+        current, key = None, None
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith("TRACE,"):
+                    continue
+                f_ = line.split(",")[1:]
+                ep, t, s, a, ns = (int(x) for x in f_[:5])
+                rec = {"ep": ep, "t": t, "s": s, "a": a, "ns": ns,
+                       "pos": {A: float(f_[5]), B: float(f_[6]), C: float(f_[7])},
+                       "dist": float(f_[8]), "ms": float(f_[9])}
+                if (path, ep) != key:
+                    current, key = [], (path, ep)
+                    episodes.append(current)
+                current.append(rec)
+    return episodes
+
+
+def median_gain(n, draws=GAIN_DRAWS):
+    """Spread of the median of n readings (upper median, as read_dist()) per unit raw noise."""
+    if n <= 1:
+        return 1.0
+    windows = np.sort(np.random.default_rng(0).standard_normal((draws, n)), axis=1)
+    return float(windows[:, n // 2].std())
+
+
+def fit_profile(exp, episodes):
+    """Fit a simulator profile for one experiment from parsed trace episodes."""
+    errors, stalls, moves = [], 0, 0
+    readings, lost = 0, 0
+    settle = defaultdict(list)
+    disp = defaultdict(list)
+    for steps in episodes:
+        prev_pos = {A: 0.0, B: 0.0, C: 0.0}
+        prev_dist = None
+        for rec in steps:
+            if rec["a"] >= 0:
+                port, target, speed = exp.moves[rec["a"]]
+                err = rec["pos"][port] - target
+                moves += 1
+                if abs(err) > STALL_DEG:
+                    stalls += 1
+                else:
+                    errors.append(err)
+                ideal = 1000.0 * abs(target - prev_pos[port]) / speed
+                settle[rec["a"]].append(rec["ms"] - ideal)
+                if exp.uses_distance and prev_dist is not None and LOST_MM not in (prev_dist, rec["dist"]):
+                    disp[(rec["s"], rec["a"])].append(prev_dist - rec["dist"])
+            if exp.uses_distance:
+                readings += 1
+                lost += rec["dist"] == LOST_MM
+            prev_pos = rec["pos"]
+            prev_dist = rec["dist"]
+
+    profile = dict(DEFAULT_PROFILE)
+    profile["experiment"] = exp.key
+    profile["samples"] = moves
+    if len(errors) >= MIN_SAMPLES:
+        profile["position_noise"] = round(float(np.std(errors)), 3)
+    profile["stall_rate"] = round(stalls / moves, 4) if moves else 0.0
+    profile["dropout_rate"] = round((lost / readings) ** (1.0 / exp.distance_samples), 4) if readings else 0.0
+    profile["settle_ms"] = {str(a): [round(float(np.mean(v)), 1), round(float(np.std(v)), 1)]
+                            for a, v in sorted(settle.items()) if len(v) >= MIN_SAMPLES}
+    profile["displacement"] = {"{},{}".format(s, a): [round(float(np.mean(v)), 2), round(float(np.std(v)), 2)]
+                               for (s, a), v in sorted(disp.items()) if len(v) >= MIN_SAMPLES}
+    still = [sd for mean, sd in profile["displacement"].values() if abs(mean) < STILL_MM]
+    if still:
+        # A reading difference carries the noise of two filtered readings
+        filtered = float(np.median(still)) / math.sqrt(2)
+        profile["sensor_noise"] = round(filtered / median_gain(exp.distance_samples), 3)
+    return profile
+
+
+def print_summary(exp, profile):
+    print("=" * 80)
+    print("CALIBRATED PROFILE – {} ({} moves)".format(exp.name, profile["samples"]))
+    print("=" * 80)
+    print("Position noise: {:.2f}° | Stall rate: {:.1%} | Sensor noise: {:.2f} mm | Dropouts: {:.1%}".format(
+        profile["position_noise"], profile["stall_rate"], profile["sensor_noise"], profile["dropout_rate"]))
+    print("-" * 80)
+    for a, (mean, sd) in profile["settle_ms"].items():
+        print("Settle {:8} {:7.1f} ± {:5.1f} ms".format(exp.actions[int(a)], mean, sd))
+    for key, (mean, sd) in profile["displacement"].items():
+        s, a = (int(x) for x in key.split(","))
+        print("Move   {:18} {:8} {:+6.1f} ± {:4.1f} mm".format(exp.states[s], exp.actions[a], mean, sd))
+    print("-" * 80)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit a simulator profile from real robot traces.")
+    parser.add_argument("experiment", help="1, 11, 2, 22, 3 or 33")
+    parser.add_argument("logs", nargs="+", help="console captures containing TRACE lines")
+    parser.add_argument("--out", default=None, help="profile JSON (default: profile_exp<N>.json)")
+    args = parser.parse_args(argv)
+
+    exp = get_experiment(args.experiment)
+    episodes = parse_traces(args.logs)
+    if not episodes:
+        print("No TRACE lines found – set TRACE_STEPS = True in {} and capture the console.".format(exp.script))
+        return 1
+    profile = fit_profile(exp, episodes)
+    print_summary(exp, profile)
+    out = args.out or "profile_exp{}.json".format(exp.key)
+    with open(out, "w") as f:
+        json.dump(profile, f, indent=2)
+    print("Profile saved as: {}".format(out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# ==================== CURRICULUM TRAINING (EXPERIMENT 1 → 2 → 3) ====================
+# The experiments grow in complexity (README): 4 states / 4 actions, then 8 / 6 with both
+# legs, then 8 / 6 with the distance sensor. Instead of starting every stage from zero, a
+# curriculum run trains the small task first, carries its values into the next table through
+# a declared state/action correspondence and keeps training there.
+#
+# Correspondences are matched by what the names describe (leg positions, body tilt, motor):
+#
+#   1 → 2   Exp 1 "Level" is Exp 2 "Rup" (tilt motor at 0); the right legs stay in the middle
+#   2 → 3   Exp 2 "Lup" (tilt raised) is Exp 3 "up", "Rup" (tilt at 0) is "down"; same leg moves
+#
+# Transferred values are rescaled so the largest one is TRANSFER_SCALE – the same size as the
+# hand seeds of Experiment 22/33 – so learned preferences act as a prior, not as final values.
+#
+# Every stage is compared with training its experiment from zero on the same seed and the
+# same simulated noise (same worker stream), by episodes to convergence (Benchmark.py).
+#
+# Usage:
+#   python Curriculum.py                                1 → 2 → 3 on seeds 0-4
+#   python Curriculum.py --stages 1 2 --seeds 0 1 2 3 4 5 6 7 8 9
+#   python Curriculum.py --stages 11 22 33 --episodes 20 30 40 --save-q q_curriculum.json
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from Benchmark import DEFAULT_SEEDS, convergence_episode, final_reward
+from Experiments import get_experiment
+from QLearning import action_mask, new_table
+from Train import save_q, train
+
+DEFAULT_STAGES = ["1", "2", "3"]
+TRANSFER_SCALE = 1.5            # Largest transferred |Q| (Experiment 22 seeds its gait at 1.5)
+
+# === STATE / ACTION CORRESPONDENCE ===
+# (from, to) experiment family -> (source state -> target states, source action -> target action).
+# Families: 11, 22 and 33 share the tables of 1, 2 and 3.
+CORRESPONDENCE = {
+    ("1", "2"): (
+        {0: [3],                # Lmid Level   → 3 Lmid Rmid Rup
+         1: [0, 6],             # Lmid Lup     → 0 / 6 Lmid Rmid Lup
+         2: [1],                # Lfwd Lup     → 1 Lfwd Rmid Lup
+         3: [2]},               # Lfwd Level   → 2 Lfwd Rmid Rup
+        {0: 4,                  # C.Lup        → C.Lup
+         1: 0,                  # A.Lfwd       → A.Lfwd
+         2: 1,                  # C.Level      → C.Rup
+         3: 2},                 # A.Lmid       → A.Lmid
+    ),
+    ("2", "3"): (
+        {0: [5],                # Lmid Rmid Lup → 5 up Lmid Rmid
+         1: [0],                # Lfwd Rmid Lup → 0 up Lfwd Rmid
+         2: [3],                # Lfwd Rmid Rup → 3 down Lfwd Rmid
+         3: [2],                # Lmid Rmid Rup → 2 down Lmid Rmid
+         4: [4],                # Lmid Rfwd Rup → 4 down Lmid Rfwd
+         5: [1],                # Lmid Rfwd Lup → 1 up Lmid Rfwd
+         6: [5],                # Lmid Rmid Lup (cycle done) → 5 up Lmid Rmid
+         7: [7]},               # STUCK         → 7 unknown
+        {0: 2,                  # A.Lfwd → Lfwd
+         1: 1,                  # C.Rup  → Rup
+         2: 3,                  # A.Lmid → Lmid
+         3: 4,                  # B.Rfwd → Rfwd
+         4: 0,                  # C.Lup  → Lup
+         5: 5},                 # B.Rmid → Rmid
+    ),
+}
+
+
+def transfer(Q, source, target, scale=TRANSFER_SCALE):
+    """Start table for target from a source Q-table (Double Q tables are averaged first)."""
+    pair = (source.key[0], target.key[0])
+    if pair not in CORRESPONDENCE:
+        raise ValueError("No state/action correspondence from {} to {} (choose from {})".format(
+            source.name, target.name, ", ".join("{} → {}".format(*p) for p in CORRESPONDENCE)))
+    state_map, action_map = CORRESPONDENCE[pair]
+    Q = Q.mean(axis=0) if Q.ndim == 3 else np.asarray(Q)
+    mask = action_mask(target.mask)
+    start = np.zeros((target.num_states, target.num_actions))
+    for s, targets in state_map.items():
+        for a, ta in action_map.items():
+            for ts in targets:
+                if mask[ts, ta] and action_mask(source.mask)[s, a]:
+                    start[ts, ta] = Q[s, a]
+    peak = np.abs(start).max()
+    return start * (scale / peak) if peak else start
+
+
+# === RUNS ===
+def stage_summary(exp, result):
+    rewards = [row[1] for row in result["rows"]]
+    return {"experiment": exp.key, "episodes": len(rewards), "convergence": convergence_episode(rewards),
+            "final_reward": final_reward(rewards)}
+
+
+def run_curriculum(keys, seed, episodes=None, rule=None, scale=TRANSFER_SCALE):
+    """Train the stages in order, each starting from the transferred table of the one before.
+
+    Stage i uses worker stream i, so stage i and a from-zero run of the same experiment with
+    worker=i see the same simulated noise. Returns (per-stage summaries, final result).
+    """
+    episodes = episodes or [None] * len(keys)
+    stages, prev, result = [], None, None
+    for i, (key, n) in enumerate(zip(keys, episodes)):
+        exp = get_experiment(key)
+        Q = None
+        if prev is not None:
+            Q = new_table(exp.num_states, exp.num_actions, rule or exp.rule, transfer(result["Q"], prev, exp, scale))
+        result = train(exp, seed, worker=i, rule=rule, episodes=n, Q=Q)
+        stages.append(stage_summary(exp, result))
+        prev = exp
+    return stages, result
+
+
+def run_scratch(keys, seed, episodes=None, rule=None):
+    """Every stage's experiment trained on its own (own seed table or zeros), same streams."""
+    episodes = episodes or [None] * len(keys)
+    return [stage_summary(get_experiment(key), train(get_experiment(key), seed, worker=i, rule=rule, episodes=n))
+            for i, (key, n) in enumerate(zip(keys, episodes))]
+
+
+def print_report(keys, runs):
+    print("=" * 80)
+    print("CURRICULUM {} | seeds {}".format(" → ".join(keys), [run["seed"] for run in runs]))
+    print("=" * 80)
+    print("{:6} {:>6} {:>10} {:>12} {:>12}   {}".format(
+        "Stage", "seeds", "episodes", "conv. ep", "from zero", "final rew (curriculum / from zero)"))
+    print("-" * 80)
+    for i, key in enumerate(keys):
+        cur = [run["curriculum"][i] for run in runs]
+        base = [run["scratch"][i] for run in runs]
+        print("{:6} {:6d} {:10.1f} {:12.2f} {:12.2f}   {:.2f} / {:.2f}".format(
+            key, len(runs), np.mean([c["episodes"] for c in cur]), np.mean([c["convergence"] for c in cur]),
+            np.mean([b["convergence"] for b in base]), np.mean([c["final_reward"] for c in cur]),
+            np.mean([b["final_reward"] for b in base])))
+    print("-" * 80)
+    earlier = np.mean([sum(s["episodes"] for s in run["curriculum"][:-1]) for run in runs])
+    target = np.mean([run["curriculum"][-1]["convergence"] for run in runs])
+    scratch = np.mean([run["scratch"][-1]["convergence"] for run in runs])
+    print("{}: converged after {:.1f} episodes with the curriculum ({:.1f} in earlier stages) vs {:.1f} from zero".format(
+        get_experiment(keys[-1]).name, target, earlier, scratch))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train experiments as a curriculum, transferring Q-values between stages.")
+    parser.add_argument("--stages", nargs="+", default=DEFAULT_STAGES, help="experiments in training order")
+    parser.add_argument("--episodes", nargs="+", type=int, default=None, help="episodes per stage (default: each experiment's)")
+    parser.add_argument("--seeds", nargs="+", type=int, default=DEFAULT_SEEDS)
+    parser.add_argument("--rule", default=None, help="update rule for every stage (default: each experiment's)")
+    parser.add_argument("--scale", type=float, default=TRANSFER_SCALE, help="largest transferred |Q|")
+    parser.add_argument("--save-q", default=None, help="write the last stage's Q-table (first seed) as JSON or .npy")
+    parser.add_argument("--out", default=None, help="save every stage summary as JSON")
+    args = parser.parse_args(argv)
+    if args.episodes and len(args.episodes) != len(args.stages):
+        parser.error("--episodes needs one value per stage")
+
+    runs = []
+    for seed in args.seeds:
+        stages, result = run_curriculum(args.stages, seed, args.episodes, args.rule, args.scale)
+        runs.append({"seed": seed, "curriculum": stages,
+                     "scratch": run_scratch(args.stages, seed, args.episodes, args.rule)})
+        if args.save_q and seed == args.seeds[0]:
+            save_q(result, args.save_q)
+            print("Q-table saved as: {}".format(args.save_q))
+    print_report(args.stages, runs)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"stages": args.stages, "scale": args.scale, "rule": args.rule, "runs": runs}, f, indent=2)
+        print("Results saved as: {}".format(args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# ==================== HUB EPISODE LOG DECODER ====================
+# The hub scripts do not keep their episode rows in RAM. Each row is packed into a small
+# fixed buffer that is appended to a binary file on the hub's flash (LOG_FILE, e.g.
+# exp3_episodes.bin) every LOG_CHUNK episodes:
+#
+#   header   "<4sBBI"   b"QLEP", format version, experiment (1, 11, 2, 22, 3, 33), seed
+#   record   "<HfHf"    episode, reward, cycles (steps for 3/33), epsilon – 12 bytes
+#
+# Copied off the hub, a log decodes to the Episode,Reward,Cycles,Epsilon CSV every other tool
+# reads (Graphs.py, Stats.py, Ingest.py). A log cut short by a crash or a pulled battery
+# decodes up to its last complete record.
+#
+# Usage:
+#   python EpisodeLog.py exp3_episodes.bin                   writes exp3_seed<seed>.csv
+#   python EpisodeLog.py exp3_episodes.bin --csv run.csv
+#   python EpisodeLog.py exp3_episodes.bin --summary         no CSV, just what the log holds
+
+import argparse
+import struct
+import sys
+
+import numpy as np
+
+from Experiments import get_experiment
+
+MAGIC = b"QLEP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBI")                # Magic, format version, experiment, seed
+RECORD = struct.Struct("<HfHf")                 # Episode, reward, cycles, epsilon
+EPSILON_DECIMALS = {"3": 5, "33": 5}            # As the hub prints them (3 decimals elsewhere)
+
+
+def decode(data):
+    """(header dict, rows [(episode, reward, cycles, epsilon)], bytes of a cut-off last record)."""
+    if len(data) < HEADER.size:
+        raise ValueError("log is shorter than its header ({} bytes)".format(len(data)))
+    magic, version, experiment, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a hub episode log (magic {!r})".format(magic))
+    if version != VERSION:
+        raise ValueError("episode log format {} is not supported (expected {})".format(version, VERSION))
+    key = str(experiment)
+    body = len(data) - HEADER.size
+    digits = EPSILON_DECIMALS.get(key, 3)
+    rows = [(ep, round(reward, 2), cycles, round(eps, digits))
+            for ep, reward, cycles, eps in RECORD.iter_unpack(data[HEADER.size:HEADER.size + body - body % RECORD.size])]
+    return {"experiment": key, "seed": seed, "version": version}, rows, body % RECORD.size
+
+
+def read_log(path):
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+def write_csv(rows, path):
+    """Same CSV layout the hub scripts print."""
+    with open(path, "w") as f:
+        f.write("Episode,Reward,Cycles,Epsilon\n")
+        for row in rows:
+            f.write("{},{},{},{}\n".format(*row))
+
+
+def print_summary(header, rows, partial, source):
+    exp = get_experiment(header["experiment"])
+    print("=" * 80)
+    print("EPISODE LOG – {} | {} | seed {}".format(source, exp.name, header["seed"]))
+    print("=" * 80)
+    if not rows:
+        print("No complete records.")
+    else:
+        rewards = np.array([row[1] for row in rows])
+        episodes = [row[0] for row in rows]
+        gaps = sum(1 for a, b in zip(episodes, episodes[1:]) if b != a + 1)
+        print("Episodes: {} ({}–{}) | gaps: {}".format(len(rows), episodes[0], episodes[-1], gaps))
+        print("Reward: mean {:.2f} | last {:.2f} | best {:.2f} | final ε {}".format(
+            rewards.mean(), rewards[-1], rewards.max(), rows[-1][3]))
+        print("{}: mean {:.1f}".format("Steps" if exp.uses_distance else "Cycles", np.mean([row[2] for row in rows])))
+    if partial:
+        print("Cut off: last record incomplete ({} of {} bytes) – the run stopped while writing".format(
+            partial, RECORD.size))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a hub episode log (LOG_FILE) into the hub CSV layout.")
+    parser.add_argument("log", help="binary log copied off the hub, e.g. exp3_episodes.bin")
+    parser.add_argument("--csv", default=None, help="output CSV (default: exp<experiment>_seed<seed>.csv)")
+    parser.add_argument("--summary", action="store_true", help="only summarize, write no CSV")
+    args = parser.parse_args(argv)
+
+    header, rows, partial = read_log(args.log)
+    print_summary(header, rows, partial, args.log)
+    if not args.summary:
+        path = args.csv or "exp{}_seed{}.csv".format(header["experiment"], header["seed"])
+        write_csv(rows, path)
+        print("CSV saved as: {}".format(path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
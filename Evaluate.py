@@ -0,0 +1,244 @@
+# ==================== FROZEN POLICY EVALUATION (SIMULATED ROBOT) ====================
+# Runs many rollouts of a saved Q-table in Simulator.py without learning, across worker
+# processes, and reports how well the policy walks:
+#
+#   cycles/min     – full gait cycles per minute of simulated robot time
+#   distance       – forward distance covered per rollout (mm)
+#   stuck rate     – share of steps that ended in STUCK or left the robot in the same state
+#   reward         – total reward per rollout (goal rate too for Experiment 3/33)
+#
+# Rollouts play what walk_forever() plays, without learning: the best allowed action, with
+# the hub's overrides (Experiment 11 always lifts first from Lmid Level, Experiment 2
+# restarts STUCK from state 0, Experiment 22 walks its hard-coded sequence and ignores the
+# Q-table). --greedy evaluates the plain best allowed action instead. --epsilon adds a
+# little random exploration on top (robustness check).
+#
+# Q-table sources: a Train.py --save-q JSON or .npy, a hub console capture (the last
+# printed Q-table is used) or "seed" for the experiment's starting Q-table. A .npy table is
+# memory-mapped read-only in every worker, so the workers share one copy of it.
+#
+# Usage:
+#   python Evaluate.py 2 q_candidate.json
+#   python Evaluate.py 2 q_candidate.json --baseline hub_run.txt --rollouts 400 --workers 8
+#
+# Every rollout gets its own (env, agent) streams, derived from the seed and its rollout
+# index, so rollout k sees the same simulated noise whatever the policy did in earlier
+# rollouts and however the rollouts are split over workers. --baseline therefore runs both
+# policies on identical noise and the difference is measured rollout by rollout.
+
+import argparse
+import json
+import re
+import sys
+
+import numpy as np
+
+from Experiments import get_experiment
+from QLearning import action_mask, open_table
+from Simulator import BugSim, load_profile
+from Train import make_streams
+
+DEFAULT_ROLLOUTS = 200
+DEFAULT_STEPS = 100             # Steps per rollout (Experiment 3/33 also stops at the goal)
+NUMBER = re.compile(r"-?\d+\.\d{2,3}")   # Q-values as printed by the hub scripts
+
+
+# === LOADING A Q-TABLE ===
+def load_q(path, exp):
+    """Q-table (states × actions array) from a JSON or .npy file, a hub console capture or "seed"."""
+    if path == "seed":
+        if exp.seed_q is None:
+            return np.zeros((exp.num_states, exp.num_actions))
+        return np.array(exp.seed_q, dtype=float)
+    if path.endswith(".json") or path.endswith(".npy"):
+        if path.endswith(".npy"):
+            Q, source = open_table(path, "r"), "?"
+        else:
+            with open(path) as f:
+                data = json.load(f)
+            Q, source = np.array(data["Q"], dtype=float), data.get("experiment")
+        Q = Q.sum(axis=0) if Q.ndim == 3 else Q        # Double Q-learning: act on the sum
+        if Q.shape != (exp.num_states, exp.num_actions):
+            raise ValueError("{} holds a {}×{} Q-table (experiment {}), {} needs {}×{}".format(
+                path, Q.shape[0], Q.shape[1], source, exp.name, exp.num_states, exp.num_actions))
+        return Q
+    return parse_console_q(path, exp)
+
+
+def parse_console_q(path, exp):
+    """Last complete Q-table printed by print_q_table() in a hub console capture."""
+    tables, rows = [], []
+    with open(path) as f:
+        for line in f:
+            values = []
+            if "|" in line:
+                values = [float(v) for v in NUMBER.findall(line.split("|", 1)[1].split("→")[0])]
+            if len(values) == exp.num_actions:
+                rows.append(values)
+                continue
+            if len(rows) == exp.num_states:
+                tables.append(rows)
+            rows = []
+    if len(rows) == exp.num_states:
+        tables.append(rows)
+    if not tables:
+        raise ValueError("No {}×{} Q-table found in {}".format(exp.num_states, exp.num_actions, path))
+    return np.array(tables[-1])
+
+
+# === ROLLOUTS ===
+def policy_action(exp, Q, mask, s, epsilon, rng, greedy_only=False):
+    """walk_forever()'s action (best allowed unless the hub overrides it), random allowed action
+    with probability epsilon."""
+    if epsilon and rng.random() < epsilon:
+        return int(rng.choice(np.flatnonzero(mask[s])))
+
+    def greedy(state):
+        allowed = np.flatnonzero(mask[state])
+        values = Q[state][allowed]
+        ties = allowed[values == values.max()]
+        return int(rng.choice(ties)) if exp.random_ties else int(ties[0])
+
+    if exp.walk_action and not greedy_only:
+        return exp.walk_action(s, greedy)
+    return greedy(s)
+
+
+def rollout(exp, Q, mask, sim, rng, steps, epsilon, greedy_only=False):
+    """One rollout from the start pose; returns its metrics."""
+    s, d = sim.reset()
+    start_ms = sim.clock_ms
+    total, cycles, stuck, goal = 0.0, 0, 0, False
+    for t in range(1, steps + 1):
+        a = policy_action(exp, Q, mask, s, epsilon, rng, greedy_only)
+        ns, new_d, _ = sim.step(a)
+        r, cycle, goal = exp.reward(s, a, ns, d, new_d)
+        total += r
+        cycles += cycle
+        stuck += ns == exp.stuck_state or ns == s     # As walk_cycles() counts misses
+        if goal:
+            break
+        s, d = ns, new_d
+    minutes = (sim.clock_ms - start_ms) / 60000.0
+    return {"reward": total, "cycles_per_min": cycles / minutes if minutes else 0.0,
+            "distance": sim.travelled, "stuck_rate": stuck / t, "steps": t, "goal": float(goal)}
+
+
+def evaluate(key, Q, seed, first, rollouts, steps=DEFAULT_STEPS, epsilon=0.0, profile=None, greedy_only=False):
+    """Run rollouts first .. first + rollouts − 1, each on its own seeded streams; returns a
+    list of metric dicts.
+
+    Q may be a table path, loaded in the worker (a .npy is then mapped, not copied).
+    """
+    exp = get_experiment(key)
+    if isinstance(Q, str):
+        Q = load_q(Q, exp)
+    mask = action_mask(exp.mask)
+    results = []
+    for k in range(first, first + rollouts):
+        env_rng, agent_rng = make_streams(seed, k)      # Rollout k: same noise for every policy
+        results.append(rollout(exp, Q, mask, BugSim(exp, env_rng, profile), agent_rng, steps, epsilon,
+                               greedy_only))
+    return results
+
+
+def _evaluate_worker(args):
+    return evaluate(*args)
+
+
+def evaluate_parallel(key, Q, seed, rollouts, workers=1, steps=DEFAULT_STEPS, epsilon=0.0, profile=None,
+                      greedy_only=False):
+    """Split the rollouts over worker processes (results stay in rollout order)."""
+    share = [rollouts // workers + (w < rollouts % workers) for w in range(workers)]
+    first = np.cumsum([0] + share[:-1])
+    jobs = [(key, Q, seed, int(k), n, steps, epsilon, profile, greedy_only) for k, n in zip(first, share) if n]
+    if len(jobs) == 1:
+        return _evaluate_worker(jobs[0])
+    from multiprocessing import Pool     # Only parallel runs pay for the import
+
+    with Pool(min(len(jobs), 8)) as pool:
+        return [res for part in pool.map(_evaluate_worker, jobs) for res in part]
+
+
+def summarize(results):
+    """Mean, std and standard error of every metric."""
+    summary = {}
+    for name in results[0]:
+        values = np.array([res[name] for res in results])
+        summary[name] = {"mean": float(values.mean()), "std": float(values.std()),
+                         "sem": float(values.std(ddof=1) / np.sqrt(len(values))) if len(values) > 1 else 0.0}
+    return summary
+
+
+def paired_difference(results, baseline):
+    """Mean and standard error of candidate − baseline, rollout by rollout (same noise streams)."""
+    diff = {}
+    for name in results[0]:
+        d = np.array([a[name] - b[name] for a, b in zip(results, baseline)])
+        diff[name] = {"mean": float(d.mean()),
+                      "sem": float(d.std(ddof=1) / np.sqrt(len(d))) if len(d) > 1 else 0.0}
+    return diff
+
+
+METRICS = [("cycles_per_min", "Cycles/min"), ("distance", "Distance mm"), ("stuck_rate", "Stuck rate"),
+           ("reward", "Reward"), ("goal", "Goal rate"), ("steps", "Steps")]
+
+
+def print_report(exp, name, summary, rollouts, diff=None):
+    print("=" * 80)
+    print("POLICY EVALUATION – {} | {} | {} rollouts".format(exp.name, name, rollouts))
+    print("=" * 80)
+    print("{:14} {:>12} {:>10} {:>10}{}".format("Metric", "mean", "std", "± sem", "   vs baseline" if diff else ""))
+    print("-" * 80)
+    for key, label in METRICS:
+        if key == "goal" and not exp.uses_distance:
+            continue
+        m = summary[key]
+        line = "{:14} {:12.3f} {:10.3f} {:10.3f}".format(label, m["mean"], m["std"], m["sem"])
+        if diff:
+            line += "   {:+9.3f} ± {:.3f}".format(diff[key]["mean"], diff[key]["sem"])
+        print(line)
+    print("-" * 80)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a frozen Q-table policy in the simulator.")
+    parser.add_argument("experiment", help="1, 11, 2, 22, 3 or 33")
+    parser.add_argument("qtable", help="Train.py --save-q JSON, hub console capture, or 'seed'")
+    parser.add_argument("--baseline", default=None, help="second Q-table to compare against on the same seeds")
+    parser.add_argument("--rollouts", type=int, default=DEFAULT_ROLLOUTS)
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS)
+    parser.add_argument("--epsilon", type=float, default=0.0, help="random-action rate (0 = greedy)")
+    parser.add_argument("--greedy", action="store_true", help="best allowed action everywhere, without walk_forever()'s overrides")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", default=None, help="simulator profile JSON (from Calibrate.py)")
+    parser.add_argument("--out", default=None, help="save the summary as JSON")
+    args = parser.parse_args(argv)
+
+    exp = get_experiment(args.experiment)
+    profile = load_profile(args.profile) if args.profile else None
+    Q = args.qtable if args.qtable.endswith(".npy") else load_q(args.qtable, exp)
+    results = evaluate_parallel(exp.key, Q, args.seed, args.rollouts, args.workers,
+                                args.steps, args.epsilon, profile, args.greedy)
+    summary = summarize(results)
+    diff = None
+    if args.baseline:
+        baseline = args.baseline if args.baseline.endswith(".npy") else load_q(args.baseline, exp)
+        base = evaluate_parallel(exp.key, baseline, args.seed, args.rollouts,
+                                 args.workers, args.steps, args.epsilon, profile, args.greedy)
+        print_report(exp, args.baseline, summarize(base), len(base))
+        diff = paired_difference(results, base)
+    print_report(exp, args.qtable, summary, len(results), diff)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"experiment": exp.key, "qtable": args.qtable, "baseline": args.baseline,
+                       "seed": args.seed, "rollouts": len(results), "epsilon": args.epsilon, "greedy": args.greedy,
+                       "summary": summary, "vs_baseline": diff}, f, indent=2)
+        print("Results saved as: {}".format(args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
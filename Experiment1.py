@@ -4,13 +4,17 @@
 
 from hub import port, light_matrix
 import motor
+import distance_sensor
 import runloop
 import random
+import time
+import struct
 
 # === MOTOR CONFIGURATION ===
 LEGSPEED = 1000           # Motor speed in degrees per second
 L_MID, L_FWD = 0, 45      # Left leg positions: middle and forward
 C_LEVEL, C_UP = 0, 150    # Tilt motor positions: level (down) and lifted (up)
+RESET_TOL = 5             # Smart reset: a motor this close (degrees) to its start position is not moved
 
 LEFT_LEGS = port.A         # Port controlling walking legs
 TILT = port.C              # Port controlling body tilt
@@ -21,15 +25,88 @@ MAX_STEPS = 30             # Max actions per episode
 ALPHA = 0.35               # Learning rate
 GAMMA = 0.92               # Discount factor for future rewards
 EPSILON = 0.3              # Exploration rate for ε-greedy policy
+SEED = None                # Random seed (None = taken from the clock; always printed)
+TRACE_STEPS = False        # Print a TRACE line per step (positions, timing) for Calibrate.py
+TIME_PENALTY = 0.0         # Reward lost per second of step time (0 = rewards count steps only)
+SMDP_DISCOUNT = False      # Discount by robot time: γ per STEP_MS instead of γ per step
+STEP_MS = 700              # Nominal step time (move + settle) for SMDP_DISCOUNT
+Q_LOG = "delta"            # Q-table output per episode: "delta" (changed cells + greedy flips, QDelta.py) or "full"
+LOG_FILE = "exp1_episodes.bin" # Episode records on hub flash (EpisodeLog.py decodes them)
+LOG_CHUNK = 16             # Records buffered in RAM before they are appended to LOG_FILE
+
+# === ONLINE LEARNING-CURVE STATISTICS ===
+STATS_WINDOW = 3           # Online stats: rolling window (episodes), same as Graphs.py
+STATS_ALPHA = 0.3          # Online stats: EWMA weight of the newest episode
+CONVERGE_TOL = 0.1         # Converged: rolling mean moves < 10% for STATS_WINDOW episodes
+DIVERGE_DROP = 0.5         # Diverging: EWMA 50% (of its best) below its best...
+DIVERGE_EPISODES = 5       # ...for this many episodes in a row
+ABORT_ON_DIVERGE = False   # Stop training when the run diverges (then walk with what was learned)
+
+# === GAIT TUNING (walk_forever) ===
+TUNE_GAIT = False          # Tune sleeps and leg speed while walking (False = fixed 660/500 ms, measured only)
+TUNE_CYCLES = 3            # Gait cycles per measurement
+TUNE_ROUNDS = 4            # Passes over all settings (stops early when nothing improves)
+TUNE_MIN_GAIN = 1.03       # A change must be at least 3% faster to be kept
+REPORT_CYCLES = 10         # Throughput report interval while walking forever
+DIST_PORT = None           # Distance sensor port facing a target (e.g. port.F) for mm per cycle; None = no sensor
 
 # === STATES AND ACTIONS ===
 states = ["Lmid Level", "Lmid Lup", "Lfwd Lup", "Lfwd Level"]  # Discrete robot states
 actions = ["C.Lup", "A.Lfwd", "C.Level", "A.Lmid"]            # Possible motor actions
 state_idx = {states[i]: i for i in range(4)}                 # Map state name to Q-table row
 
+# === ACTION MASK ===
+# 1 = action can change this state, 0 = known no-op or unsafe (never sent to the motors)
+ACTION_MASK = [
+    [1, 0, 0, 0],   # Lmid Level → only C.Lup (A.Lfwd with body down is unsafe)
+    [0, 1, 1, 0],   # Lmid Lup   → A.Lfwd or C.Level
+    [0, 0, 1, 1],   # Lfwd Lup   → C.Level or A.Lmid
+    [1, 0, 0, 1],   # Lfwd Level → C.Lup or A.Lmid
+]
+masked_moves = 0                                             # Total actions skipped by the mask
+
 # === Q-TABLE INITIALIZATION ===
 Q = [[0.0 for _ in range(4)] for _ in range(4)]              # Start with all zeros (learning from scratch)
-episode_data = []                                            # Stores reward, cycles, epsilon for each episode
+
+# === EPISODE LOG (EpisodeLog.py) ===
+# Episode rows are packed into a fixed buffer of LOG_CHUNK binary records that is appended
+# to LOG_FILE on the hub's flash whenever it fills. RAM use does not grow with the number of
+# episodes, and a crash loses at most the last chunk. The CSV table at the end is streamed
+# back from the file one record at a time.
+LOG_HEADER = "<4sBBI"                               # Magic, format version, experiment, seed
+LOG_RECORD = "<HfHf"                                # Episode, reward, cycles, epsilon
+LOG_SIZE = struct.calcsize(LOG_RECORD)
+log_buf = bytearray(LOG_CHUNK * LOG_SIZE)           # Records not yet on flash
+log_count = 0
+
+def log_start(seed):
+    """Start a new LOG_FILE for this run."""
+    with open(LOG_FILE, "wb") as f:
+        f.write(struct.pack(LOG_HEADER, b"QLEP", 1, 1, seed & 0xFFFFFFFF))
+
+def log_flush():
+    global log_count
+    if log_count:
+        with open(LOG_FILE, "ab") as f:
+            f.write(memoryview(log_buf)[:log_count * LOG_SIZE])
+        log_count = 0
+
+def log_episode(ep, reward, cycles, eps):
+    global log_count
+    struct.pack_into(LOG_RECORD, log_buf, log_count * LOG_SIZE, ep, reward, cycles, eps)
+    log_count += 1
+    if log_count == LOG_CHUNK:
+        log_flush()
+
+def print_log():
+    """CSV rows of the whole run, read back from flash."""
+    log_flush()
+    rec = bytearray(LOG_SIZE)
+    with open(LOG_FILE, "rb") as f:
+        f.seek(struct.calcsize(LOG_HEADER))
+        while f.readinto(rec) == LOG_SIZE:
+            ep, reward, cycles, eps = struct.unpack(LOG_RECORD, rec)
+            print("{},{},{},{}".format(ep, round(reward, 2), cycles, round(eps, 3)))
 
 # === MOTOR ACTION FUNCTIONS ===
 async def do_C_Lup(): await motor.run_to_absolute_position(TILT, C_UP, LEGSPEED)      # Lift body
@@ -39,6 +116,45 @@ async def do_A_Lmid(): await motor.run_to_absolute_position(LEFT_LEGS, L_MID, LE
 
 action_funcs = [do_C_Lup, do_A_Lfwd, do_C_Level, do_A_Lmid]   # List for easy indexing by Q-table
 
+# === SMART RESET ===
+# Only motors more than RESET_TOL degrees from their start position are moved, and all of
+# them at once: a motor command starts when it is called, so every move is started before
+# the first one is awaited. An episode that begins in the start pose costs no reset time.
+START_POSE = [(LEFT_LEGS, L_MID, LEGSPEED), (TILT, C_LEVEL, LEGSPEED)]   # (port, position, speed)
+reset_moved = [0, 0]                                         # Motors moved, motors already in place (all resets)
+
+async def reset_motors(pose):
+    """Move the motors of pose that are out of tolerance, concurrently. Returns how many moved."""
+    moves = [motor.run_to_absolute_position(p, target, speed)
+             for p, target, speed in pose if abs(motor.absolute_position(p) - target) > RESET_TOL]
+    for m in moves:
+        await m
+    reset_moved[0] += len(moves)
+    reset_moved[1] += len(pose) - len(moves)
+    return len(moves)
+
+# === MASKED ACTION HELPERS ===
+def allowed(s):
+    return [a for a in range(4) if ACTION_MASK[s][a]]
+
+def best_allowed(s):
+    return max(allowed(s), key=lambda a: Q[s][a])            # Greedy action among allowed ones
+
+def masked_max(s):
+    return max(Q[s][a] for a in allowed(s))                  # Bootstrap value over allowed actions
+
+def step_discount(step_ms):
+    return GAMMA ** (step_ms / STEP_MS) if SMDP_DISCOUNT else GAMMA   # Semi-Markov: γ per STEP_MS of robot time
+
+# === RANDOM SEED ===
+run_seed = None                                              # Seed actually used (printed with the results)
+
+def seed_random():
+    global run_seed
+    run_seed = SEED if SEED is not None else time.ticks_ms()
+    random.seed(run_seed)
+    print("Seed: {}".format(run_seed))
+
 # === STATE DETECTION FUNCTION ===
 def get_state():
     lp = motor.absolute_position(LEFT_LEGS)  # Left leg position
@@ -49,6 +165,12 @@ def get_state():
     if lp > 25 and tp < 70: return "Lfwd Level"
     return "Lmid Level"
 
+# === STEP TRACE (for Calibrate.py) ===
+# TRACE,episode,step,state,action,next_state,A,B,C,distance,move_ms
+def trace_step(ep, t, s, a, ns, move_ms):
+    print("TRACE,{},{},{},{},{},{},0,{},0,{}".format(
+        ep, t, s, a, ns, motor.absolute_position(LEFT_LEGS), motor.absolute_position(TILT), move_ms))
+
 # === Q-TABLE VISUALIZATION ===
 def print_q_table(ep):
     print("\n" + "="*85)
@@ -58,52 +180,122 @@ def print_q_table(ep):
     print("-"*85)
     for i in range(4):
         row = "".join("{:7.3f}".format(Q[i][j]) for j in range(4))
-        best = actions[Q[i].index(max(Q[i]))]
+        best = actions[best_allowed(i)]
         print("{:14} | {}→{}".format(states[i], row, best))
     print("-"*85)
 
+# === Q-TABLE DELTA LOG (QDelta.py) ===
+# QDELTA,episode,state,action,value for every cell whose value (4 decimals) changed and
+# FLIP,episode,state,old_action,new_action when a greedy action changes. Episode 0 logs
+# every cell, so QDelta.py can rebuild the table at any episode from these lines alone.
+q_logged = [[None] * 4 for _ in range(4)]  # Last logged value of every cell
+
+def logged_best(s):
+    return max(allowed(s), key=lambda a: q_logged[s][a])
+
+def log_q_deltas(ep):
+    changed = flips = 0
+    for s in range(4):
+        old_best = logged_best(s) if ep else None
+        for a in range(4):
+            v = round(Q[s][a], 4)
+            if v != q_logged[s][a]:
+                q_logged[s][a] = v
+                changed += 1
+                print("QDELTA,{},{},{},{}".format(ep, s, a, v))
+        new_best = logged_best(s)
+        if ep and new_best != old_best:
+            flips += 1
+            print("FLIP,{},{},{},{}".format(ep, s, old_best, new_best))
+    print("Q-table episode {}: {} cells changed, {} greedy flips".format(ep, changed, flips))
+
+# === ONLINE LEARNING-CURVE STATISTICS ===
+# O(1) per episode: running mean/variance (Welford), EWMA, rolling mean over a ring buffer
+# and converged/diverging flags – the same definitions as Stats.py on the computer.
+stats = {"n": 0, "mean": 0.0, "m2": 0.0, "ewma": 0.0, "best": None,
+         "ring": [0.0] * STATS_WINDOW, "sum": 0.0, "rolling": 0.0, "stable": 0, "falling": 0}
+
+def update_stats(r):
+    st = stats
+    st["n"] += 1
+    n = st["n"]
+    d = r - st["mean"]
+    st["mean"] += d / n
+    st["m2"] += d * (r - st["mean"])
+    st["ewma"] = r if n == 1 else st["ewma"] + STATS_ALPHA * (r - st["ewma"])
+    i = (n - 1) % STATS_WINDOW
+    st["sum"] += r - st["ring"][i]                      # Ring buffer: swap the oldest reward out
+    st["ring"][i] = r
+    prev = st["rolling"]
+    st["rolling"] = st["sum"] / min(n, STATS_WINDOW)
+    settled = n > STATS_WINDOW and abs(st["rolling"] - prev) <= CONVERGE_TOL * max(abs(st["rolling"]), 1.0)
+    st["stable"] = st["stable"] + 1 if settled else 0
+    if st["best"] is None or st["ewma"] > st["best"]:
+        st["best"] = st["ewma"]
+    below = st["ewma"] < st["best"] - DIVERGE_DROP * max(abs(st["best"]), 1.0)
+    st["falling"] = st["falling"] + 1 if below else 0
+    if st["falling"] >= DIVERGE_EPISODES:
+        return "diverging"
+    return "converged" if st["stable"] >= STATS_WINDOW else "learning"
+
+# STATS,episode,mean,std,ewma,rolling,status
+def print_stats(ep, status):
+    st = stats
+    std = (st["m2"] / (st["n"] - 1)) ** 0.5 if st["n"] > 1 else 0.0
+    print("STATS,{},{:.2f},{:.2f},{:.2f},{:.2f},{}".format(ep, st["mean"], std, st["ewma"], st["rolling"], status))
+
 # === TRAINING LOOP ===
 async def train():
-    global EPSILON
+    global EPSILON, masked_moves
+    seed_random()
+    log_start(run_seed)
 
     # Reset robot to start position
-    await motor.run_to_absolute_position(LEFT_LEGS, 0, LEGSPEED)
-    await motor.run_to_absolute_position(TILT, 0, LEGSPEED)
+    await reset_motors(START_POSE)
     await light_matrix.write("QL")
     print_q_table(0)
+    if Q_LOG != "full":
+        log_q_deltas(0)
 
     for episode in range(1, NUM_EPISODES + 1):
-        # Reset positions at start of each episode
-        await motor.run_to_absolute_position(LEFT_LEGS, 0, LEGSPEED)
-        await motor.run_to_absolute_position(TILT, 0, LEGSPEED)
-        await runloop.sleep_ms(800)
+        # Reset positions at start of each episode (only the motors that are off, all at once)
+        if await reset_motors(START_POSE):
+            await runloop.sleep_ms(800)
 
         state_name = "Lmid Level"
         total_reward = 0.0
         cycles = 0
+        masked = 0
         last_action = -1
 
-        for _ in range(MAX_STEPS):
+        for step in range(1, MAX_STEPS + 1):
             s = state_idx[state_name]
 
             # ε-greedy action selection
-            if random.random() < EPSILON:
+            explore = random.random() < EPSILON
+            if explore:
                 a = random.randint(0, 3)         # Explore random action
             else:
                 a = Q[s].index(max(Q[s]))        # Exploit best known action
 
-            # Safety: only allow moving legs forward if body is lifted
-            if state_name in ["Lmid Level", "Lfwd Level"] and a == 1:  # A.Lfwd
-                a = 0  # lift body first
+            # Action mask: redirect no-op/unsafe moves before they reach the motors
+            if not ACTION_MASK[s][a]:
+                masked += 1
+                a = random.choice(allowed(s)) if explore else best_allowed(s)
 
             # Prevent repeated oscillation
-            if a == last_action and random.random() < 0.3:
+            if a == last_action and random.random() < 0.3 and ACTION_MASK[s][(a + 2) % 4]:
                 a = (a + 2) % 4
 
+            t0 = time.ticks_ms()
             await action_funcs[a]()
+            move_ms = time.ticks_diff(time.ticks_ms(), t0)
             await runloop.sleep_ms(680 if a in [0, 2] else 520)
+            step_ms = time.ticks_diff(time.ticks_ms(), t0)   # Whole step: move + settle
 
             next_state = get_state()
+            if TRACE_STEPS:
+                trace_step(episode, step, s, a, state_idx[next_state], move_ms)
 
             # Reward system
             reward = -0.2  # Small penalty for useless moves
@@ -117,46 +309,151 @@ async def train():
                 reward = 6.0
                 cycles += 1  # Completed one full gait cycle
 
+            if TIME_PENALTY:
+                reward -= TIME_PENALTY * step_ms / 1000   # Slow steps cost reward
+
             total_reward += reward
 
             # Q-Learning update
             next_s = state_idx[next_state]
-            Q[s][a] += ALPHA * (reward + GAMMA * max(Q[next_s]) - Q[s][a])
+            Q[s][a] += ALPHA * (reward + step_discount(step_ms) * masked_max(next_s) - Q[s][a])
 
             last_action = a
             state_name = next_state
 
         # Record episode data
-        episode_data.append((episode, round(total_reward,2), cycles, round(EPSILON,3)))
+        log_episode(episode, total_reward, cycles, EPSILON)
+        masked_moves += masked
         EPSILON = max(0.1, EPSILON * 0.97)  # Gradual exploration decay
         await light_matrix.write(str(episode % 10))
 
-        print_q_table(episode)
-        print("Episode {} | Reward: {:+.2f} | Cycles: {} | ε: {:.3f}".format(
-            episode, total_reward, cycles, EPSILON))
-
+        if Q_LOG == "full":
+            print_q_table(episode)
+        else:
+            log_q_deltas(episode)
+        print("Episode {} | Reward: {:+.2f} | Cycles: {} | ε: {:.3f} | Masked: {}".format(
+            episode, total_reward, cycles, EPSILON, masked))
+        status = update_stats(total_reward)
+        print_stats(episode, status)
+        if ABORT_ON_DIVERGE and status == "diverging":
+            print("Run is diverging – training stopped after episode {}".format(episode))
+            break
+
+    if Q_LOG != "full":
+        print_q_table(episode)                 # Final table in full (Evaluate.py reads it)
     await light_matrix.write("OK")
 
+def gait_action(s):
+    return best_allowed(s)                                   # Learned policy
+
+# === GAIT THROUGHPUT AND TUNING ===
+# Walking is measured in blocks of gait cycles: cycles per second, and mm per cycle when a
+# distance sensor faces a target. tune_gait() is a coordinate hill climb on the sleeps and
+# the leg speed: a change is kept only if the robot walks faster without a missed step.
+gait = {"tilt_ms": 660, "leg_ms": 500, "speed": LEGSPEED}       # Current walking settings
+GAIT_STEP = {"tilt_ms": -60, "leg_ms": -60, "speed": 100}       # Change tried first (the faster direction)
+GAIT_LIMITS = {"tilt_ms": (100, 1000), "leg_ms": (100, 1000), "speed": (300, 1100)}
+
+def gait_distance():
+    """Distance to the target in mm, or None without a sensor / valid reading."""
+    if DIST_PORT is None:
+        return None
+    d = distance_sensor.distance(DIST_PORT)
+    return None if d is None or d <= 0 or d > 1000 else d
+
+async def walk_cycles(n):
+    """Walk n gait cycles with the current settings. Returns (cycles/s, mm per cycle or None, missed steps)."""
+    global LEGSPEED
+    LEGSPEED = gait["speed"]
+    d0 = gait_distance()
+    t0 = time.ticks_ms()
+    done, missed, steps = 0, 0, 0
+    while done < n and steps < 8 * n:       # 4 moves per cycle – give up after twice that
+        s = state_idx[get_state()]
+        a = gait_action(s)
+        await action_funcs[a]()
+        await runloop.sleep_ms(gait["tilt_ms"] if a in [0, 2] else gait["leg_ms"])
+        ns = state_idx[get_state()]
+        steps += 1
+        if ns == s:
+            missed += 1                     # The move did not change the state
+        if s == 3 and ns == 0:
+            done += 1                       # A.Lmid from Lfwd Level closes the cycle
+    secs = max(time.ticks_diff(time.ticks_ms(), t0), 1) / 1000
+    d1 = gait_distance()
+    mm = (d0 - d1) / done if done and d0 is not None and d1 is not None else None
+    return done / secs, mm, missed
+
+def gait_score(rate, mm, missed):
+    """Forward speed: mm/s with a distance sensor, cycles/s without; 0 if a step was missed."""
+    if missed:
+        return 0.0
+    return rate * mm if mm is not None else rate
+
+def print_gait(rate, mm, missed):
+    print("Gait: {:.3f} cycles/s | {} mm/cycle | missed steps: {} | {}".format(
+        rate, "-" if mm is None else "{:.1f}".format(mm), missed, gait))
+
+async def tune_gait():
+    start = dict(gait)
+    rate, mm, missed = await walk_cycles(TUNE_CYCLES)
+    while missed and back_off_gait():       # Start from settings that do not miss steps
+        rate, mm, missed = await walk_cycles(TUNE_CYCLES)
+    if missed:
+        gait.update(start)                  # Misses even at the slow limits: not a timing problem
+        print("\nTUNING GAIT – steps missed at every setting, keeping {}".format(gait))
+        return
+    best = gait_score(rate, mm, missed)
+    print("\nTUNING GAIT – start score {:.3f}".format(best))
+    for _ in range(TUNE_ROUNDS):
+        improved = False
+        for name in GAIT_STEP:
+            for sign in (1, -1):
+                old = gait[name]
+                low, high = GAIT_LIMITS[name]
+                gait[name] = min(high, max(low, old + sign * GAIT_STEP[name]))
+                if gait[name] == old:
+                    continue
+                score = gait_score(*(await walk_cycles(TUNE_CYCLES)))
+                print("  {} {} → {}: {:.3f}".format(name, old, gait[name], score))
+                if score > best * TUNE_MIN_GAIN:
+                    best, improved = score, True
+                    break
+                gait[name] = old
+        if not improved:
+            break
+    print("Tuned gait: {} | score {:.3f}".format(gait, best))
+
+def back_off_gait():
+    """One step towards the safe side (longer sleeps, lower speed) while tuning; False at the slow limits."""
+    old = dict(gait)
+    for name in GAIT_STEP:
+        low, high = GAIT_LIMITS[name]
+        gait[name] = min(high, max(low, gait[name] - GAIT_STEP[name]))
+    return gait != old
+
 # === FINAL WALKING POLICY ===
 async def walk_forever():
     print("\n" + "="*80)
     print("FINAL LEARNED POLICY")
     print("="*80)
     for i in range(4):
-        best = actions[Q[i].index(max(Q[i]))]
+        best = actions[best_allowed(i)]
         print("{:14} → {}".format(states[i], best))
     print("="*80)
+    print("Masked moves during training: {}".format(masked_moves))
+    print("Reset: {} motors moved, {} already in place".format(*reset_moved))
 
-    print("\nEpisode,Reward,Cycles,Epsilon")
-    for ep, rew, cyc, eps in episode_data:
-        print("{},{},{},{}".format(ep, rew, cyc, eps))
+    print("\nSeed: {}".format(run_seed))
+    print("Episode,Reward,Cycles,Epsilon")
+    print_log()
 
     # Repeat learned gait indefinitely
+    if TUNE_GAIT:
+        await tune_gait()
     while True:
-        s = get_state()
-        a = Q[state_idx[s]].index(max(Q[state_idx[s]]))
-        await action_funcs[a]()
-        await runloop.sleep_ms(660 if a in [0, 2] else 500)
+        rate, mm, missed = await walk_cycles(REPORT_CYCLES)
+        print_gait(rate, mm, missed)
 
 # === PROGRAM ENTRY POINT ===
 async def main():
@@ -2,8 +2,11 @@
 
 from hub import port, light_matrix
 import motor
+import distance_sensor
 import runloop
 import random
+import time
+import struct
 
 # =================================== HARDWARE CONFIGURATION ===================================
 MOTOR_SPEED = 1000                                # Motor speed in degrees/second
@@ -18,6 +21,7 @@ LEG_FORWARD    = 50                                # Left leg forward position
 LEG_BACKWARD= -50                                # Right leg forward position (negative direction)
 BODY_UP        = 140                                # Body lifted (off the ground)
 BODY_DOWN    = 0                                # Body lowered (weight on legs)
+RESET_TOL      = 5                                  # Smart reset: a motor this close (degrees) to its start position is not moved
 
 # =================================== LEARNING PARAMETERS ===================================
 NUM_EPISODES= 30                                # Total training episodes
@@ -25,6 +29,32 @@ MAX_STEPS    = 40                                # Maximum actions per episode
 LEARNING_RATE= 0.55                            # α – fast but stable learning (tuned for real robot)
 DISCOUNT    = 0.9                                # γ – importance of future rewards
 EXPLORATION    = 0.7                                # ε – initial exploration rate (decays over time)
+TRACE_LAMBDA   = 0.0                                # λ – Watkins Q(λ) trace decay (0 = one-step Q-learning; e.g. 0.8 for Q(λ))
+TRACE_MIN      = 0.01                               # Drop eligibility traces smaller than this
+SEED           = None                               # Random seed (None = taken from the clock; always printed)
+TRACE_STEPS    = False                              # Print a TRACE line per step (positions, timing) for Calibrate.py
+TIME_PENALTY   = 0.0                                # Reward lost per second of step time (0 = rewards count steps only)
+SMDP_DISCOUNT  = False                              # Discount by robot time: γ per STEP_MS instead of γ per step
+STEP_MS        = 450                                # Nominal step time (move + settle) for SMDP_DISCOUNT
+Q_LOG          = "delta"                            # Q-table output per episode: "delta" (changed cells + greedy flips, QDelta.py) or "full"
+LOG_FILE       = "exp2_episodes.bin"                # Episode records on hub flash (EpisodeLog.py decodes them)
+LOG_CHUNK      = 16                                 # Records buffered in RAM before they are appended to LOG_FILE
+
+# =================================== ONLINE LEARNING-CURVE STATISTICS ===================================
+STATS_WINDOW   = 3                                  # Online stats: rolling window (episodes), same as Graphs.py
+STATS_ALPHA    = 0.3                                # Online stats: EWMA weight of the newest episode
+CONVERGE_TOL   = 0.1                                # Converged: rolling mean moves < 10% for STATS_WINDOW episodes
+DIVERGE_DROP   = 0.5                                # Diverging: EWMA 50% (of its best) below its best...
+DIVERGE_EPISODES= 5                                 # ...for this many episodes in a row
+ABORT_ON_DIVERGE= False                             # Stop training when the run diverges (then walk with what was learned)
+
+# =================================== GAIT TUNING (walk_forever) ===================================
+TUNE_GAIT      = False                              # Tune sleep and motor speed while walking (False = fixed 330 ms, measured only)
+TUNE_CYCLES    = 2                                  # Gait cycles per measurement
+TUNE_ROUNDS    = 4                                  # Passes over all settings (stops early when nothing improves)
+TUNE_MIN_GAIN  = 1.03                               # A change must be at least 3% faster to be kept
+REPORT_CYCLES  = 5                                  # Throughput report interval while walking forever
+DIST_PORT      = None                               # Distance sensor port facing a target (e.g. port.F) for mm per cycle; None = no sensor
 
 # =================================== ENVIRONMENT: STATES ===================================
 # Exactly matching your hand-designed gait table
@@ -43,10 +73,64 @@ states = [
 actions = ["A.Lfwd", "C.Rup", "A.Lmid", "B.Rfwd", "C.Lup", "B.Rmid"]
 # Index:    0        1        2        3        4        5
 
+# =================================== ACTION MASK – SKIP MOVES THAT CANNOT CHANGE STATE ===================================
+# 1 = allowed, 0 = known no-op for this state (never sent to the motors)
+ACTION_MASK = [
+    [1, 1, 0, 1, 0, 0],   # 0 Lmid Rmid Lup → A.Lfwd, C.Rup, B.Rfwd
+    [0, 1, 1, 1, 0, 0],   # 1 Lfwd Rmid Lup → C.Rup, A.Lmid, B.Rfwd
+    [0, 0, 1, 1, 1, 0],   # 2 Lfwd Rmid Rup → A.Lmid, B.Rfwd, C.Lup
+    [1, 0, 0, 1, 1, 0],   # 3 Lmid Rmid Rup → A.Lfwd, B.Rfwd, C.Lup
+    [1, 0, 0, 0, 1, 1],   # 4 Lmid Rfdw Rup → A.Lfwd, C.Lup, B.Rmid
+    [1, 1, 0, 0, 0, 1],   # 5 Lmid Rfdw Lup → A.Lfwd, C.Rup, B.Rmid
+    [1, 1, 0, 1, 0, 0],   # 6 Lmid Rmid Lup → same as state 0
+    [1, 1, 1, 1, 1, 1]    # 7 STUCK         → anything may help recover
+]
+masked_moves = 0                                    # Total actions skipped by the mask over all episodes
+
 # =================================== Q-TABLE: ALL ZEROS – TRUE FROM-SCRATCH LEARNING ===================================
 Q = [[0.0]*6 for _ in range(8)]                    # Robot starts with no prior knowledge
 
-episode_stats = []# Stores (episode, reward, cycles, epsilon) for CSV export
+# =================================== EPISODE LOG (EpisodeLog.py) ===================================
+# Episode rows are packed into a fixed buffer of LOG_CHUNK binary records that is appended
+# to LOG_FILE on the hub's flash whenever it fills. RAM use does not grow with the number of
+# episodes, and a crash loses at most the last chunk. The CSV table at the end is streamed
+# back from the file one record at a time.
+LOG_HEADER = "<4sBBI"                               # Magic, format version, experiment, seed
+LOG_RECORD = "<HfHf"                                # Episode, reward, cycles, epsilon
+LOG_SIZE = struct.calcsize(LOG_RECORD)
+log_buf = bytearray(LOG_CHUNK * LOG_SIZE)           # Records not yet on flash
+log_count = 0
+log_last = (0, 0.0, 0, 0.0)                         # Newest record (Q-table header)
+
+def log_start(seed):
+    """Start a new LOG_FILE for this run."""
+    with open(LOG_FILE, "wb") as f:
+        f.write(struct.pack(LOG_HEADER, b"QLEP", 1, 2, seed & 0xFFFFFFFF))
+
+def log_flush():
+    global log_count
+    if log_count:
+        with open(LOG_FILE, "ab") as f:
+            f.write(memoryview(log_buf)[:log_count * LOG_SIZE])
+        log_count = 0
+
+def log_episode(ep, reward, cycles, eps):
+    global log_count, log_last
+    struct.pack_into(LOG_RECORD, log_buf, log_count * LOG_SIZE, ep, reward, cycles, eps)
+    log_count += 1
+    log_last = (ep, reward, cycles, eps)
+    if log_count == LOG_CHUNK:
+        log_flush()
+
+def print_log():
+    """CSV rows of the whole run, read back from flash."""
+    log_flush()
+    rec = bytearray(LOG_SIZE)
+    with open(LOG_FILE, "rb") as f:
+        f.seek(struct.calcsize(LOG_HEADER))
+        while f.readinto(rec) == LOG_SIZE:
+            ep, reward, cycles, eps = struct.unpack(LOG_RECORD, rec)
+            print("{},{},{},{}".format(ep, round(reward, 2), cycles, round(eps, 3)))
 
 # =================================== ACTION FUNCTIONS ===================================
 async def a_lfwd(): await motor.run_to_absolute_position(LEFT_LEG_MOTOR, 50, MOTOR_SPEED)    # Left leg forward
@@ -58,6 +142,73 @@ async def b_rmid(): await motor.run_to_absolute_position(RIGHT_LEG_MOTOR, 0, MOT
 
 action_functions = [a_lfwd, c_rup, a_lmid, b_rfwd, c_lup, b_rmid]
 
+# =================================== SMART RESET ===================================
+# Only motors more than RESET_TOL degrees from their start position are moved, and all of
+# them at once: a motor command starts when it is called, so every move is started before
+# the first one is awaited. An episode that begins in the start pose costs no reset time.
+START_POSE = [(LEFT_LEG_MOTOR, LEG_MIDDLE, MOTOR_SPEED), (RIGHT_LEG_MOTOR, LEG_MIDDLE, MOTOR_SPEED),
+              (BODY_TILT_MOTOR, BODY_DOWN, MOTOR_SPEED)]   # (port, position, speed)
+reset_moved = [0, 0]                                # Motors moved, motors already in place (all resets)
+
+async def reset_motors(pose):
+    """Move the motors of pose that are out of tolerance, concurrently. Returns how many moved."""
+    moves = [motor.run_to_absolute_position(p, target, speed)
+             for p, target, speed in pose if abs(motor.absolute_position(p) - target) > RESET_TOL]
+    for m in moves:
+        await m
+    reset_moved[0] += len(moves)
+    reset_moved[1] += len(pose) - len(moves)
+    return len(moves)
+
+# =================================== MASKED ACTION HELPERS ===================================
+def allowed(s):
+    return [a for a in range(6) if ACTION_MASK[s][a]]
+
+def best_allowed(s):
+    return max(allowed(s), key=lambda a: Q[s][a])  # Greedy action among allowed ones
+
+def masked_max(s):
+    return max(Q[s][a] for a in allowed(s))        # Bootstrap value over allowed actions only
+
+def step_discount(step_ms):
+    return DISCOUNT ** (step_ms / STEP_MS) if SMDP_DISCOUNT else DISCOUNT   # Semi-Markov: γ per STEP_MS of robot time
+
+# =================================== WATKINS Q(λ) UPDATE ===================================
+# Only active (state, action) pairs are kept: trace_sa holds state*6+action, trace_e the trace value
+trace_sa = []
+trace_e = []
+
+def q_lambda_update(state, a, reward, next_state, discount=DISCOUNT):
+    if Q[state][a] < masked_max(state):
+        del trace_sa[:]                            # Exploratory move: earlier steps get no credit
+        del trace_e[:]
+    sa = state * 6 + a
+    if sa in trace_sa:
+        trace_e[trace_sa.index(sa)] = 1.0          # Replacing trace
+    else:
+        trace_sa.append(sa)
+        trace_e.append(1.0)
+    td = reward + discount * masked_max(next_state) - Q[state][a]
+    decay = discount * TRACE_LAMBDA
+    i = 0
+    while i < len(trace_sa):
+        Q[trace_sa[i] // 6][trace_sa[i] % 6] += LEARNING_RATE * td * trace_e[i]
+        trace_e[i] *= decay
+        if trace_e[i] < TRACE_MIN:
+            trace_sa.pop(i)
+            trace_e.pop(i)
+        else:
+            i += 1
+
+# =================================== RANDOM SEED ===================================
+run_seed = None                                     # Seed actually used (printed with the results)
+
+def seed_random():
+    global run_seed
+    run_seed = SEED if SEED is not None else time.ticks_ms()
+    random.seed(run_seed)
+    print("Seed: {}".format(run_seed))
+
 # =================================== STATE DETECTION ===================================
 def get_current_state():
     lp = motor.absolute_position(LEFT_LEG_MOTOR)
@@ -79,58 +230,137 @@ def get_current_state():
     if l_mid and r_mid and body_up:    return 6
     return 7# STUCK – safety fallback
 
+# =================================== STEP TRACE (FOR Calibrate.py) ===================================
+# TRACE,episode,step,state,action,next_state,A,B,C,distance,move_ms
+def trace_step(ep, t, s, a, ns, move_ms):
+    print("TRACE,{},{},{},{},{},{},{},{},0,{}".format(
+        ep, t, s, a, ns, motor.absolute_position(LEFT_LEG_MOTOR), motor.absolute_position(RIGHT_LEG_MOTOR),
+        motor.absolute_position(BODY_TILT_MOTOR), move_ms))
+
 # =================================== VISUALIZE Q-TABLE ===================================
 def print_q_table(ep):
     print("\n" + "="*110)
     if ep == 0:
         print("INITIAL Q-TABLE – ALL ZEROS (PURE REINFORCEMENT LEARNING)")
     else:
-        r = episode_stats[-1][1]
-        c = episode_stats[-1][2]
-        e = episode_stats[-1][3]
+        _, r, c, e = log_last
         print("EPISODE {} | Reward: {:+.1f} | Cycles: {} | ε: {:.3f}".format(ep, r, c, e))
     print("="*110)
     print("State            | A.Lfwd C.Rup A.Lmid B.Rfwd C.Lup B.Rmid | Best")
     print("-"*110)
     for i in range(8):
         row = "".join("{:6.3f}".format(v) for v in Q[i])
-        best = actions[Q[i].index(max(Q[i]))]
+        best = actions[best_allowed(i)]
         print("{:19} | {}→{}".format(states[i], row, best))
     print("-"*110)
 
+# =================================== Q-TABLE DELTA LOG (QDelta.py) ===================================
+# QDELTA,episode,state,action,value for every cell whose value (4 decimals) changed and
+# FLIP,episode,state,old_action,new_action when a greedy action changes. Episode 0 logs
+# every cell, so QDelta.py can rebuild the table at any episode from these lines alone.
+q_logged = [[None] * 6 for _ in range(8)]           # Last logged value of every cell
+
+def logged_best(s):
+    return max(allowed(s), key=lambda a: q_logged[s][a])
+
+def log_q_deltas(ep):
+    changed = flips = 0
+    for s in range(8):
+        old_best = logged_best(s) if ep else None
+        for a in range(6):
+            v = round(Q[s][a], 4)
+            if v != q_logged[s][a]:
+                q_logged[s][a] = v
+                changed += 1
+                print("QDELTA,{},{},{},{}".format(ep, s, a, v))
+        new_best = logged_best(s)
+        if ep and new_best != old_best:
+            flips += 1
+            print("FLIP,{},{},{},{}".format(ep, s, old_best, new_best))
+    print("Q-table episode {}: {} cells changed, {} greedy flips".format(ep, changed, flips))
+
+# =================================== ONLINE LEARNING-CURVE STATISTICS ===================================
+# O(1) per episode: running mean/variance (Welford), EWMA, rolling mean over a ring buffer
+# and converged/diverging flags – the same definitions as Stats.py on the computer.
+stats = {"n": 0, "mean": 0.0, "m2": 0.0, "ewma": 0.0, "best": None,
+         "ring": [0.0] * STATS_WINDOW, "sum": 0.0, "rolling": 0.0, "stable": 0, "falling": 0}
+
+def update_stats(r):
+    st = stats
+    st["n"] += 1
+    n = st["n"]
+    d = r - st["mean"]
+    st["mean"] += d / n
+    st["m2"] += d * (r - st["mean"])
+    st["ewma"] = r if n == 1 else st["ewma"] + STATS_ALPHA * (r - st["ewma"])
+    i = (n - 1) % STATS_WINDOW
+    st["sum"] += r - st["ring"][i]                      # Ring buffer: swap the oldest reward out
+    st["ring"][i] = r
+    prev = st["rolling"]
+    st["rolling"] = st["sum"] / min(n, STATS_WINDOW)
+    settled = n > STATS_WINDOW and abs(st["rolling"] - prev) <= CONVERGE_TOL * max(abs(st["rolling"]), 1.0)
+    st["stable"] = st["stable"] + 1 if settled else 0
+    if st["best"] is None or st["ewma"] > st["best"]:
+        st["best"] = st["ewma"]
+    below = st["ewma"] < st["best"] - DIVERGE_DROP * max(abs(st["best"]), 1.0)
+    st["falling"] = st["falling"] + 1 if below else 0
+    if st["falling"] >= DIVERGE_EPISODES:
+        return "diverging"
+    return "converged" if st["stable"] >= STATS_WINDOW else "learning"
+
+# STATS,episode,mean,std,ewma,rolling,status
+def print_stats(ep, status):
+    st = stats
+    std = (st["m2"] / (st["n"] - 1)) ** 0.5 if st["n"] > 1 else 0.0
+    print("STATS,{},{:.2f},{:.2f},{:.2f},{:.2f},{}".format(ep, st["mean"], std, st["ewma"], st["rolling"], status))
+
 # =================================== TRAINING LOOP – LEARNS FROM SCRATCH ===================================
 async def train():
-    global EXPLORATION
+    global EXPLORATION, masked_moves
+    seed_random()
+    log_start(run_seed)
 
     # Reset robot to known starting position
-    await motor.run_to_absolute_position(LEFT_LEG_MOTOR, 0, MOTOR_SPEED)
-    await motor.run_to_absolute_position(RIGHT_LEG_MOTOR, 0, MOTOR_SPEED)
-    await motor.run_to_absolute_position(BODY_TILT_MOTOR, 0, MOTOR_SPEED)
+    await reset_motors(START_POSE)
     await light_matrix.write("E2")
     print_q_table(0)
+    if Q_LOG != "full":
+        log_q_deltas(0)
 
     for episode in range(1, NUM_EPISODES + 1):
-        # Reset position at start of each episode
-        await motor.run_to_absolute_position(LEFT_LEG_MOTOR, 0, MOTOR_SPEED)
-        await motor.run_to_absolute_position(RIGHT_LEG_MOTOR, 0, MOTOR_SPEED)
-        await motor.run_to_absolute_position(BODY_TILT_MOTOR, 0, MOTOR_SPEED)
-        await runloop.sleep_ms(700)
+        # Reset position at start of each episode (only the motors that are off, all at once)
+        if await reset_motors(START_POSE):
+            await runloop.sleep_ms(700)
 
         state = 0
         total_reward = 0.0
         cycles = 0
+        masked = 0
+        del trace_sa[:]                            # Traces never carry over between episodes
+        del trace_e[:]
 
-        for _ in range(MAX_STEPS):
+        for step in range(1, MAX_STEPS + 1):
             # Standard ε-greedy action selection (no protection – pure learning)
-            if random.random() < EXPLORATION:
+            explore = random.random() < EXPLORATION
+            if explore:
                 a = random.randint(0, 5)
             else:
                 a = Q[state].index(max(Q[state]))
 
+            # Action mask: redirect no-op moves before they reach the motors
+            if not ACTION_MASK[state][a]:
+                masked += 1
+                a = random.choice(allowed(state)) if explore else best_allowed(state)
+
+            t0 = time.ticks_ms()
             await action_functions[a]()
+            move_ms = time.ticks_diff(time.ticks_ms(), t0)
             await runloop.sleep_ms(380)        # Wait for motors to settle
+            step_ms = time.ticks_diff(time.ticks_ms(), t0)   # Whole step: move + settle
 
             next_state = get_current_state()
+            if TRACE_STEPS:
+                trace_step(episode, step, state, a, next_state, move_ms)
 
             # Reward shaping – strongly encourage full walking cycles
             reward = 0.0
@@ -144,47 +374,156 @@ async def train():
             elif next_state == 7:                # Penalty for getting stuck
                 reward = -8.0
 
+            if TIME_PENALTY:
+                reward -= TIME_PENALTY * step_ms / 1000   # Slow steps cost reward
+
             total_reward += reward
 
-            # Standard Q-learning update
-            td = reward + DISCOUNT * max(Q[next_state]) - Q[state][a]
-            Q[state][a] += LEARNING_RATE * td
+            # Q(λ) update – the cycle reward flows back along the traced gait steps
+            q_lambda_update(state, a, reward, next_state, step_discount(step_ms))
 
             state = next_state
 
         # Record episode statistics
-        episode_stats.append((episode, round(total_reward,2), cycles, round(EXPLORATION,3)))
+        log_episode(episode, total_reward, cycles, EXPLORATION)
+        masked_moves += masked
         EXPLORATION = max(0.1, EXPLORATION * 0.93)# Decay exploration
         await light_matrix.write(str(episode % 10))
-        print_q_table(episode)
-
+        if Q_LOG == "full":
+            print_q_table(episode)
+        else:
+            log_q_deltas(episode)
+        print("Masked moves this episode: {}".format(masked))
+        status = update_stats(total_reward)
+        print_stats(episode, status)
+        if ABORT_ON_DIVERGE and status == "diverging":
+            print("Run is diverging – training stopped after episode {}".format(episode))
+            break
+
+    if Q_LOG != "full":
+        print_q_table(episode)                 # Final table in full (Evaluate.py reads it)
     await light_matrix.write("OK")
 
+def gait_action(s):
+    return best_allowed(0 if s == 7 else s)         # Learned policy (STUCK restarts from state 0)
+
+# =================================== GAIT THROUGHPUT AND TUNING ===================================
+# Walking is measured in blocks of gait cycles: cycles per second, and mm per cycle when a
+# distance sensor faces a target. tune_gait() is a coordinate hill climb on the sleep and
+# the motor speed: a change is kept only if the robot walks faster without getting STUCK.
+gait = {"sleep_ms": 330, "speed": MOTOR_SPEED}                  # Current walking settings
+GAIT_STEP = {"sleep_ms": -40, "speed": 100}                     # Change tried first (the faster direction)
+GAIT_LIMITS = {"sleep_ms": (80, 800), "speed": (300, 1100)}
+
+def gait_distance():
+    """Distance to the target in mm, or None without a sensor / valid reading."""
+    if DIST_PORT is None:
+        return None
+    d = distance_sensor.distance(DIST_PORT)
+    return None if d is None or d <= 0 or d > 1000 else d
+
+async def reset_pose():
+    """Training start pose: legs middle, body down."""
+    if await reset_motors(START_POSE):
+        await runloop.sleep_ms(gait["sleep_ms"])
+
+async def walk_cycles(n):
+    """Walk n gait cycles with the current settings. Returns (cycles/s, mm per cycle or None, stuck steps)."""
+    global MOTOR_SPEED
+    MOTOR_SPEED = gait["speed"]
+    d0 = gait_distance()
+    t0 = time.ticks_ms()
+    done, stuck, steps = 0, 0, 0
+    while done < n and steps < 12 * n:      # 6 moves per cycle – give up after twice that
+        s = get_current_state()
+        a = gait_action(s)
+        await action_functions[a]()
+        await runloop.sleep_ms(gait["sleep_ms"])
+        ns = get_current_state()
+        steps += 1
+        if ns == 7 or ns == s:
+            stuck += 1                      # STUCK, or the move did not change the state
+        if s == 5 and ns in [0, 6]:
+            done += 1                       # B.Rmid from state 5 closes the cycle
+    secs = max(time.ticks_diff(time.ticks_ms(), t0), 1) / 1000
+    d1 = gait_distance()
+    mm = (d0 - d1) / done if done and d0 is not None and d1 is not None else None
+    return done / secs, mm, stuck
+
+def gait_score(rate, mm, stuck):
+    """Forward speed: mm/s with a distance sensor, cycles/s without; 0 if the robot got stuck."""
+    if stuck:
+        return 0.0
+    return rate * mm if mm is not None else rate
+
+def print_gait(rate, mm, stuck):
+    print("Gait: {:.3f} cycles/s | {} mm/cycle | stuck steps: {} | {}".format(
+        rate, "-" if mm is None else "{:.1f}".format(mm), stuck, gait))
+
+async def tune_gait():
+    start = dict(gait)
+    rate, mm, missed = await walk_cycles(TUNE_CYCLES)
+    while missed and back_off_gait():       # Start from settings that do not miss steps
+        rate, mm, missed = await walk_cycles(TUNE_CYCLES)
+    if missed:
+        gait.update(start)                  # Misses even at the slow limits: not a timing problem
+        print("\nTUNING GAIT – steps missed at every setting, keeping {}".format(gait))
+        return
+    best = gait_score(rate, mm, missed)
+    print("\nTUNING GAIT – start score {:.3f}".format(best))
+    for _ in range(TUNE_ROUNDS):
+        improved = False
+        for name in GAIT_STEP:
+            for sign in (1, -1):
+                old = gait[name]
+                low, high = GAIT_LIMITS[name]
+                gait[name] = min(high, max(low, old + sign * GAIT_STEP[name]))
+                if gait[name] == old:
+                    continue
+                score = gait_score(*(await walk_cycles(TUNE_CYCLES)))
+                print("  {} {} → {}: {:.3f}".format(name, old, gait[name], score))
+                if score > best * TUNE_MIN_GAIN:
+                    best, improved = score, True
+                    break
+                gait[name] = old
+        if not improved:
+            break
+    print("Tuned gait: {} | score {:.3f}".format(gait, best))
+
+def back_off_gait():
+    """One step towards the safe side (longer sleep, lower speed) while tuning; False at the slow limits."""
+    old = dict(gait)
+    for name in GAIT_STEP:
+        low, high = GAIT_LIMITS[name]
+        gait[name] = min(high, max(low, gait[name] - GAIT_STEP[name]))
+    return gait != old
+
 # =================================== FINAL WALKING – USES LEARNED POLICY ===================================
 async def walk_forever():
     print("\n" + "="*110)
     print("FINAL LEARNED POLICY – DISCOVERED FROM SCRATCH!")
     print("="*110)
     for i in range(7):
-        best = actions[Q[i].index(max(Q[i]))]
+        best = actions[best_allowed(i)]
         print("{:19} → {}".format(states[i], best))
     print("="*110)
 
+    print("Masked moves during training: {}".format(masked_moves))
+    print("Reset: {} motors moved, {} already in place".format(*reset_moved))
+
     # Export data for graphs
-    print("\nCSV DATA:")
+    print("\nSeed: {}".format(run_seed))
+    print("CSV DATA:")
     print("Episode,Reward,Cycles,Epsilon")
-    for ep, r, c, e in episode_stats:
-        print("{},{},{},{}".format(ep, r, c, e))
+    print_log()
     print("="*110)
 
     print("\nWALKING FOREVER WITH LEARNED GAIT")
+    if TUNE_GAIT:
+        await tune_gait()
     while True:
-        s = get_current_state()
-        if s == 7:
-            s = 0
-        a = Q[s].index(max(Q[s]))
-        await action_functions[a]()
-        await runloop.sleep_ms(330)
+        rate, mm, missed = await walk_cycles(REPORT_CYCLES)
+        print_gait(rate, mm, missed)
 
 # =================================== MAIN ===================================
 async def main():
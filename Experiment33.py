@@ -4,6 +4,9 @@ import distance_sensor
 from hub import light_matrix, port
 from app import sound
 import random
+import time
+import struct
+import gc
 
 # ========================================
 # EXPERIMENT 3 – 8-STATE BIPED WALKER (SEEDED VERSION)
@@ -21,24 +24,134 @@ EPISODES = 40        # Total training episodes
 MAX_STEPS = 50        # Max steps per episode
 SPEED = 950        # Motor speed for body (port C)
 SLEEP = 150        # Delay after each move (ms)
+LAMBDA = 0.0          # Watkins Q(λ) trace decay (0 = plain one-step Q-learning; e.g. 0.8 for Q(λ))
+TRACE_MIN = 0.01      # Drop eligibility traces smaller than this
+SEED = None           # Random seed (None = taken from the clock; always printed)
+TRACE_STEPS = False   # Print a TRACE line per step (positions, distance, timing) for Calibrate.py
+TIME_PENALTY = 0.0    # Reward lost per second of step time (0 = rewards count steps only)
+SMDP_DISCOUNT = False # Discount by robot time: γ per STEP_MS instead of γ per step
+STEP_MS = 300         # Nominal step time (move + settle + reading) for SMDP_DISCOUNT
+SAMPLE_MS = 20        # Background distance sampling period (ms)
+SAMPLE_WINDOW = 5     # Readings per filtered distance (ring buffer size)
+DIST_FILTER = "median"  # "median" of the window or "ema" (exponential moving average)
+EMA_ALPHA = 0.5       # EMA weight of the newest reading
+STATS_WINDOW = 3      # Online stats: rolling window (episodes), same as Graphs.py
+STATS_ALPHA = 0.3     # Online stats: EWMA weight of the newest episode
+CONVERGE_TOL = 0.1    # Converged: rolling mean moves < 10% for STATS_WINDOW episodes
+DIVERGE_DROP = 0.5    # Diverging: EWMA 50% (of its best) below its best...
+DIVERGE_EPISODES = 5  # ...for this many episodes in a row
+ABORT_ON_DIVERGE = False # Stop training when the run diverges (then walk with what was learned)
+Q_LOG = "delta"       # Q-table output per episode: "delta" (changed cells + greedy flips, QDelta.py) or "full"
+START_MIN = 150       # Start band: an episode starts with the target this far away (mm)...
+START_MAX = 200       # ...up to this far (the original 150–200 mm)
+START_HYST = 10       # Hysteresis: a ready start only drops out this far (mm) outside the band
+START_STABLE = 10     # Filtered readings in a row inside the band before the start counts
+START_CHECK = True    # Re-check every episode and wait for repositioning (False = record only)
+MEM_PROFILE = False   # Sample gc.mem_alloc()/mem_free() per step and episode, report the memory budget
+LOG_FILE = "exp33_episodes.bin" # Episode records on hub flash (EpisodeLog.py decodes them)
+LOG_CHUNK = 16        # Records buffered in RAM before they are appended to LOG_FILE
 
 # Motor target positions (in degrees)
 Lmid, Lfwd = 0, 60    # Left leg: middle and forward
 Rmid, Rfwd = 0, 60    # Right leg: middle and forward
 Lup, Rup= 140, -140 # Body tilt for lifting (left/right)
+RESET_TOL = 5         # Smart reset: a motor this close (degrees) to its start position is not moved
 
 # List of all 6 possible actions
 ACTIONS = ["Lup", "Rup", "Lfwd", "Lmid", "Rfwd", "Rmid"]
 
+# Action mask: 1 = allowed, 0 = leg move that cannot change the state (never sent to the motors)
+# Tilts are always allowed – switching Lup/Rup changes which leg carries the body.
+ACTION_MASK = [
+    [1, 1, 0, 1, 1, 0],  # 0: Lfwd + Rmid, body up
+    [1, 1, 1, 0, 0, 1],  # 1: Lmid + Rfwd, body up
+    [1, 1, 1, 0, 1, 0],  # 2: Lmid + Rmid, body down
+    [1, 1, 0, 1, 1, 0],  # 3: Lfwd + Rmid, body down
+    [1, 1, 1, 0, 0, 1],  # 4: Lmid + Rfwd, body down
+    [1, 1, 1, 0, 1, 0],  # 5: Lmid + Rmid, body up
+    [1, 1, 0, 1, 0, 1],  # 6: Lfwd + Rfwd, body down
+    [1, 1, 1, 1, 1, 1],  # 7: unknown – anything may help recover
+]
+
 old_dist = 999# Tracks last valid distance reading
 
 def safe_dist():
     """Safely read distance sensor. Returns 999 if object is lost."""
-    global old_dist
     d = distance_sensor.distance(port.F)
     if d is None or d <= 0 or d > 1000:
         return 999# Lost sight of target
-    old_dist = d
+    return d
+
+# === BACKGROUND DISTANCE SAMPLER ===
+# sampler() runs next to main() and keeps the latest readings in a ring buffer, so the step
+# loop gets a filtered distance without waiting on the sensor. One bad reading no longer
+# means LOST SIGHT – only a window without a single valid reading does.
+samples = [999] * SAMPLE_WINDOW   # Ring buffer of raw readings (999 = invalid)
+sample_count = 0                  # Samples taken so far (slot = sample_count % SAMPLE_WINDOW)
+ema_dist = 999                    # Exponential moving average of the valid readings
+settled_at = 0                    # sample_count when the last move finished
+sampling = True                   # main() clears this to stop the sampler
+
+async def sampler():
+    global sample_count, ema_dist
+    while sampling:
+        d = safe_dist()
+        samples[sample_count % SAMPLE_WINDOW] = d
+        sample_count += 1
+        if d < 999:
+            ema_dist = d if ema_dist >= 999 else EMA_ALPHA * d + (1 - EMA_ALPHA) * ema_dist
+        update_start(filtered_dist())
+        await runloop.sleep_ms(SAMPLE_MS)
+
+def filtered_dist():
+    """Filtered distance of the current window. 999 only if none of its readings is valid."""
+    valid = sorted(d for d in samples if d < 999)
+    if not valid:
+        return 999
+    if DIST_FILTER == "ema":
+        return int(ema_dist)
+    return valid[len(valid) // 2]          # Median
+
+async def read_dist(since):
+    """Filtered distance once the whole window was sampled after sample number `since`.
+    Returns 999 only if none of those readings is valid."""
+    while sample_count - since < SAMPLE_WINDOW:
+        await runloop.sleep_ms(SAMPLE_MS)
+    return filtered_dist()
+
+# === START CONDITION ===
+# sampler() tracks whether the filtered distance is inside the start band, with hysteresis:
+# it becomes ready after START_STABLE readings in a row inside START_MIN..START_MAX and only
+# drops out again more than START_HYST mm outside the band. wait_for_start() waits on that
+# flag with runloop.until() instead of polling the sensor, and every episode prints
+# START,episode,distance_mm,waited_ms,in_band so the actual start distance is on record.
+start_run = 0                     # Filtered readings in a row inside the band
+start_ok = False                  # Start condition (with hysteresis), updated by sampler()
+
+def update_start(d):
+    global start_run, start_ok
+    if start_ok:
+        start_ok = START_MIN - START_HYST <= d <= START_MAX + START_HYST
+        start_run = START_STABLE if start_ok else 0
+    else:
+        start_run = start_run + 1 if START_MIN <= d <= START_MAX else 0
+        start_ok = start_run >= START_STABLE
+
+def start_ready():
+    return start_ok
+
+async def wait_for_start(ep, wait=True):
+    """Wait until the start condition holds (if wait); returns the filtered start distance."""
+    t0 = time.ticks_ms()
+    if wait and not start_ok:
+        print("Place target {0}–{1} mm away on the mattress...".format(START_MIN, START_MAX))
+        await light_matrix.write("?")
+        await runloop.until(start_ready)
+        d = await read_dist(sample_count)
+        print("Good starting distance: {0} mm".format(d))
+    else:
+        d = await read_dist(sample_count)
+    print("START,{0},{1},{2},{3}".format(ep, d, time.ticks_diff(time.ticks_ms(), t0), int(start_ok)))
     return d
 
 def get_state():
@@ -67,24 +180,84 @@ def get_state():
     if body_down and left_fwd and right_fwd:    return 6# Both legs forward
     return 7# Unknown / recovery state
 
+def allowed(s):
+    """Actions the mask allows in state s."""
+    return [a for a in range(6) if ACTION_MASK[s][a]]
+
+def masked_max(Q, s):
+    """Best Q-value in state s over allowed actions only."""
+    return max(Q[s][a] for a in allowed(s))
+
+def step_discount(step_ms):
+    """γ for one step – per STEP_MS of robot time when SMDP_DISCOUNT is on (semi-Markov)."""
+    return GAMMA ** (step_ms / STEP_MS) if SMDP_DISCOUNT else GAMMA
+
+def q_lambda_update(Q, traces, s, a, r, ns, gamma=GAMMA):
+    """Watkins Q(λ) update. traces = [state*6+action list, trace list] holding only active pairs."""
+    sa_list, e_list = traces
+    if Q[s][a] < masked_max(Q, s):
+        del sa_list[:]                     # Exploratory move: earlier steps get no credit
+        del e_list[:]
+    sa = s * 6 + a
+    if sa in sa_list:
+        e_list[sa_list.index(sa)] = 1.0    # Replacing trace
+    else:
+        sa_list.append(sa)
+        e_list.append(1.0)
+    delta = r + gamma * masked_max(Q, ns) - Q[s][a]
+    decay = gamma * LAMBDA
+    i = 0
+    while i < len(sa_list):
+        Q[sa_list[i] // 6][sa_list[i] % 6] += ALPHA * delta * e_list[i]
+        e_list[i] *= decay
+        if e_list[i] < TRACE_MIN:
+            sa_list.pop(i)
+            e_list.pop(i)
+        else:
+            i += 1
+
 async def move(action):
-    """Execute one action – slow legs, fast body."""
+    """Execute one action – slow legs, fast body. Returns the motor time in ms (without SLEEP)."""
+    global settled_at
+    t0 = time.ticks_ms()
     if action == 0:await motor.run_to_absolute_position(port.C, Lup, SPEED)    # Tilt body left
     elif action == 1: await motor.run_to_absolute_position(port.C, Rup, SPEED)    # Tilt body right
     elif action == 2: await motor.run_to_absolute_position(port.A, Lfwd, int(SPEED * 0.5))# Left forward (slow)
     elif action == 3: await motor.run_to_absolute_position(port.A, Lmid, int(SPEED * 0.5))# Left middle
     elif action == 4: await motor.run_to_absolute_position(port.B, Rfwd, int(SPEED * 0.5))# Right forward
     elif action == 5: await motor.run_to_absolute_position(port.B, Rmid, int(SPEED * 0.5))# Right middle
+    move_ms = time.ticks_diff(time.ticks_ms(), t0)
+    settled_at = sample_count            # Later readings see the finished pose
     await runloop.sleep_ms(SLEEP)# Let movement finish
+    return move_ms
+
+def trace_step(ep, t, s, a, ns, dist, move_ms):
+    """TRACE,episode,step,state,action,next_state,A,B,C,distance,move_ms"""
+    print("TRACE,{0},{1},{2},{3},{4},{5},{6},{7},{8},{9}".format(
+        ep, t, s, a, ns, motor.absolute_position(port.A), motor.absolute_position(port.B),
+        motor.absolute_position(port.C), dist, move_ms))
+
+# === SMART RESET ===
+# Only motors more than RESET_TOL degrees from their start position are moved, and all of
+# them at once: a motor command starts when it is called, so every move is started before
+# the first one is awaited. An episode that begins in the start pose costs no reset time.
+START_POSE = [(port.C, 0, SPEED), (port.A, Lmid, int(SPEED * 0.5)), (port.B, Rmid, int(SPEED * 0.5))]
+reset_moved = [0, 0]  # Motors moved, motors already in place (all resets)
+
+async def reset_motors(pose):
+    """Move the motors of pose that are out of tolerance, concurrently. Returns how many moved."""
+    moves = [motor.run_to_absolute_position(p, target, speed)
+             for p, target, speed in pose if abs((motor.absolute_position(p) or 0) - target) > RESET_TOL]
+    for m in moves:
+        await m
+    reset_moved[0] += len(moves)
+    reset_moved[1] += len(pose) - len(moves)
+    return len(moves)
 
 async def reset():
-    """Safely return robot to starting position."""
-    await motor.run_to_absolute_position(port.C, 0, SPEED)    # Center body first
-    await runloop.sleep_ms(600)
-    await motor.run_to_absolute_position(port.A, Lmid, int(SPEED * 0.5))
-    await runloop.sleep_ms(500)
-    await motor.run_to_absolute_position(port.B, Rmid, int(SPEED * 0.5))
-    await runloop.sleep_ms(700)
+    """Safely return robot to starting position (only the motors that are off, all at once)."""
+    if await reset_motors(START_POSE):
+        await runloop.sleep_ms(700)
 
 async def print_q_table(Q, title):
     """Print the full 8×6 Q-table in a clean format."""
@@ -101,25 +274,205 @@ async def print_q_table(Q, title):
         print(row)
     print("-" * 100)
 
+# === Q-TABLE DELTA LOG (QDelta.py) ===
+# QDELTA,episode,state,action,value for every cell whose value (4 decimals) changed and
+# FLIP,episode,state,old_action,new_action when a greedy action changes. Episode 0 logs
+# every cell, so QDelta.py can rebuild the table at any episode from these lines alone.
+q_logged = [[None] * 6 for _ in range(8)]  # Last logged value of every cell
+
+def logged_best(s):
+    return max(allowed(s), key=lambda a: q_logged[s][a])
+
+def log_q_deltas(Q, ep):
+    changed = flips = 0
+    for s in range(8):
+        old_best = logged_best(s) if ep else None
+        for a in range(6):
+            v = round(Q[s][a], 4)
+            if v != q_logged[s][a]:
+                q_logged[s][a] = v
+                changed += 1
+                print("QDELTA,{0},{1},{2},{3}".format(ep, s, a, v))
+        new_best = logged_best(s)
+        if ep and new_best != old_best:
+            flips += 1
+            print("FLIP,{0},{1},{2},{3}".format(ep, s, old_best, new_best))
+    print("Q-table episode {0}: {1} cells changed, {2} greedy flips".format(ep, changed, flips))
+
+# === ONLINE LEARNING-CURVE STATISTICS ===
+# O(1) per episode: running mean/variance (Welford), EWMA, rolling mean over a ring buffer
+# and converged/diverging flags – the same definitions as Stats.py on the computer.
+stats = {"n": 0, "mean": 0.0, "m2": 0.0, "ewma": 0.0, "best": None,
+         "ring": [0.0] * STATS_WINDOW, "sum": 0.0, "rolling": 0.0, "stable": 0, "falling": 0}
+
+def update_stats(r):
+    st = stats
+    st["n"] += 1
+    n = st["n"]
+    d = r - st["mean"]
+    st["mean"] += d / n
+    st["m2"] += d * (r - st["mean"])
+    st["ewma"] = r if n == 1 else st["ewma"] + STATS_ALPHA * (r - st["ewma"])
+    i = (n - 1) % STATS_WINDOW
+    st["sum"] += r - st["ring"][i]                      # Ring buffer: swap the oldest reward out
+    st["ring"][i] = r
+    prev = st["rolling"]
+    st["rolling"] = st["sum"] / min(n, STATS_WINDOW)
+    settled = n > STATS_WINDOW and abs(st["rolling"] - prev) <= CONVERGE_TOL * max(abs(st["rolling"]), 1.0)
+    st["stable"] = st["stable"] + 1 if settled else 0
+    if st["best"] is None or st["ewma"] > st["best"]:
+        st["best"] = st["ewma"]
+    below = st["ewma"] < st["best"] - DIVERGE_DROP * max(abs(st["best"]), 1.0)
+    st["falling"] = st["falling"] + 1 if below else 0
+    if st["falling"] >= DIVERGE_EPISODES:
+        return "diverging"
+    return "converged" if st["stable"] >= STATS_WINDOW else "learning"
+
+# STATS,episode,mean,std,ewma,rolling,status
+def print_stats(ep, status):
+    st = stats
+    std = (st["m2"] / (st["n"] - 1)) ** 0.5 if st["n"] > 1 else 0.0
+    print("STATS,{0},{1:.2f},{2:.2f},{3:.2f},{4:.2f},{5}".format(ep, st["mean"], std, st["ewma"], st["rolling"], status))
+
+# === EPISODE LOG (EpisodeLog.py) ===
+# Episode rows are packed into a fixed buffer of LOG_CHUNK binary records that is appended
+# to LOG_FILE on the hub's flash whenever it fills. RAM use does not grow with the number of
+# episodes, and a crash loses at most the last chunk. The CSV table at the end is streamed
+# back from the file one record at a time.
+LOG_HEADER = "<4sBBI"                               # Magic, format version, experiment, seed
+LOG_RECORD = "<HfHf"                                # Episode, reward, cycles, epsilon
+LOG_SIZE = struct.calcsize(LOG_RECORD)
+log_buf = bytearray(LOG_CHUNK * LOG_SIZE)           # Records not yet on flash
+log_count = 0
+
+def log_start(seed):
+    """Start a new LOG_FILE for this run."""
+    with open(LOG_FILE, "wb") as f:
+        f.write(struct.pack(LOG_HEADER, b"QLEP", 1, 33, seed & 0xFFFFFFFF))
+
+def log_flush():
+    global log_count
+    if log_count:
+        with open(LOG_FILE, "ab") as f:
+            f.write(memoryview(log_buf)[:log_count * LOG_SIZE])
+        log_count = 0
+
+def log_episode(ep, reward, cycles, eps):
+    global log_count
+    struct.pack_into(LOG_RECORD, log_buf, log_count * LOG_SIZE, ep, reward, cycles, eps)
+    log_count += 1
+    if log_count == LOG_CHUNK:
+        log_flush()
+
+def print_log():
+    """CSV rows of the whole run, read back from flash."""
+    log_flush()
+    rec = bytearray(LOG_SIZE)
+    with open(LOG_FILE, "rb") as f:
+        f.seek(struct.calcsize(LOG_HEADER))
+        while f.readinto(rec) == LOG_SIZE:
+            ep, reward, cycles, eps = struct.unpack(LOG_RECORD, rec)
+            print("{0},{1},{2},{3}".format(ep, round(reward, 2), cycles, round(eps, 5)))
+
+# === MEMORY PROFILER ===
+# With MEM_PROFILE on, gc.mem_alloc() / gc.mem_free() are sampled at every step and episode
+# boundary. A drop in allocated bytes between two samples means the heap was collected on its
+# own (counted as an automatic GC). mem_wrap() charges the bytes a call allocates to a
+# subsystem and keeps the peak; with MEM_PROFILE off it hands back the plain function, so the
+# training loop pays nothing for the profiler. Every episode prints
+#   MEM,episode,allocated,free,peak_allocated,live_after_gc,automatic_gcs
+# and print_mem_report() ends the run with the budget per subsystem.
+mem = {"peak": 0, "min_free": 1 << 30, "last": 0, "gcs": 0}
+mem_use = {}                      # Subsystem -> most bytes one call allocated
+
+def mem_wrap(name, f):
+    """f; with MEM_PROFILE a wrapper that charges the bytes f allocates to subsystem name."""
+    if not MEM_PROFILE:
+        return f
+    def profiled(*args):
+        a = gc.mem_alloc()
+        result = f(*args)
+        used = gc.mem_alloc() - a
+        if used > mem_use.get(name, 0):
+            mem_use[name] = used
+        return result
+    return profiled
+
+def mem_sample():
+    """Step boundary: peak allocation, lowest free heap and automatic collections."""
+    alloc = gc.mem_alloc()
+    if alloc < mem["last"]:
+        mem["gcs"] += 1
+    mem["last"] = alloc
+    mem["peak"] = max(mem["peak"], alloc)
+    mem["min_free"] = min(mem["min_free"], gc.mem_free())
+
+def mem_episode(ep):
+    """Episode boundary: MEM line, after a collection that shows what stays live."""
+    mem_sample()
+    alloc, free = gc.mem_alloc(), gc.mem_free()
+    gc.collect()
+    mem["last"] = gc.mem_alloc()            # Our own collection is not an automatic one
+    print("MEM,{0},{1},{2},{3},{4},{5}".format(ep, alloc, free, mem["peak"], mem["last"], mem["gcs"]))
+
+q_lambda_update = mem_wrap("Q update", q_lambda_update)
+log_episode = mem_wrap("episode log", log_episode)
+log_q_deltas = mem_wrap("logging", log_q_deltas)
+update_stats = mem_wrap("stats", update_stats)
+print_stats = mem_wrap("logging", print_stats)
+
+def mem_size(make):
+    """Bytes taken by the object make() builds (a copy of a live structure)."""
+    gc.collect()
+    a = gc.mem_alloc()
+    copy = make()
+    size = gc.mem_alloc() - a
+    copy = None
+    return size
+
+def print_mem_report(Q):
+    if not MEM_PROFILE:
+        return
+    retained = [
+        ("Q-table", mem_size(lambda: [[v * 1.0 for v in row] for row in Q])),
+        ("Q delta log", mem_size(lambda: [[v if v is None else v * 1.0 for v in row] for row in q_logged])),
+        ("stats", mem_size(lambda: dict(stats, ring=[v * 1.0 for v in stats["ring"]]))),
+        ("episode log", mem_size(lambda: bytearray(log_buf))),
+        ("distance ring", mem_size(lambda: list(samples))),
+    ]
+    gc.collect()
+    heap = gc.mem_alloc() + gc.mem_free()
+    print("\n" + "=" * 80)
+    print(" MEMORY BUDGET ".center(80))
+    print("=" * 80)
+    print("Heap: {0} bytes | peak allocated: {1} ({2}%) | lowest free: {3}".format(
+        heap, mem["peak"], 100 * mem["peak"] // heap, mem["min_free"]))
+    print("Live after training: {0} bytes | automatic collections: {1}".format(gc.mem_alloc(), mem["gcs"]))
+    print("{0:16} {1:>10}".format("Retained", "bytes"))
+    for name, size in retained:
+        print("{0:16} {1:10d}".format(name, size))
+    print("{0:16} {1:>10}".format("Per call (peak)", "bytes"))
+    for name in sorted(mem_use):
+        print("{0:16} {1:10d}".format(name, mem_use[name]))
+
 async def main():
-    global old_dist
+    global old_dist, sampling
 
     print("\n" + "="*100)
     print(" EXPERIMENT 3 – SEEDED VERSION ".center(100))
-    print(" Smart starting hints | Start 150–200 mm | Gentle rewards ".center(100))
+    print(" Smart starting hints | Start {0}–{1} mm | Gentle rewards ".format(START_MIN, START_MAX).center(100))
     print("="*100)
 
+    seed = SEED if SEED is not None else time.ticks_ms()
+    random.seed(seed)
+    log_start(seed)
+    print("Seed: {0}".format(seed))
+
     await reset()
     await light_matrix.write("E3")
 
-    # Wait for correct starting distance
-    print("Place target 150–200 mm away on the mattress...")
-    while True:
-        d = safe_dist()
-        if 150 <= d <= 200:
-            print("Good starting distance: {0} mm".format(d))
-            break
-        await runloop.sleep_ms(500)
+    # Wait for correct starting distance (event-driven, see wait_for_start())
+    await wait_for_start(0)
 
     # SEEDED Q-TABLE – gives the robot a strong starting policy
     Q = [
@@ -134,18 +487,24 @@ async def main():
     ]
 
     await print_q_table(Q, "INITIAL Q-TABLE (SEEDED – SMART HINTS)")
+    if Q_LOG != "full":
+        log_q_deltas(Q, 0)
 
     epsilon = EPSILON_START
-    csv_data = []
+    masked_moves = 0
 
     for ep in range(1, EPISODES + 1):
         await reset()
         s = get_state()
-        old_dist = safe_dist()
+        old_dist = await wait_for_start(ep, START_CHECK)   # Repositioned if it walked out of the band
         start_dist = old_dist
+        if TRACE_STEPS:
+            trace_step(ep, 0, s, -1, s, old_dist, 0)
         total_reward = 0
         steps = 0
         goal_reached = False
+        masked = 0
+        traces = [[], []]
 
         print("\nEPISODE {0} | EPSILON = {1:.4f}".format(ep, epsilon))
 
@@ -153,17 +512,31 @@ async def main():
             steps = t
 
             # Epsilon-greedy: explore or exploit
-            if random.random() < epsilon:
+            explore = random.random() < epsilon
+            if explore:
                 a = random.randint(0, 5)
             else:
                 best_q = max(Q[s])
                 best_actions = [i for i, q in enumerate(Q[s]) if q == best_q]
                 a = random.choice(best_actions)
 
-            await move(a)
+            # Action mask: redirect no-op leg moves before they reach the motors
+            if not ACTION_MASK[s][a]:
+                masked += 1
+                if explore:
+                    a = random.choice(allowed(s))
+                else:
+                    best_q = masked_max(Q, s)
+                    a = random.choice([i for i in allowed(s) if Q[s][i] == best_q])
+
+            t0 = time.ticks_ms()
+            move_ms = await move(a)
 
             ns = get_state()
-            new_d = safe_dist()
+            new_d = await read_dist(settled_at)
+            step_ms = time.ticks_diff(time.ticks_ms(), t0)   # Whole step: move + settle + reading
+            if TRACE_STEPS:
+                trace_step(ep, t, s, a, ns, new_d, move_ms)
             delta = old_dist - new_d# Positive = got closer
 
             r = 0
@@ -192,8 +565,13 @@ async def main():
                 goal_reached = True
                 print("    GOAL REACHED! +50")
 
+            if TIME_PENALTY:
+                r -= TIME_PENALTY * step_ms / 1000   # Slow steps cost reward
+
             total_reward += r
-            Q[s][a] += ALPHA * (r + GAMMA * max(Q[ns]) - Q[s][a])
+            q_lambda_update(Q, traces, s, a, r, ns, step_discount(step_ms))
+            if MEM_PROFILE:
+                mem_sample()
 
             if goal_reached:
                 print("\nSUCCESS IN {0} STEPS! Total Reward = {1}".format(steps, total_reward))
@@ -208,22 +586,42 @@ async def main():
         distance_covered = start_dist - new_d
         print("Distance Covered: {0} mm".format(distance_covered))
 
-        csv_data.append([ep, total_reward, steps, round(epsilon, 5)])
+        print("Masked moves: {0}".format(masked))
+        masked_moves += masked
+
+        log_episode(ep, total_reward, steps, epsilon)
         epsilon = max(EPSILON_END, epsilon * EPSILON_DECAY)
 
-        await print_q_table(Q, "Q-TABLE AFTER EPISODE {0}".format(ep))
+        if Q_LOG == "full":
+            await print_q_table(Q, "Q-TABLE AFTER EPISODE {0}".format(ep))
+        else:
+            log_q_deltas(Q, ep)
         await light_matrix.write(str(ep % 10))
+        status = update_stats(total_reward)
+        print_stats(ep, status)
+        if MEM_PROFILE:
+            mem_episode(ep)
+        if ABORT_ON_DIVERGE and status == "diverging":
+            print("Run is diverging – training stopped after episode {0}".format(ep))
+            break
+
+    if Q_LOG != "full":
+        await print_q_table(Q, "FINAL Q-TABLE AFTER EPISODE {0}".format(ep))   # Evaluate.py reads it
 
     # Final results
     print("\n" + "="*80)
     print(" TRAINING COMPLETE – SEEDED VERSION ".center(80))
+    print("Seed: {0}".format(seed))
     print("Episode,Reward,Cycles,Epsilon")
-    for row in csv_data:
-        print("{0},{1},{2},{3}".format(row[0], row[1], row[2], row[3]))
+    print_log()
+    print("Masked moves during training: {0}".format(masked_moves))
+    print("Reset: {0} motors moved, {1} already in place".format(*reset_moved))
+    print_mem_report(Q)
 
     await light_matrix.write("E3")
     for f in [1000, 1500, 2000, 2500, 3000]:
         sound.play(f, 400)
         await runloop.sleep_ms(400)
+    sampling = False
 
-runloop.run(main())
\ No newline at end of file
+runloop.run(main(), sampler())
\ No newline at end of file
@@ -0,0 +1,280 @@
+# ==================== EXPERIMENT DEFINITIONS (HOST MIRROR OF THE HUB SCRIPTS) ====================
+# States, actions, masks, motor targets, rewards and hyperparameters of Experiment1/11,
+# Experiment2/22 and Experiment3/33, in one place so host tools (simulator, trainer,
+# benchmarks) run exactly the task the robot runs.
+# Keep these tables in sync with the hub scripts when a script changes.
+
+# === MOTOR PORTS ===
+A, B, C = "A", "B", "C"   # Left legs, right legs, body tilt
+
+
+class Experiment:
+    """One experiment definition. Every field mirrors a constant or function of the hub script."""
+
+    def __init__(self, name, script, states, actions, mask, moves, sleeps, get_state, reward,
+                 alpha, gamma, epsilon, epsilon_decay, epsilon_min, episodes, max_steps,
+                 seed_q=None, start_state=None, uses_distance=False, random_ties=False,
+                 avoid_repeat=0.0, forced_action=None, after_update=None, rule="q", lam=0.0,
+                 strokes=None, distance_samples=1, step_ms=500, time_penalty=0.0, smdp=False,
+                 walk_action=None, stuck_state=None):
+        self.key = None                     # Registry key ("1", "11", ...), set below
+        self.name = name
+        self.script = script                # Hub script this definition mirrors
+        self.states = states
+        self.actions = actions
+        self.mask = mask                    # ACTION_MASK table (1 = allowed)
+        self.moves = moves                  # Per action: (port, target degrees, speed deg/s)
+        self.sleeps = sleeps                # Per action: settle sleep after the move (ms)
+        self.get_state = get_state          # get_state({port: position}) -> state index
+        self.reward = reward                # reward(s, a, ns, old_d, new_d) -> (reward, cycle, goal)
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.epsilon_decay = epsilon_decay
+        self.epsilon_min = epsilon_min
+        self.episodes = episodes
+        self.max_steps = max_steps
+        self.seed_q = seed_q                # Hand-seeded Q-table (None = all zeros)
+        self.start_state = start_state      # State assumed after reset (None = read from motors)
+        self.uses_distance = uses_distance  # Distance sensor rewards; "Cycles" column = steps
+        self.random_ties = random_ties      # Break greedy ties randomly (Experiment 3)
+        self.avoid_repeat = avoid_repeat    # Chance to swap a repeated action (Experiment 1)
+        self.forced_action = forced_action  # forced_action(episode, s) -> action or None
+        self.after_update = after_update    # after_update(Q, s) – post-update Q clamp
+        self.rule = rule                    # Update rule name from QLearning.UPDATE_RULES
+        self.lam = lam                      # λ when the q_lambda rule is chosen (--rule q_lambda)
+        self.strokes = strokes or {}        # Simulator default: {(s, a): mm moved forward}
+        self.distance_samples = distance_samples  # Readings behind one filtered distance (SAMPLE_WINDOW)
+        self.step_ms = step_ms              # Nominal step time (STEP_MS) – γ applies per step_ms with smdp
+        self.time_penalty = time_penalty    # TIME_PENALTY: reward lost per second of step time
+        self.smdp = smdp                    # SMDP_DISCOUNT: discount by step duration instead of per step
+        self.walk_action = walk_action      # walk_action(s, greedy) -> action walk_forever() plays (None = greedy(s))
+        self.stuck_state = stuck_state      # STUCK state label (walk_cycles counts it as a miss), or None
+
+    @property
+    def num_states(self):
+        return len(self.states)
+
+    @property
+    def num_actions(self):
+        return len(self.actions)
+
+
+# ==================== EXPERIMENT 1 / 11 – 4 STATES, 4 ACTIONS ====================
+EXP1_STATES = ["Lmid Level", "Lmid Lup", "Lfwd Lup", "Lfwd Level"]
+EXP1_ACTIONS = ["C.Lup", "A.Lfwd", "C.Level", "A.Lmid"]
+EXP1_MASK = [
+    [1, 0, 0, 0],
+    [0, 1, 1, 0],
+    [0, 0, 1, 1],
+    [1, 0, 0, 1],
+]
+EXP1_MOVES = [(C, 150, 1000), (A, 45, 1000), (C, 0, 1000), (A, 0, 1000)]
+EXP1_SLEEPS = [680, 520, 680, 520]
+EXP1_STROKES = {(3, 3): 20.0}          # Legs back to middle with body level pushes the bug forward
+
+
+def exp1_state(pos):
+    lp, tp = pos[A], pos[C]
+    if abs(lp) < 28 and tp < 70: return 0
+    if abs(lp) < 28 and tp > 90: return 1
+    if lp > 25 and tp > 90: return 2
+    if lp > 25 and tp < 70: return 3
+    return 0
+
+
+def exp1_reward(s, a, ns, old_d=None, new_d=None):
+    if s == 0 and a == 0 and ns == 1: return 3.0, False, False
+    if s == 1 and a == 1 and ns == 2: return 4.0, False, False
+    if s == 2 and a == 2 and ns == 3: return 5.0, False, False
+    if s == 3 and a == 3 and ns == 0: return 6.0, True, False
+    return -0.2, False, False
+
+
+def exp11_reward(s, a, ns, old_d=None, new_d=None):
+    if s == 3 and a == 3 and ns == 0:
+        return 4.1, True, False
+    return (0.3 if s != ns else 0.1), False, False
+
+
+def exp11_forced(episode, s):
+    return 0 if episode <= 5 and s == 0 else None
+
+
+def exp11_walk(s, greedy):
+    return 0 if s == 0 else greedy(s)       # Always lift body first from Lmid Level
+
+
+# ==================== EXPERIMENT 2 / 22 – 8 STATES, 6 ACTIONS ====================
+EXP2_STATES = ["0 Lmid Rmid Lup", "1 Lfwd Rmid Lup", "2 Lfwd Rmid Rup", "3 Lmid Rmid Rup",
+               "4 Lmid Rfdw Rup", "5 Lmid Rfdw Lup", "6 Lmid Rmid Lup", "7 STUCK"]
+EXP2_ACTIONS = ["A.Lfwd", "C.Rup", "A.Lmid", "B.Rfwd", "C.Lup", "B.Rmid"]
+EXP2_MASK = [
+    [1, 1, 0, 1, 0, 0],
+    [0, 1, 1, 1, 0, 0],
+    [0, 0, 1, 1, 1, 0],
+    [1, 0, 0, 1, 1, 0],
+    [1, 0, 0, 0, 1, 1],
+    [1, 1, 0, 0, 0, 1],
+    [1, 1, 0, 1, 0, 0],
+    [1, 1, 1, 1, 1, 1],
+]
+EXP2_MOVES = [(A, 50, 1000), (C, 0, 1000), (A, 0, 1000), (B, -50, 1000), (C, 140, 1000), (B, 0, 1000)]
+EXP2_SLEEPS = [380] * 6
+EXP2_STROKES = {(2, 2): 20.0, (4, 5): 20.0}
+EXP22_SEED_Q = [[1.5 if (s == a and s <= 5) else 0.0 for a in range(6)] for s in range(8)]
+
+
+def exp2_state(pos):
+    lp, rp, tp = pos[A], pos[B], pos[C]
+    l_mid, l_fwd = abs(lp) < 30, lp > 20
+    r_mid, r_fwd = abs(rp) < 30, rp < -20
+    body_up = tp > 80
+    if l_mid and r_mid and body_up: return 0
+    if l_fwd and r_mid and body_up: return 1
+    if l_fwd and r_mid and not body_up: return 2
+    if l_mid and r_mid and not body_up: return 3
+    if l_mid and r_fwd and not body_up: return 4
+    if l_mid and r_fwd and body_up: return 5
+    return 7
+
+
+def exp2_reward(s, a, ns, old_d=None, new_d=None):
+    if s == 0 and ns == 6: return 20.0, True, False
+    if ns == 6: return 10.0, False, False
+    if a in [0, 3]: return 2.0, False, False
+    if ns == 7: return -8.0, False, False
+    return 0.0, False, False
+
+
+def exp22_forced(episode, s):
+    return s if episode <= 15 and s <= 5 else None
+
+
+def exp22_clamp(Q, s):
+    if s <= 5:
+        Q[s][s] = max(Q[s][s], 1.4)
+
+
+def exp2_walk(s, greedy):
+    return greedy(0 if s == 7 else s)       # STUCK restarts from state 0
+
+
+def exp22_walk(s, greedy):
+    return s if s <= 5 else 0               # Hard-coded sequence; the Q-table is not used
+
+
+# ==================== EXPERIMENT 3 / 33 – 8 STATES, 6 ACTIONS, DISTANCE SENSOR ====================
+EXP3_STATES = ["0 up Lfwd Rmid", "1 up Lmid Rfwd", "2 down Lmid Rmid", "3 down Lfwd Rmid",
+               "4 down Lmid Rfwd", "5 up Lmid Rmid", "6 down Lfwd Rfwd", "7 unknown"]
+EXP3_ACTIONS = ["Lup", "Rup", "Lfwd", "Lmid", "Rfwd", "Rmid"]
+EXP3_MASK = [
+    [1, 1, 0, 1, 1, 0],
+    [1, 1, 1, 0, 0, 1],
+    [1, 1, 1, 0, 1, 0],
+    [1, 1, 0, 1, 1, 0],
+    [1, 1, 1, 0, 0, 1],
+    [1, 1, 1, 0, 1, 0],
+    [1, 1, 0, 1, 0, 1],
+    [1, 1, 1, 1, 1, 1],
+]
+EXP3_MOVES = [(C, 140, 950), (C, -140, 950), (A, 60, 475), (A, 0, 475), (B, 60, 475), (B, 0, 475)]
+EXP3_SLEEPS = [150] * 6
+EXP3_STROKES = {(3, 3): 15.0, (4, 5): 15.0, (0, 3): 10.0, (1, 5): 10.0}
+EXP33_SEED_Q = [
+    [0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+    [0.0, 1.0, 0.0, 0.0, 0.0, 0.0],
+    [0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+    [0.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+    [1.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [0.0, 0.0, 0.0, 0.0, 0.0, 1.0],
+    [0.0] * 6,
+    [0.0] * 6,
+]
+GOAL_MM = 85                   # Goal reached below this distance
+START_MM = (150, 200)          # Required starting distance
+LOST_MM = 999                  # safe_dist() value for a missing reading
+
+
+def exp3_state(pos):
+    a, b, c = pos[A], pos[B], pos[C]
+    left_mid, left_fwd = abs(a) < 45, abs(a - 60) < 45
+    right_mid, right_fwd = abs(b) < 45, abs(b - 60) < 45
+    body_up = c > 80 or c < -80
+    body_down = abs(c) < 85
+    if body_up and left_fwd and right_mid: return 0
+    if body_up and right_fwd and left_mid: return 1
+    if body_down and left_mid and right_mid: return 2
+    if body_down and left_fwd and right_mid: return 3
+    if body_down and right_fwd and left_mid: return 4
+    if body_up and left_mid and right_mid: return 5
+    if body_down and left_fwd and right_fwd: return 6
+    return 7
+
+
+def exp3_reward(s, a, ns, old_d, new_d):
+    delta = old_d - new_d
+    if new_d >= LOST_MM:
+        r = -20
+    elif delta > 0:
+        r = min(20, delta)
+    elif delta < 0:
+        r = max(-8, delta)
+    else:
+        r = -2
+    cycle = s in [0, 1] and ns == 2
+    if cycle:
+        r += 10
+    goal = new_d < GOAL_MM
+    if goal:
+        r += 50
+    return r, cycle, goal
+
+
+# ==================== REGISTRY ====================
+EXPERIMENTS = {
+    "1": Experiment("Experiment 1", "Experiment1.py", EXP1_STATES, EXP1_ACTIONS, EXP1_MASK,
+                    EXP1_MOVES, EXP1_SLEEPS, exp1_state, exp1_reward,
+                    alpha=0.35, gamma=0.92, epsilon=0.3, epsilon_decay=0.97, epsilon_min=0.1,
+                    episodes=20, max_steps=30, start_state=0, avoid_repeat=0.3,
+                    strokes=EXP1_STROKES, step_ms=700),
+    "11": Experiment("Experiment 11", "Experiment11.py", EXP1_STATES, EXP1_ACTIONS, EXP1_MASK,
+                     EXP1_MOVES, EXP1_SLEEPS, exp1_state, exp11_reward,
+                     alpha=0.35, gamma=0.92, epsilon=0.3, epsilon_decay=0.92, epsilon_min=0.1,
+                     episodes=20, max_steps=30, start_state=0, avoid_repeat=0.3,
+                     seed_q=[[1.0 if s == a else 0.0 for a in range(4)] for s in range(4)],
+                     forced_action=exp11_forced, walk_action=exp11_walk, strokes=EXP1_STROKES, step_ms=700),
+    "2": Experiment("Experiment 2", "Experiment2.py", EXP2_STATES, EXP2_ACTIONS, EXP2_MASK,
+                    EXP2_MOVES, EXP2_SLEEPS, exp2_state, exp2_reward,
+                    alpha=0.55, gamma=0.9, epsilon=0.7, epsilon_decay=0.93, epsilon_min=0.1,
+                    episodes=30, max_steps=40, start_state=0, lam=0.8,
+                    walk_action=exp2_walk, stuck_state=7, strokes=EXP2_STROKES, step_ms=450),
+    "22": Experiment("Experiment 22", "Experiment22.py", EXP2_STATES, EXP2_ACTIONS, EXP2_MASK,
+                     EXP2_MOVES, EXP2_SLEEPS, exp2_state, exp2_reward,
+                     alpha=0.55, gamma=0.9, epsilon=0.7, epsilon_decay=0.93, epsilon_min=0.1,
+                     episodes=30, max_steps=40, start_state=0, lam=0.8,
+                     seed_q=EXP22_SEED_Q, forced_action=exp22_forced, after_update=exp22_clamp,
+                     walk_action=exp22_walk, stuck_state=7, strokes=EXP2_STROKES, step_ms=450),
+    "3": Experiment("Experiment 3", "Experiment3.py", EXP3_STATES, EXP3_ACTIONS, EXP3_MASK,
+                    EXP3_MOVES, EXP3_SLEEPS, exp3_state, exp3_reward,
+                    alpha=0.5, gamma=0.95, epsilon=0.9, epsilon_decay=0.95, epsilon_min=0.05,
+                    episodes=40, max_steps=50, uses_distance=True, random_ties=True,
+                    lam=0.8, strokes=EXP3_STROKES, distance_samples=5, step_ms=300),
+    "33": Experiment("Experiment 33", "Experiment33.py", EXP3_STATES, EXP3_ACTIONS, EXP3_MASK,
+                     EXP3_MOVES, EXP3_SLEEPS, exp3_state, exp3_reward,
+                     alpha=0.5, gamma=0.95, epsilon=0.9, epsilon_decay=0.95, epsilon_min=0.05,
+                     episodes=40, max_steps=50, uses_distance=True, random_ties=True,
+                     lam=0.8, seed_q=EXP33_SEED_Q, strokes=EXP3_STROKES,
+                     distance_samples=5, step_ms=300),
+}
+
+for _key, _exp in EXPERIMENTS.items():
+    _exp.key = _key
+
+
+def get_experiment(key):
+    """Look up an experiment by its number ("1", "11", "2", "22", "3", "33")."""
+    key = str(key)
+    if key not in EXPERIMENTS:
+        raise ValueError("Unknown experiment '{}' (choose from {})".format(key, ", ".join(EXPERIMENTS)))
+    return EXPERIMENTS[key]
@@ -0,0 +1,237 @@
+# ==================== MULTI-ROBOT FLEET TRAINING (ONE SHARED Q-TABLE) ====================
+# Several robots – real ones behind HubServer.py or simulated stand-ins – explore at the
+# same time and feed one shared Q-table:
+#
+#   robot 0 ──┐                         ┌──► policy snapshot (read by every robot)
+#   robot 1 ──┼──► transition queue ──► learner: batched updates ──┘
+#   robot N ──┘
+#
+# Everything runs in one asyncio event loop, so the learner is the only writer of the
+# Q-table and needs no locks; robots act on the latest pushed snapshot. Each robot keeps
+# its own ε schedule, random stream and eligibility traces.
+#
+# Usage:
+#   python Fleet.py 3 --robots 4                                  4 simulated robots
+#   python Fleet.py 3 --robots 1 2 4 8 --total-episodes 160       wall-clock scaling sweep
+#   python Fleet.py 2 --connect hubA:8765 hubB:8765 --save-q q_fleet.json
+#
+# Simulated robots sleep for --time-scale × their simulated step time, so the sweep shows
+# how wall-clock time to convergence falls as robots are added.
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from Benchmark import convergence_episode
+from Experiments import get_experiment
+from QLearning import Traces, action_mask, make_batch, new_table, update
+from Simulator import BugSim, load_profile
+from Train import EPISODIC_RULES, choose_action, make_streams, step_gamma, step_reward, with_timing
+
+BATCH_MAX = 64                  # Transitions merged per learner update
+PUSH_EVERY = 8                  # Transitions between policy snapshots
+DEFAULT_TIME_SCALE = 0.01       # Simulated robots: sleep 1% of the simulated step time
+
+# Queue items: (robot, s, a, r, ns, done, na, γ, ε, first step of the episode)
+FIRST = 9
+
+
+class Fleet:
+    """Shared learner state: Q-table, policy snapshot, transition queue and episode log."""
+
+    def __init__(self, exp, rule=None, seed=0, push_every=PUSH_EVERY, batch_max=BATCH_MAX):
+        self.exp = exp
+        self.rule = rule or exp.rule
+        if self.rule in EPISODIC_RULES:
+            raise ValueError("Fleet training needs a per-step rule, not '{}'".format(self.rule))
+        self.mask = action_mask(exp.mask)
+        self.Q = new_table(exp.num_states, exp.num_actions, self.rule, exp.seed_q)
+        self.policy = self.Q.copy()         # Snapshot the robots act on
+        self.version = 0                    # Number of pushed snapshots
+        self.push_every = push_every
+        self.batch_max = batch_max
+        self.queue = asyncio.Queue()
+        self.traces = {}                    # robot id -> Traces
+        self.rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(1 << 16,)))
+        self.updates = 0
+        self.episodes = []                  # (wall s, robot, episode, reward, cycles/steps, ε)
+        self.start = time.perf_counter()
+
+    # === LEARNER ===
+    def apply(self, batch):
+        """Merge one drained batch: each robot's transitions in order, with its own traces."""
+        exp = self.exp
+        by_robot = {}
+        for item in batch:
+            by_robot.setdefault(item[0], []).append(item)
+        for robot, items in by_robot.items():
+            traces = self.traces.setdefault(robot, Traces())
+            # A new episode clears the robot's traces, so split its run at episode starts
+            cuts = [i for i, item in enumerate(items) if item[FIRST] and i] + [len(items)]
+            start = 0
+            for end in cuts:
+                part = items[start:end]
+                if part[0][FIRST]:
+                    traces.clear()
+                update(self.rule, self.Q, make_batch([item[1:7] for item in part]), exp.alpha,
+                       np.array([item[7] for item in part]), mask=self.mask, epsilon=part[-1][8],
+                       rng=self.rng, traces=traces, lam=exp.lam)
+                if exp.after_update:
+                    for item in part:
+                        exp.after_update(self.Q if self.Q.ndim == 2 else self.Q[0], item[1])
+                start = end
+        before = self.updates
+        self.updates += len(batch)
+        if self.updates // self.push_every != before // self.push_every:
+            self.policy = self.Q.copy()
+            self.version += 1
+
+    async def learner(self):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_max and not self.queue.empty():
+                nxt = self.queue.get_nowait()
+                if nxt is None:
+                    self.apply(batch)
+                    return
+                batch.append(nxt)
+            self.apply(batch)
+            await asyncio.sleep(0)          # Let the robots run between batches
+
+    # === ROBOTS ===
+    async def robot(self, rid, env, agent_rng, episodes, blocking=False, time_scale=0.0):
+        """One robot's episode loop; transitions go to the learner queue."""
+        exp = self.exp
+        loop = asyncio.get_running_loop()
+
+        async def call(fn, *args):
+            if blocking:
+                return await loop.run_in_executor(None, fn, *args)
+            return fn(*args)
+
+        epsilon = exp.epsilon
+        for ep in range(1, episodes + 1):
+            s, d = await call(env.reset)
+            total, cycles, steps = 0.0, 0, 0
+            a = choose_action(exp, self.policy, self.mask, s, epsilon, agent_rng, ep)
+            for t in range(1, exp.max_steps + 1):
+                ns, new_d, ms = await call(env.step, a)
+                if time_scale:
+                    await asyncio.sleep(time_scale * ms / 1000.0)
+                r, cycle, goal = step_reward(exp, s, a, ns, d, new_d, ms)
+                na = choose_action(exp, self.policy, self.mask, ns, epsilon, agent_rng, ep, a)
+                await self.queue.put((rid, s, a, r, ns, goal, na, step_gamma(exp, ms), epsilon, t == 1))
+                total += r
+                cycles += cycle
+                steps = t
+                if goal:
+                    break
+                s, d, a = ns, new_d, na
+            self.episodes.append((time.perf_counter() - self.start, rid, ep, round(total, 2),
+                                  steps if exp.uses_distance else cycles, round(epsilon, 5)))
+            epsilon = max(exp.epsilon_min, epsilon * exp.epsilon_decay)
+
+
+async def run_fleet(exp, envs, episodes, rule=None, seed=0, blocking=False, time_scale=0.0,
+                    push_every=PUSH_EVERY):
+    """Train one shared Q-table with every env in envs; returns the Fleet when all are done."""
+    fleet = Fleet(exp, rule, seed, push_every)
+    learner = asyncio.ensure_future(fleet.learner())
+    robots = [fleet.robot(rid, env, make_streams(seed, rid)[1], episodes, blocking, time_scale)
+              for rid, env in enumerate(envs)]
+    await asyncio.gather(*robots)
+    await fleet.queue.put(None)
+    await learner
+    fleet.wall = time.perf_counter() - fleet.start
+    return fleet
+
+
+def sim_robots(exp, count, seed, profile=None):
+    return [BugSim(exp, make_streams(seed, rid)[0], profile) for rid in range(count)]
+
+
+def summarize(fleet):
+    """Wall-clock and episode counts at convergence of the fleet-wide reward curve."""
+    rewards = [row[3] for row in fleet.episodes]
+    conv = min(convergence_episode(rewards), len(rewards))
+    return {"robots": len({row[1] for row in fleet.episodes}), "episodes": len(rewards),
+            "wall_s": round(fleet.wall, 3), "convergence_episode": conv,
+            "wall_to_convergence_s": round(fleet.episodes[conv - 1][0], 3) if rewards else 0.0,
+            "final_reward": round(float(np.mean(rewards[-5:])), 3) if rewards else 0.0,
+            "updates": fleet.updates, "policy_pushes": fleet.version}
+
+
+def print_sweep(exp, results):
+    print("=" * 90)
+    print("FLEET TRAINING – {}".format(exp.name))
+    print("=" * 90)
+    print("{:>7} {:>9} {:>9} {:>11} {:>14} {:>10} {:>11}".format(
+        "robots", "episodes", "wall s", "conv. ep", "wall→conv s", "speedup", "final rew"))
+    print("-" * 90)
+    base = results[0]["wall_to_convergence_s"]
+    for res in results:
+        speedup = base / res["wall_to_convergence_s"] if res["wall_to_convergence_s"] else 0.0
+        print("{:7d} {:9d} {:9.3f} {:11d} {:14.3f} {:9.2f}x {:11.2f}".format(
+            res["robots"], res["episodes"], res["wall_s"], res["convergence_episode"],
+            res["wall_to_convergence_s"], speedup, res["final_reward"]))
+    print("-" * 90)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train one shared Q-table with several robots.")
+    parser.add_argument("experiment", help="1, 11, 2, 22, 3 or 33")
+    parser.add_argument("--robots", nargs="+", type=int, default=[4], help="simulated robots (several = sweep)")
+    parser.add_argument("--connect", nargs="+", default=None, help="host:port of HubServer bridges / stand-ins")
+    parser.add_argument("--total-episodes", type=int, default=None,
+                        help="episodes shared by the fleet (default: the experiment's per robot)")
+    parser.add_argument("--time-scale", type=float, default=DEFAULT_TIME_SCALE)
+    parser.add_argument("--push-every", type=int, default=PUSH_EVERY)
+    parser.add_argument("--rule", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", default=None, help="simulator profile JSON (from Calibrate.py)")
+    parser.add_argument("--time-penalty", type=float, default=None)
+    parser.add_argument("--smdp", action="store_true", default=None)
+    parser.add_argument("--save-q", default=None, help="write the shared Q-table (last run) as JSON")
+    args = parser.parse_args(argv)
+
+    exp = with_timing(get_experiment(args.experiment), args.time_penalty, args.smdp)
+    profile = load_profile(args.profile) if args.profile else None
+    runs = []
+    if args.connect:
+        from Remote import RemoteBug, SocketLink
+
+        envs = []
+        for addr in args.connect:
+            host, port = addr.rsplit(":", 1)
+            envs.append(RemoteBug(exp, SocketLink(host, int(port))))
+        per_robot = -(-args.total_episodes // len(envs)) if args.total_episodes else exp.episodes
+        runs.append(asyncio.run(run_fleet(exp, envs, per_robot, args.rule, args.seed, blocking=True,
+                                          push_every=args.push_every)))
+        for env in envs:
+            env.close()
+    else:
+        for count in args.robots:
+            per_robot = -(-args.total_episodes // count) if args.total_episodes else exp.episodes
+            runs.append(asyncio.run(run_fleet(exp, sim_robots(exp, count, args.seed, profile), per_robot,
+                                              args.rule, args.seed, time_scale=args.time_scale,
+                                              push_every=args.push_every)))
+    print_sweep(exp, [summarize(fleet) for fleet in runs])
+
+    if args.save_q:
+        fleet = runs[-1]
+        with open(args.save_q, "w") as f:
+            json.dump({"experiment": exp.key, "seed": args.seed, "rule": fleet.rule,
+                       "robots": summarize(fleet)["robots"], "Q": np.round(fleet.Q, 6).tolist()}, f)
+        print("Q-table saved as: {}".format(args.save_q))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
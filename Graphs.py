@@ -1,99 +1,164 @@
 # ==================== LEGO SPIKE Q-LEARNING CHARTS (VS CODE) ====================
 # Save this as: plot_robot_data.py
 # Works with ALL your experiments: 1A, 1B, 3A, 3B
+#
+# Usage:
+#   python Graphs.py                                   chart CSV_FILE below
+#   python Graphs.py "Experiment 2.csv" --name "Experiment 2"
+#   python Graphs.py run1.csv run2.csv --summary       text summary only (fast, no matplotlib)
+#
+# matplotlib and pandas are only imported when a chart is drawn, so --summary starts in a
+# fraction of the time – handy when a batch pipeline calls this for many small CSVs.
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
+import argparse
+import csv
 from datetime import datetime
 
 # === CHANGE THIS TO YOUR EXPERIMENT NAME ===
 EXPERIMENT_NAME = "Experiment 3"
 CSV_FILE = "Experiment 3.csv"   # ← Paste your robot's CSV output here!
 
-# Load data (copy-paste from robot terminal into a file)
-df = pd.read_csv(CSV_FILE)
+WINDOW = 3                      # Moving-average window (also used for convergence)
+CONVERGENCE_TOL = 0.1           # Same definition as Benchmark.convergence_episode()
+GOAL_MM = 60
 
-# Auto-detect columns
-has_distance = 'Final_Distance_mm' in df.columns or 'Distance' in df.columns
 
-# Create beautiful plots
-plt.style.use('seaborn-v0_8-darkgrid')
+# === TEXT SUMMARY (no pandas / matplotlib) ===
+def read_rows(path):
+    """CSV rows as dicts of floats (copy-paste from robot terminal into a file)."""
+    with open(path, newline="") as f:
+        return [{k.strip(): float(v) for k, v in row.items() if k and v not in (None, "")}
+                for row in csv.DictReader(f)]
 
-if has_distance:
-    fig = plt.figure(figsize=(14, 10))
-    
-    # === 1. Reward over Episodes ===
-    ax1 = plt.subplot(2, 2, 1)
-    plt.plot(df['Episode'], df['Reward'], 'o-', color='green', linewidth=2, markersize=4)
-    plt.title(f'{EXPERIMENT_NAME}\nTotal Reward per Episode', fontsize=14, fontweight='bold')
-    plt.xlabel('Episode')
-    plt.ylabel('Total Reward')
-    plt.grid(True, alpha=0.3)
-    
-    # === 2. Final Distance (only for Experiment 3) ===
-    ax2 = plt.subplot(2, 2, 2)
-    dist_col = 'Final_Distance_mm' if 'Final_Distance_mm' in df.columns else 'Distance'
-    plt.plot(df['Episode'], df[dist_col], 's-', color='purple', linewidth=2, markersize=5)
-    plt.axhline(y=60, color='red', linestyle='--', linewidth=2, label='Goal: <60mm')
-    plt.axhline(y=30, color='darkred', linestyle=':', linewidth=2, label='Crash Zone')
-    plt.title('Distance to Target (Lower = Better)', fontsize=14, fontweight='bold')
-    plt.xlabel('Episode')
-    plt.ylabel('Distance (mm)')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    
-    # === 3. Moving Average Reward ===
-    ax3 = plt.subplot(2, 2, 3)
-    window = 3
-    if len(df) > window:
-        moving_avg = df['Reward'].rolling(window=window, min_periods=1).mean()
-        plt.plot(df['Episode'], df['Reward'], 'o-', color='lightgreen', alpha=0.5, label='Raw Reward')
-        plt.plot(df['Episode'], moving_avg, '*-', color='darkgreen', linewidth=3, label=f'{window}-Episode Avg')
-    else:
-        plt.plot(df['Episode'], df['Reward'], 'o-', color='green')
-    plt.title('Learning Progress (Smoothed)', fontsize=14, fontweight='bold')
-    plt.xlabel('Episode')
-    plt.ylabel('Reward')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    
-    # === 4. Final Summary ===
-    ax4 = plt.subplot(2, 2, 4)
-    plt.axis('off')
-    final_reward = df['Reward'].iloc[-1]
-    final_dist = df[dist_col].iloc[-1] if has_distance else "N/A"
-    text = f"""
+
+def distance_column(columns):
+    for name in ("Final_Distance_mm", "Distance"):
+        if name in columns:
+            return name
+    return None
+
+
+def convergence_episode(rewards, window=WINDOW, tol=CONVERGENCE_TOL):
+    """First episode after which the rolling mean reward stays within tol of its final value."""
+    if len(rewards) < window:
+        return len(rewards)
+    rolling = [sum(rewards[i:i + window]) / window for i in range(len(rewards) - window + 1)]
+    final = rolling[-1]
+    band = tol * max(abs(final), 1.0)
+    outside = [i for i, value in enumerate(rolling) if abs(value - final) > band]
+    first = outside[-1] + 1 if outside else 0
+    return first + window
+
+
+def summarize(rows):
+    rewards = [row["Reward"] for row in rows]
+    dist_col = distance_column(rows[0]) if rows else None
+    summary = {"episodes": len(rows),
+               "best_reward": max(rewards) if rewards else 0.0,
+               "final_reward": rewards[-1] if rewards else 0.0,
+               "convergence_episode": convergence_episode(rewards)}
+    if dist_col:
+        summary["final_distance"] = rows[-1][dist_col]
+    return summary
+
+
+def print_summary(name, summary):
+    line = "{}: episodes {} | best reward {:.1f} | final reward {:.1f} | converged at episode {}".format(
+        name, summary["episodes"], summary["best_reward"], summary["final_reward"], summary["convergence_episode"])
+    if "final_distance" in summary:
+        line += " | final distance {:.0f} mm".format(summary["final_distance"])
+    print(line)
+
+
+# === CHARTS ===
+def plot(csv_file, experiment_name):
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    # Load data (copy-paste from robot terminal into a file)
+    df = pd.read_csv(csv_file)
+
+    # Auto-detect columns
+    dist_col = distance_column(df.columns)
+    has_distance = dist_col is not None
+
+    # Create beautiful plots
+    plt.style.use('seaborn-v0_8-darkgrid')
+
+    if has_distance:
+        fig = plt.figure(figsize=(14, 10))
+
+        # === 1. Reward over Episodes ===
+        ax1 = plt.subplot(2, 2, 1)
+        plt.plot(df['Episode'], df['Reward'], 'o-', color='green', linewidth=2, markersize=4)
+        plt.title(f'{experiment_name}\nTotal Reward per Episode', fontsize=14, fontweight='bold')
+        plt.xlabel('Episode')
+        plt.ylabel('Total Reward')
+        plt.grid(True, alpha=0.3)
+
+        # === 2. Final Distance (only for Experiment 3) ===
+        ax2 = plt.subplot(2, 2, 2)
+        plt.plot(df['Episode'], df[dist_col], 's-', color='purple', linewidth=2, markersize=5)
+        plt.axhline(y=GOAL_MM, color='red', linestyle='--', linewidth=2, label=f'Goal: <{GOAL_MM}mm')
+        plt.axhline(y=30, color='darkred', linestyle=':', linewidth=2, label='Crash Zone')
+        plt.title('Distance to Target (Lower = Better)', fontsize=14, fontweight='bold')
+        plt.xlabel('Episode')
+        plt.ylabel('Distance (mm)')
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+
+        # === 3. Moving Average Reward ===
+        ax3 = plt.subplot(2, 2, 3)
+        plot_smoothed(plt, df)
+
+        # === 4. Final Summary ===
+        ax4 = plt.subplot(2, 2, 4)
+        plt.axis('off')
+        final_reward = df['Reward'].iloc[-1]
+        final_dist = df[dist_col].iloc[-1]
+        text = f"""
 FINAL RESULTS
 Episodes: {len(df)}
 Best Reward: {df['Reward'].max():.1f}
 Final Reward: {final_reward:.1f}
 Final Distance: {final_dist} mm
-Success: {"YES!" if has_distance and final_dist < 60 else "Learning..."}
+Success: {"YES!" if final_dist < GOAL_MM else "Learning..."}
 Time: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 """
-    plt.text(0.1, 0.7, text, fontsize=14, fontfamily='monospace',
-             bbox=dict(boxstyle="round,pad=1", facecolor="lightyellow", alpha=0.9))
-
-else:
-    # For experiments without distance (Experiment 1)
-    fig = plt.figure(figsize=(14, 5))
-    
-    # === 1. Reward over Episodes ===
-    ax1 = plt.subplot(1, 2, 1)
-    plt.plot(df['Episode'], df['Reward'], 'o-', color='green', linewidth=2, markersize=4)
-    plt.title(f'{EXPERIMENT_NAME}\nTotal Reward per Episode', fontsize=14, fontweight='bold')
-    plt.xlabel('Episode')
-    plt.ylabel('Total Reward')
-    plt.grid(True, alpha=0.3)
-    
-    # === 2. Moving Average Reward ===
-    ax2 = plt.subplot(1, 2, 2)
-    window = 3
-    if len(df) > window:
-        moving_avg = df['Reward'].rolling(window=window, min_periods=1).mean()
+        plt.text(0.1, 0.7, text, fontsize=14, fontfamily='monospace',
+                 bbox=dict(boxstyle="round,pad=1", facecolor="lightyellow", alpha=0.9))
+
+    else:
+        # For experiments without distance (Experiment 1)
+        fig = plt.figure(figsize=(14, 5))
+
+        # === 1. Reward over Episodes ===
+        ax1 = plt.subplot(1, 2, 1)
+        plt.plot(df['Episode'], df['Reward'], 'o-', color='green', linewidth=2, markersize=4)
+        plt.title(f'{experiment_name}\nTotal Reward per Episode', fontsize=14, fontweight='bold')
+        plt.xlabel('Episode')
+        plt.ylabel('Total Reward')
+        plt.grid(True, alpha=0.3)
+
+        # === 2. Moving Average Reward ===
+        ax2 = plt.subplot(1, 2, 2)
+        plot_smoothed(plt, df)
+
+    plt.suptitle(f"{experiment_name}", fontsize=18, fontweight='bold', y=0.98)
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+
+    # Save high-quality image (before show(), which clears the figure when its window closes)
+    out = f"{experiment_name.replace(' ', '_')}_results.png"
+    plt.savefig(out, dpi=300, bbox_inches='tight')
+    print(f"Chart saved as: {out}")
+    plt.show()
+
+
+def plot_smoothed(plt, df):
+    if len(df) > WINDOW:
+        moving_avg = df['Reward'].rolling(window=WINDOW, min_periods=1).mean()
         plt.plot(df['Episode'], df['Reward'], 'o-', color='lightgreen', alpha=0.5, label='Raw Reward')
-        plt.plot(df['Episode'], moving_avg, '*-', color='darkgreen', linewidth=3, label=f'{window}-Episode Avg')
+        plt.plot(df['Episode'], moving_avg, '*-', color='darkgreen', linewidth=3, label=f'{WINDOW}-Episode Avg')
     else:
         plt.plot(df['Episode'], df['Reward'], 'o-', color='green')
     plt.title('Learning Progress (Smoothed)', fontsize=14, fontweight='bold')
@@ -102,10 +167,17 @@ else:
     plt.legend()
     plt.grid(True, alpha=0.3)
 
-plt.suptitle(f"{EXPERIMENT_NAME}", fontsize=18, fontweight='bold', y=0.98)
-plt.tight_layout(rect=[0, 0, 1, 0.95])
-plt.show()
 
-# Save high-quality image
-plt.savefig(f"{EXPERIMENT_NAME.replace(' ', '_')}_results.png", dpi=300, bbox_inches='tight')
-print(f"Chart saved as: {EXPERIMENT_NAME.replace(' ', '_')}_results.png")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chart or summarize robot CSV output.")
+    parser.add_argument("csv", nargs="*", default=[CSV_FILE])
+    parser.add_argument("--name", default=None, help="chart title (default: EXPERIMENT_NAME, or the file name)")
+    parser.add_argument("--summary", action="store_true", help="print a text summary only (no matplotlib)")
+    args = parser.parse_args()
+
+    for path in args.csv:
+        name = args.name or (EXPERIMENT_NAME if path == CSV_FILE else path.rsplit(".", 1)[0])
+        if args.summary:
+            print_summary(name, summarize(read_rows(path)))
+        else:
+            plot(path, name)
@@ -0,0 +1,126 @@
+# ==================== HUB ACTUATOR / SENSOR SERVER (REMOTE TRAINING) ====================
+# Thin server for Remote.py: the computer runs the learning engine, the hub only moves the
+# motors and reads the sensors. Works for every experiment – the host sends the motor
+# targets of its actions once (CONFIG), then one STEP frame per action.
+#
+# Frames travel over the USB serial link (sys.stdin / sys.stdout), little-endian:
+#   request  <BBBb      magic 0xA5, op, sequence number, argument (action index / count)
+#   reply    <BBBBhHH3h magic, op, sequence, status, distance mm, move ms, step ms, A, B, C degrees
+#   CONFIG   request + <B distance samples (0 = no sensor) + per action <Bhhh port, target, speed, sleep ms
+#
+# The host may send the next STEP before this one is answered (pipelining); frames simply
+# wait in the USB buffer until the current move has finished.
+
+from hub import port, light_matrix
+import motor
+import distance_sensor
+import runloop
+import struct
+import sys
+import time
+
+MAGIC = 0xA5
+OP_PING, OP_CONFIG, OP_RESET, OP_STEP, OP_READ, OP_STOP = 0, 1, 2, 3, 4, 5
+OK, BAD_ACTION, NOT_CONFIGURED = 0, 1, 2
+
+REQUEST = "<BBBb"
+REPLY = "<BBBBhHH3h"
+ACTION = "<Bhhh"
+
+PORTS = [port.A, port.B, port.C]    # Port index 0, 1, 2 in CONFIG frames
+DIST_PORT = port.F                  # Distance sensor
+SAMPLE_MS = 20                      # Pause between distance samples
+RESET_SPEED = 1000
+RESET_SLEEP = 300
+RESET_TOL = 5                       # Degrees off the start pose that need no reset move
+
+moves = []                          # Per action: (port, target, speed, sleep ms)
+samples = 0                         # Distance readings per observation (median), 0 = no sensor
+
+link_in = sys.stdin.buffer
+link_out = sys.stdout.buffer
+
+def read_exact(n):
+    data = b""
+    while len(data) < n:
+        data += link_in.read(n - len(data))
+    return data
+
+def read_request():
+    """Next request frame; bytes before a magic byte are skipped (resynchronises after noise)."""
+    while read_exact(1)[0] != MAGIC:
+        pass
+    return struct.unpack(REQUEST, bytes([MAGIC]) + read_exact(3))
+
+def positions():
+    return [motor.absolute_position(p) or 0 for p in PORTS]
+
+async def read_distance():
+    """Median of the valid readings out of `samples` (999 if none is valid)."""
+    valid = []
+    for i in range(samples):
+        d = distance_sensor.distance(DIST_PORT)
+        if d is not None and 0 < d <= 1000:
+            valid.append(d)
+        if i < samples - 1:
+            await runloop.sleep_ms(SAMPLE_MS)
+    if not valid:
+        return 999
+    valid.sort()
+    return valid[len(valid) // 2]
+
+async def reply(op, seq, status, move_ms=0, t0=None):
+    d = await read_distance() if samples else 0
+    step_ms = time.ticks_diff(time.ticks_ms(), t0) if t0 is not None else 0
+    a, b, c = positions()
+    link_out.write(struct.pack(REPLY, MAGIC, op, seq, status, d, min(move_ms, 65535), min(step_ms, 65535), a, b, c))
+
+def configure(count):
+    global moves, samples
+    samples = read_exact(1)[0]
+    size = struct.calcsize(ACTION)
+    moves = []
+    for _ in range(count):
+        p, target, speed, sleep = struct.unpack(ACTION, read_exact(size))
+        moves.append((PORTS[p], target, speed, sleep))
+
+async def reset():
+    """Start pose like the training scripts' smart reset: only the motors more than RESET_TOL
+    off are moved, all at once (each command starts when called, then all are awaited)."""
+    pending = [motor.run_to_absolute_position(p, 0, RESET_SPEED)
+               for p in (port.C, port.A, port.B) if abs(motor.absolute_position(p) or 0) > RESET_TOL]
+    for m in pending:
+        await m
+    if pending:
+        await runloop.sleep_ms(RESET_SLEEP)
+
+async def main():
+    await light_matrix.write("RX")
+    while True:
+        magic, op, seq, arg = read_request()
+        t0 = time.ticks_ms()
+        if op == OP_CONFIG:
+            configure(arg)
+            await reply(op, seq, OK)
+        elif op == OP_RESET:
+            await reset()
+            await reply(op, seq, OK, time.ticks_diff(time.ticks_ms(), t0), t0)
+        elif op == OP_STEP:
+            if not moves:
+                await reply(op, seq, NOT_CONFIGURED)
+            elif not 0 <= arg < len(moves):
+                await reply(op, seq, BAD_ACTION)
+            else:
+                p, target, speed, sleep = moves[arg]
+                await motor.run_to_absolute_position(p, target, speed)
+                move_ms = time.ticks_diff(time.ticks_ms(), t0)
+                await runloop.sleep_ms(sleep)
+                await reply(op, seq, OK, move_ms, t0)
+        elif op == OP_STOP:
+            await reply(op, seq, OK)
+            break
+        else:                               # OP_PING, OP_READ
+            await reply(op, seq, OK)
+    await light_matrix.write("OK")
+
+runloop.run(main())
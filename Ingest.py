@@ -0,0 +1,229 @@
+# ==================== INCREMENTAL CSV INGESTION (NORMALIZED EPISODE TABLE) ====================
+# Every hub script (and Train.py --csv) prints the same header, Episode,Reward,Cycles,Epsilon,
+# but the columns do not mean the same thing everywhere:
+#
+#   Experiment 1/11/2/22   Cycles = full gait cycles in the episode
+#   Experiment 3/33        Cycles = steps taken (to the goal, or max_steps)
+#
+# Ingest.py detects each file's experiment, normalizes its rows into typed Episode records
+# (cycles and steps in separate fields) and keeps them in a store directory:
+#
+#   <store>/manifest.json          path -> size, mtime, sha256, experiment, episodes
+#   <store>/<sha256>-<key>.jsonl   normalized rows, one file per distinct content and experiment
+#
+# Re-running only reads files whose size or mtime changed, and only re-parses those whose
+# content hash changed, so re-ingesting thousands of sweep outputs costs time in proportion
+# to what changed.
+#
+# Usage:
+#   python Ingest.py Data/                              ingest every CSV under Data/
+#   python Ingest.py Data/ sweeps/ --store ingested --csv all_episodes.csv
+#   python Ingest.py "my run.csv" --experiment 33       name does not say which experiment
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+from Experiments import EXPERIMENTS, get_experiment
+
+DEFAULT_STORE = "ingested"
+MANIFEST = "manifest.json"
+DISTANCE_COLUMNS = ["Final_Distance_mm", "Distance"]
+NAME_KEY = re.compile(r"exp(?:eriment)?[\s_-]*(\d+)", re.IGNORECASE)   # "Experiment 3", "EXP 11", "exp33_seed7"
+
+# === NORMALIZED SCHEMA ===
+# experiment: Experiments.py key; cycles is None for distance experiments, steps and
+# distance (mm, when the CSV has it) are None for gait experiments
+Episode = namedtuple("Episode", ["experiment", "source", "episode", "reward", "epsilon", "cycles", "steps", "distance"])
+
+
+# === PARSING ===
+def read_csv_rows(path):
+    """Rows (dicts of strings) after the Episode,... header; other console lines are skipped."""
+    with open(path, newline="") as f:
+        lines = f.read().splitlines()
+    start = next((i for i, line in enumerate(lines) if line.replace(" ", "").startswith("Episode,")), None)
+    if start is None:
+        raise ValueError("{}: no Episode,... header found".format(path))
+    rows = []
+    for row in csv.DictReader(lines[start:]):
+        if None in row or not row.get("Episode", "").strip().isdigit():
+            continue                    # console noise pasted after the table
+        rows.append({k.strip(): v.strip() for k, v in row.items()})
+    return rows
+
+
+def detect_experiment(path, rows):
+    """Experiment key from the file name, else from the ε schedule in the rows."""
+    match = NAME_KEY.search(os.path.basename(path))
+    if match and match.group(1) in EXPERIMENTS:
+        return match.group(1)
+    return fingerprint(rows)
+
+
+def fingerprint(rows):
+    """Match the first two ε values against every experiment's start ε and decay."""
+    if len(rows) < 2:
+        raise ValueError("cannot detect the experiment from fewer than 2 rows")
+    eps0, eps1 = float(rows[0]["Epsilon"]), float(rows[1]["Epsilon"])
+    matches = [key for key, exp in EXPERIMENTS.items()
+               if abs(eps0 - exp.epsilon) < 1e-3
+               and abs(eps1 - max(exp.epsilon_min, exp.epsilon * exp.epsilon_decay)) < 1e-3]
+    if not matches:
+        raise ValueError("ε schedule {} → {} matches no experiment (pass --experiment)".format(eps0, eps1))
+    if len(matches) > 1:
+        raise ValueError("ε schedule {} → {} fits experiments {} (pass --experiment)".format(
+            eps0, eps1, ", ".join(matches)))
+    return matches[0]
+
+
+def normalize(rows, key, source):
+    """Typed Episode records for one file."""
+    exp = get_experiment(key)
+    dist_col = next((c for c in DISTANCE_COLUMNS if rows and c in rows[0]), None)
+    episodes = []
+    for row in rows:
+        count = int(float(row["Cycles"]))
+        episodes.append(Episode(key, source, int(row["Episode"]), float(row["Reward"]), float(row["Epsilon"]),
+                                None if exp.uses_distance else count,
+                                count if exp.uses_distance else None,
+                                float(row[dist_col]) if dist_col and row.get(dist_col) else None))
+    return episodes
+
+
+# === STORE ===
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(store):
+    path = os.path.join(store, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(store, manifest):
+    path = os.path.join(store, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)      # A crash never leaves half a manifest
+
+
+def records_path(store, entry):
+    return os.path.join(store, "{}-{}.jsonl".format(entry["sha256"], entry["experiment"]))
+
+
+def write_records(path, episodes):
+    with open(path + ".tmp", "w") as f:
+        for ep in episodes:
+            f.write(json.dumps(ep._asdict()) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def find_csvs(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                found += [os.path.join(root, name) for name in sorted(files) if name.lower().endswith(".csv")]
+        else:
+            found.append(path)
+    return [os.path.normpath(p) for p in found]
+
+
+def ingest(paths, store=DEFAULT_STORE, experiment=None):
+    """Bring the store up to date with the CSVs under paths; returns counts per outcome."""
+    os.makedirs(store, exist_ok=True)
+    manifest = load_manifest(store)
+    counts = {"new": 0, "changed": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    seen = set()
+    for path in find_csvs(paths):
+        seen.add(path)
+        stat = os.stat(path)
+        entry = manifest.get(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns \
+                and (experiment is None or entry["experiment"] == experiment):
+            counts["unchanged"] += 1    # Fast path: not even read
+            continue
+        digest = file_hash(path)
+        if entry and entry["sha256"] == digest and (experiment is None or entry["experiment"] == experiment):
+            entry["mtime_ns"] = stat.st_mtime_ns    # Touched, same content
+            counts["unchanged"] += 1
+            continue
+        try:
+            rows = read_csv_rows(path)
+            key = experiment or detect_experiment(path, rows)
+            episodes = normalize(rows, key, path)
+        except (ValueError, KeyError) as e:
+            print("SKIPPED {}: {}".format(path, e))
+            counts["failed"] += 1
+            continue
+        counts["changed" if entry else "new"] += 1
+        entry = manifest[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest,
+                                  "experiment": key, "episodes": len(episodes)}
+        if not os.path.exists(records_path(store, entry)):
+            write_records(records_path(store, entry), episodes)
+    for path in [p for p in manifest if p not in seen and not os.path.exists(p)]:
+        del manifest[path]
+        counts["removed"] += 1
+    save_manifest(store, manifest)
+    return counts
+
+
+def load_episodes(store=DEFAULT_STORE, experiment=None):
+    """Every normalized Episode in the store (optionally one experiment's)."""
+    episodes = []
+    for path, entry in sorted(load_manifest(store).items()):
+        if experiment is not None and entry["experiment"] != experiment:
+            continue
+        with open(records_path(store, entry)) as f:
+            for line in f:
+                record = json.loads(line)
+                record["source"] = path             # Identical files share one record file
+                episodes.append(Episode(**record))
+    return episodes
+
+
+def write_csv(episodes, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(Episode._fields)
+        for ep in episodes:
+            writer.writerow(["" if v is None else v for v in ep])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest robot/simulator CSVs into a normalized episode store.")
+    parser.add_argument("paths", nargs="+", help="CSV files or directories")
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    parser.add_argument("--experiment", default=None, help="experiment key for every file (skips detection)")
+    parser.add_argument("--csv", default=None, help="export every normalized episode as one CSV")
+    args = parser.parse_args(argv)
+
+    if args.experiment:
+        get_experiment(args.experiment)
+    start = time.perf_counter()
+    counts = ingest(args.paths, args.store, args.experiment)
+    print("Ingested in {:.3f} s: {}".format(time.perf_counter() - start,
+                                            ", ".join("{} {}".format(n, k) for k, n in counts.items())))
+    if args.csv:
+        episodes = load_episodes(args.store)
+        write_csv(episodes, args.csv)
+        print("{} episodes saved as: {}".format(len(episodes), args.csv))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+# ==================== LIVE TRAINING MONITOR ====================
+# Plots reward, distance and ε while a run is still going, from any stream of episode
+# records:
+#
+#   Train.py / Remote.py --log files       JSON lines, {"type": "episode", ...} records
+#   hub or host consoles                   "Episode N | Reward: ..." lines and CSV rows
+#   --train KEY                            a simulated run in this process
+#
+# The plot is never rebuilt: every line is created once and only gets new data (set_data).
+# Redraws are throttled to --fps, and each curve is decimated to at most MAX_POINTS bucket
+# means (the bucket size doubles whenever the curve fills up), so adding an episode is O(1)
+# and the monitor keeps up with simulated runs of hundreds of episodes per second.
+#
+# Usage:
+#   python Monitor.py --train 3 --seed 1
+#   python Monitor.py run.jsonl --wait                    follow a log that is still being written
+#   <hub console> | python Monitor.py -                   live hub console (stdin)
+#   python Monitor.py --train 1 --episodes 5000 --headless --snapshot exp1.png
+#
+# --headless (automatic without a display) draws off-screen and saves a PNG snapshot every
+# --snapshot-every seconds and at the end.
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from Stats import CSV_ROW, OnlineStats
+
+MAX_POINTS = 500                # Drawn points per curve
+DEFAULT_FPS = 4.0               # Redraws per second (at most)
+SNAPSHOT_EVERY = 5.0            # Seconds between PNG snapshots in headless mode
+WAIT_POLL = 0.2                 # Seconds between checks for new lines (--wait)
+EPISODE_LINE = re.compile(r"Episode (\d+) \| Reward: ([+-]?[\d.]+) \| Cycles: (\d+) \| ε: ([\d.]+)")
+
+
+# === EPISODE RECORDS ===
+def parse_record(line):
+    """Episode record dict (episode, reward, cycles, epsilon[, travelled]) from one line, "run"
+    for a log run header, or None."""
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        if data.get("type") == "run":
+            return "run"
+        if data.get("type") != "episode":
+            return None
+        return {"episode": data["ep"], "reward": data["reward"], "cycles": data["cycles"],
+                "epsilon": data["epsilon"], "travelled": data.get("travelled")}
+    match = EPISODE_LINE.search(line) or CSV_ROW.match(line)
+    if not match:
+        return None
+    ep, reward, cycles, epsilon = match.groups()
+    return {"episode": int(ep), "reward": float(reward), "cycles": int(cycles), "epsilon": float(epsilon),
+            "travelled": None}
+
+
+class Decimator:
+    """Bucket means of a curve, at most max_points of them; O(1) amortized per value."""
+
+    def __init__(self, max_points=MAX_POINTS):
+        self.max_points = max_points - max_points % 2
+        self.x, self.y = [], []
+        self.stride = 1                     # Values per bucket
+        self.sx = self.sy = 0.0
+        self.count = 0
+
+    def add(self, x, y):
+        self.sx += x
+        self.sy += y
+        self.count += 1
+        if self.count < self.stride:
+            return
+        self.x.append(self.sx / self.count)
+        self.y.append(self.sy / self.count)
+        self.sx = self.sy = 0.0
+        self.count = 0
+        if len(self.x) == self.max_points:  # Full: merge neighbours, double the bucket size
+            self.x = [(a + b) / 2 for a, b in zip(self.x[0::2], self.x[1::2])]
+            self.y = [(a + b) / 2 for a, b in zip(self.y[0::2], self.y[1::2])]
+            self.stride *= 2
+
+    def points(self):
+        """Completed buckets plus the one still filling."""
+        if not self.count:
+            return self.x, self.y
+        return self.x + [self.sx / self.count], self.y + [self.sy / self.count]
+
+
+# === MONITOR ===
+class Monitor:
+    """Three live panels – reward (+ EWMA), distance (or cycles/steps) and ε."""
+
+    def __init__(self, title, headless=False, snapshot=None, snapshot_every=SNAPSHOT_EVERY,
+                 fps=DEFAULT_FPS, max_points=MAX_POINTS):
+        import matplotlib
+        if headless:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        self.title = title
+        self.headless = headless
+        self.snapshot_path = snapshot or "{}_live.png".format(title.replace(" ", "_"))
+        self.snapshot_every = snapshot_every
+        self.interval = 1.0 / fps
+        self.fig, (self.ax_reward, self.ax_dist, self.ax_eps) = plt.subplots(3, 1, sharex=True, figsize=(10, 8))
+        self.curves = {name: Decimator(max_points) for name in ("reward", "ewma", "dist", "epsilon")}
+        self.lines = {
+            "reward": self.ax_reward.plot([], [], "-", color="lightgreen", label="Reward")[0],
+            "ewma": self.ax_reward.plot([], [], "-", color="darkgreen", linewidth=2, label="EWMA")[0],
+            "dist": self.ax_dist.plot([], [], "-", color="purple")[0],
+            "epsilon": self.ax_eps.plot([], [], "-", color="orange")[0],
+        }
+        self.ax_reward.set_ylabel("Reward")
+        self.ax_reward.legend(loc="upper left")
+        self.ax_dist.set_ylabel("Distance (mm)")
+        self.ax_eps.set_ylabel("ε")
+        self.ax_eps.set_xlabel("Episode")
+        for ax in (self.ax_reward, self.ax_dist, self.ax_eps):
+            ax.grid(True, alpha=0.3)
+        self.stats = OnlineStats()
+        self.episodes = 0
+        self.last_episode = 0
+        self.uses_travelled = None
+        self.start = time.perf_counter()
+        self.last_draw = 0.0
+        self.last_snapshot = self.start
+        if not headless:
+            plt.ion()
+            plt.show(block=False)
+
+    def add(self, record):
+        """One episode record; redraws when the frame interval has passed."""
+        if record == "run":
+            return
+        ep = record["episode"]
+        if ep <= self.last_episode:
+            return                          # Repeated rows (e.g. the CSV table after a console run)
+        self.last_episode = ep
+        self.episodes += 1
+        if self.uses_travelled is None:
+            self.uses_travelled = record.get("travelled") is not None
+            if not self.uses_travelled:
+                self.ax_dist.set_ylabel("Cycles / steps")
+        self.stats.update(record["reward"])
+        self.curves["reward"].add(ep, record["reward"])
+        self.curves["ewma"].add(ep, self.stats.ewma)
+        self.curves["dist"].add(ep, record["travelled"] if self.uses_travelled else record["cycles"])
+        self.curves["epsilon"].add(ep, record["epsilon"])
+        now = time.perf_counter()
+        if now - self.last_draw >= self.interval:
+            self.draw(now)
+
+    def draw(self, now=None):
+        now = now or time.perf_counter()
+        for name, line in self.lines.items():
+            line.set_data(*self.curves[name].points())
+        for ax in (self.ax_reward, self.ax_dist, self.ax_eps):
+            ax.relim()
+            ax.autoscale_view()
+        rate = self.episodes / max(now - self.start, 1e-9)
+        self.fig.suptitle("{} | episode {} | {:.0f} episodes/s | {}".format(
+            self.title, self.last_episode, rate, self.stats.status))
+        if self.headless:
+            if now - self.last_snapshot >= self.snapshot_every:
+                self.snapshot()
+                self.last_snapshot = now
+        else:
+            self.fig.canvas.draw_idle()
+            self.fig.canvas.flush_events()
+        self.last_draw = now
+
+    def snapshot(self):
+        self.fig.savefig(self.snapshot_path, dpi=100)
+
+    def close(self):
+        """Final frame: always drawn and saved."""
+        self.draw()
+        self.snapshot()
+        print("Snapshot saved as: {} ({} episodes)".format(self.snapshot_path, self.episodes))
+        if not self.headless:
+            self.plt.ioff()
+            self.plt.show()
+
+
+class LogTap:
+    """File-like sink for Train.train(log=...) that feeds its episode records to a Monitor."""
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+
+    def write(self, text):
+        if text.startswith('{"type": "episode"'):
+            self.monitor.add(parse_record(text))
+
+
+def follow_lines(f, wait=False):
+    """Lines of f; with wait, keep polling for lines appended later (Ctrl+C to stop)."""
+    while True:
+        line = f.readline()
+        if line:
+            yield line
+        elif wait:
+            time.sleep(WAIT_POLL)
+        else:
+            return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live plots of a training run.")
+    parser.add_argument("source", nargs="?", help="log / console file, or - for stdin")
+    parser.add_argument("--wait", action="store_true", help="keep following the file as it grows")
+    parser.add_argument("--train", default=None, help="simulate this experiment in-process instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--episodes", type=int, default=None)
+    parser.add_argument("--rule", default=None)
+    parser.add_argument("--profile", default=None, help="simulator profile JSON (from Calibrate.py)")
+    parser.add_argument("--headless", action="store_true", help="no window, PNG snapshots only")
+    parser.add_argument("--snapshot", default=None, help="PNG path (default: <title>_live.png)")
+    parser.add_argument("--snapshot-every", type=float, default=SNAPSHOT_EVERY)
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    args = parser.parse_args(argv)
+    if not args.train and not args.source:
+        parser.error("give a source file (or -) or --train")
+
+    headless = args.headless or (sys.platform.startswith("linux") and not os.environ.get("DISPLAY"))
+    if args.train:
+        from Experiments import get_experiment
+        from Simulator import load_profile
+        from Train import train
+
+        exp = get_experiment(args.train)
+        monitor = Monitor(exp.name, headless, args.snapshot, args.snapshot_every, args.fps)
+        profile = load_profile(args.profile) if args.profile else None
+        try:
+            train(exp, args.seed, rule=args.rule, episodes=args.episodes, profile=profile, log=LogTap(monitor))
+        except KeyboardInterrupt:
+            pass
+    else:
+        title = "stdin" if args.source == "-" else os.path.basename(args.source).rsplit(".", 1)[0]
+        monitor = Monitor(title, headless, args.snapshot, args.snapshot_every, args.fps)
+        f = sys.stdin if args.source == "-" else open(args.source)
+        try:
+            for line in follow_lines(f, args.wait):
+                record = parse_record(line)
+                if record:
+                    monitor.add(record)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if f is not sys.stdin:
+                f.close()
+    monitor.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# ==================== EXACT OPTIMUM OF THE GAIT MDPs (VALUE / POLICY ITERATION) ====================
+# Experiments 1/11 and 2/22 have no distance sensor: the next state depends only on the
+# motor positions, and those are fixed by the move targets in Experiments.py. Without the
+# simulator noise the task is a small known MDP, so the optimal Q* can be computed exactly
+# instead of being read off noisy reward curves:
+#
+#   model()             poses reachable from the reset pose → P (S, A, S), R (S, A) and the
+#                       discounted weights D = P·γ (γ per step, or per duration with --smdp)
+#   value_iteration()   Q ← R + D·max Q, all states and actions in one array operation
+#   policy_iteration()  exact policy evaluation (linear solve) + greedy improvement
+#
+# A state label can cover more than one pose (Experiment 2: STUCK, and state 0 right after
+# reset, which is the all-zero pose). Such (state, action) pairs are averaged over their
+# poses and listed as aliased – the model is exact everywhere else.
+#
+# Training runs are then scored by the first episode from which their greedy policy is
+# optimal (its exact value from the start state equals V*) and stays optimal to the end.
+#
+# Usage:
+#   python Optimal.py 1                                 Q*, π* and episodes to π* for seeds 0-4
+#   python Optimal.py 2 --seeds 0 1 2 3 4 5 6 7 8 9 --rule q --episodes 100
+#   python Optimal.py 22 --method policy --out optimal_exp22.json
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from Benchmark import DEFAULT_SEEDS
+from Experiments import A, B, C, get_experiment
+from QLearning import action_mask, greedy, masked, new_table
+from Train import step_gamma, step_reward, train, with_timing
+
+THETA = 1e-10                   # Value iteration stops when no Q-value moves more than this
+MAX_ITERATIONS = 100000
+OPTIMAL_TOL = 1e-6              # Greedy policy counts as optimal within this (relative) value gap
+METHODS = ("value", "policy")
+
+
+# === MODEL ===
+def model(exp):
+    """Noise-free transition model over the experiment's state labels.
+
+    Returns P (S, A, S) transition probabilities, R (S, A) expected rewards, D (S, A, S)
+    discounted transition weights, reachable (S,) bool and the aliased (state, action) pairs.
+    """
+    if exp.uses_distance:
+        raise ValueError("{} rewards distance-sensor readings – no exact model (use 1, 11, 2 or 22)".format(exp.name))
+    if exp.start_state is None:
+        raise ValueError("{} has no fixed start state".format(exp.name))
+    S, N = exp.num_states, exp.num_actions
+    mask = action_mask(exp.mask)
+    reset = (0.0, 0.0, 0.0)                 # Simulator/hub reset: every motor to 0
+    start = (reset, exp.start_state)        # Reset pose, labelled exp.start_state
+    nodes, frontier = {start}, [start]
+    P, R, D = np.zeros((S, N, S)), np.zeros((S, N)), np.zeros((S, N, S))
+    outcomes = {}                           # (s, a) -> set of next states seen
+    poses = np.zeros(S)                     # Poses behind each label
+    while frontier:
+        pose, s = frontier.pop()
+        poses[s] += 1
+        for a in np.flatnonzero(mask[s]):
+            port, target, speed = exp.moves[a]
+            pos = dict(zip((A, B, C), pose))
+            ms = 1000.0 * abs(target - pos[port]) / speed + exp.sleeps[a]
+            pos[port] = float(target)
+            ns = exp.get_state(pos)
+            r, _, goal = step_reward(exp, s, a, ns, 0, 0, ms)
+            P[s, a, ns] += 1
+            R[s, a] += r
+            D[s, a, ns] += 0.0 if goal else step_gamma(exp, ms)
+            outcomes.setdefault((s, a), set()).add(ns)
+            node = ((pos[A], pos[B], pos[C]), ns)
+            if node not in nodes:
+                nodes.add(node)
+                frontier.append(node)
+    reachable = poses > 0
+    weight = np.where(reachable, 1.0 / np.maximum(poses, 1), 0.0)[:, None]
+    P *= weight[..., None]
+    R *= weight
+    D *= weight[..., None]
+    aliased = sorted((int(s), int(a)) for (s, a), seen in outcomes.items() if len(seen) > 1)
+    return P, R, D, reachable, aliased
+
+
+# === SOLVERS ===
+def value_iteration(R, D, mask, theta=THETA, max_iterations=MAX_ITERATIONS):
+    """Q* by repeated Bellman optimality backups; returns (Q*, iterations)."""
+    Q = np.zeros(R.shape)
+    for it in range(1, max_iterations + 1):
+        V = masked(Q, mask).max(axis=1)
+        new = R + D @ V
+        if np.abs(new - Q).max() < theta:
+            return new, it
+        Q = new
+    raise RuntimeError("value iteration did not converge in {} iterations".format(max_iterations))
+
+
+def policy_value(R, D, policy):
+    """Exact V^π: solves (I − D_π) V = R_π."""
+    states = np.arange(len(policy))
+    return np.linalg.solve(np.eye(len(policy)) - D[states, policy], R[states, policy])
+
+
+def policy_iteration(R, D, mask, max_iterations=MAX_ITERATIONS):
+    """Q* by exact evaluation + greedy improvement; returns (Q*, iterations)."""
+    states = np.arange(R.shape[0])
+    policy = mask.argmax(axis=1)            # First allowed action everywhere
+    for it in range(1, max_iterations + 1):
+        Q = R + D @ policy_value(R, D, policy)
+        best = greedy(Q, states, mask)
+        keep = Q[states, policy] >= Q[states, best] - THETA     # Ties keep the current action (no cycling)
+        new = np.where(keep, policy, best)
+        if np.array_equal(new, policy):
+            return Q, it
+        policy = new
+    raise RuntimeError("policy iteration did not converge in {} iterations".format(max_iterations))
+
+
+def solve(exp, method="value"):
+    """Exact solution of one experiment's gait MDP."""
+    if method not in METHODS:
+        raise ValueError("Unknown method '{}' (choose from {})".format(method, ", ".join(METHODS)))
+    P, R, D, reachable, aliased = model(exp)
+    mask = action_mask(exp.mask)
+    Q, iterations = (value_iteration if method == "value" else policy_iteration)(R, D, mask)
+    states = np.arange(exp.num_states)
+    return {"P": P, "R": R, "D": D, "Q": Q, "V": masked(Q, mask).max(axis=1), "mask": mask,
+            "policy": greedy(Q, states, mask), "reachable": reachable, "aliased": aliased,
+            "method": method, "iterations": iterations}
+
+
+# === EPISODES TO THE OPTIMUM ===
+def is_optimal(exp, solution, Q):
+    """True if the greedy policy of Q (hub tie-breaking: first best action) is worth V* from the start."""
+    policy = greedy(Q, np.arange(exp.num_states), solution["mask"])
+    value = policy_value(solution["R"], solution["D"], policy)[exp.start_state]
+    best = solution["V"][exp.start_state]
+    return bool(value >= best - OPTIMAL_TOL * max(abs(best), 1.0))
+
+
+def episodes_to_optimum(exp, solution, seed, rule=None, episodes=None):
+    """Train one seeded run; returns (first episode from which the greedy policy stays optimal
+    or None, final max |Q − Q*| over reachable allowed cells, episodes run)."""
+    Q = new_table(exp.num_states, exp.num_actions, rule or exp.rule, exp.seed_q)
+    optimal = []
+
+    def on_episode(row):
+        optimal.append(is_optimal(exp, solution, Q))
+
+    train(exp, seed, rule=rule, episodes=episodes, Q=Q, on_episode=on_episode)
+    first = len(optimal)
+    while first and optimal[first - 1]:
+        first -= 1
+    cells = solution["mask"] & solution["reachable"][:, None]
+    error = np.abs((Q.mean(axis=0) if Q.ndim == 3 else Q) - solution["Q"])[cells].max()
+    return (first + 1 if first < len(optimal) else None), float(error), len(optimal)
+
+
+# === REPORT ===
+def print_solution(exp, solution):
+    print("=" * 80)
+    print("OPTIMAL Q* – {} | {} iteration: {} iterations | γ {}{}".format(
+        exp.name, solution["method"], solution["iterations"], exp.gamma, " (SMDP)" if exp.smdp else ""))
+    print("=" * 80)
+    print("{:20}".format("State") + "".join("{:>9}".format(a) for a in exp.actions) + "   π*")
+    for s, name in enumerate(exp.states):
+        if not solution["reachable"][s]:
+            print("{:20} unreachable".format(name))
+            continue
+        cells = ["{:9.3f}".format(q) if ok else "{:>9}".format("–")
+                 for q, ok in zip(solution["Q"][s], solution["mask"][s])]
+        print("{:20}".format(name) + "".join(cells) + "   " + exp.actions[solution["policy"][s]])
+    print("-" * 80)
+    print("V*(start = state {}) = {:.3f}".format(exp.start_state, solution["V"][exp.start_state]))
+    if solution["aliased"]:
+        print("Aliased (state, action) pairs (averaged over poses): {}".format(solution["aliased"]))
+
+
+def print_runs(runs):
+    print("{:>6} {:>14} {:>14}".format("seed", "episodes to π*", "max |Q − Q*|"))
+    for run in runs:
+        print("{:6d} {:>14} {:14.3f}".format(run["seed"], "never" if run["episode"] is None else run["episode"],
+                                             run["q_error"]))
+    reached = [run["episode"] for run in runs if run["episode"] is not None]
+    print("-" * 80)
+    print("Reached π*: {}/{} runs | episodes to π*: mean {} | median {}".format(
+        len(reached), len(runs), "{:.1f}".format(np.mean(reached)) if reached else "–",
+        "{:.1f}".format(np.median(reached)) if reached else "–"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact Q* of a gait experiment and episodes each training run needs to reach it.")
+    parser.add_argument("experiment", help="1, 11, 2 or 22")
+    parser.add_argument("--method", default="value", choices=METHODS)
+    parser.add_argument("--seeds", nargs="*", type=int, default=DEFAULT_SEEDS, help="training runs to score (none: solve only)")
+    parser.add_argument("--rule", default=None, help="update rule for the training runs (default: the experiment's)")
+    parser.add_argument("--episodes", type=int, default=None)
+    parser.add_argument("--time-penalty", type=float, default=None, help="reward lost per second of step time")
+    parser.add_argument("--smdp", action="store_true", default=None, help="discount by step duration (γ per step_ms)")
+    parser.add_argument("--out", default=None, help="save Q*, π* and the run scores as JSON")
+    args = parser.parse_args(argv)
+
+    exp = with_timing(get_experiment(args.experiment), args.time_penalty, args.smdp)
+    solution = solve(exp, args.method)
+    print_solution(exp, solution)
+    runs = []
+    for seed in args.seeds:
+        episode, error, ran = episodes_to_optimum(exp, solution, seed, args.rule, args.episodes)
+        runs.append({"seed": seed, "episode": episode, "q_error": error, "episodes": ran})
+    if runs:
+        print_runs(runs)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"experiment": exp.key, "method": args.method, "rule": args.rule or exp.rule,
+                       "Q": np.round(solution["Q"], 6).tolist(), "policy": solution["policy"].tolist(),
+                       "aliased": solution["aliased"], "runs": runs}, f, indent=2)
+        print("Results saved as: {}".format(args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
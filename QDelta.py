@@ -0,0 +1,156 @@
+# ==================== SPARSE Q-TABLE DELTA LOG ====================
+# Instead of a full Q-table dump after every episode, only the cells whose (rounded) value
+# changed and the states whose greedy action flipped are recorded. Episode 0 holds every
+# cell, so the table at any episode is rebuilt by applying the deltas in order.
+#
+#   Hub scripts (Q_LOG = "delta"):   QDELTA,episode,state,action,value
+#                                    FLIP,episode,state,old_action,new_action
+#   Train.py --q-deltas log.jsonl:   one {"ep", "cells": [[flat index, value]], "flips"} per episode
+#
+# Usage:
+#   python QDelta.py qdeltas.jsonl                      policy-stability summary
+#   python QDelta.py hub_run.txt --experiment 2 --at 12 table after episode 12 (hub capture)
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from Experiments import get_experiment
+from QLearning import greedy
+
+DECIMALS = 4                    # Values are logged rounded – changes below this are not changes
+
+
+class QDeltaTracker:
+    """Changed cells and greedy flips per episode; reconstruct() rebuilds any episode's table."""
+
+    def __init__(self, Q0, mask=None, decimals=DECIMALS):
+        self.shape = Q0.shape
+        self.mask = mask
+        self.decimals = decimals
+        self.logged = np.round(Q0, decimals)            # Last logged value of every cell
+        self.greedy = self._greedy(self.logged)
+        self.records = [{"ep": 0, "cells": [[i, float(v)] for i, v in enumerate(self.logged.ravel())],
+                         "flips": []}]
+
+    def _greedy(self, Q):
+        return greedy(Q, np.arange(self.shape[-2]), self.mask)
+
+    def record(self, ep, Q):
+        """Log the cells that changed since the last record and the greedy flips they caused."""
+        current = np.round(Q, self.decimals)
+        changed = np.flatnonzero(current != self.logged)
+        self.logged.flat[changed] = current.flat[changed]
+        new_greedy = self._greedy(self.logged)
+        flipped = np.flatnonzero(new_greedy != self.greedy)
+        self.records.append({"ep": ep,
+                             "cells": [[int(i), float(self.logged.flat[i])] for i in changed],
+                             "flips": [[int(s), int(self.greedy[s]), int(new_greedy[s])] for s in flipped]})
+        self.greedy = new_greedy
+        return len(changed), len(flipped)
+
+    def reconstruct(self, ep):
+        """Q-table (as logged) after episode ep."""
+        Q = np.zeros(self.shape)
+        for rec in self.records:
+            if rec["ep"] > ep:
+                break
+            for i, v in rec["cells"]:
+                Q.flat[i] = v
+        return Q
+
+    def stability(self):
+        """Per-episode changed cells and flips, plus when the greedy policy last changed."""
+        episodes = self.records[1:]
+        flips = [len(rec["flips"]) for rec in episodes]
+        last_flip = max((rec["ep"] for rec in episodes if rec["flips"]), default=0)
+        return {"episodes": len(episodes),
+                "changed": [len(rec["cells"]) for rec in episodes],
+                "flips": flips,
+                "total_flips": sum(flips),
+                "stable_since": last_flip,
+                "flipping_states": sorted({f[0] for rec in episodes for f in rec["flips"]})}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            f.write(json.dumps({"type": "qdelta", "shape": list(self.shape), "decimals": self.decimals}) + "\n")
+            for rec in self.records:
+                f.write(json.dumps(rec) + "\n")
+
+
+def load(path):
+    """Tracker (records only) from a Train.py --q-deltas JSON-lines file."""
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get("type") != "qdelta":
+            raise ValueError("{} is not a Q-delta log".format(path))
+        tracker = QDeltaTracker.__new__(QDeltaTracker)
+        tracker.shape = tuple(header["shape"])
+        tracker.decimals = header["decimals"]
+        tracker.records = [json.loads(line) for line in f if line.strip()]
+    return tracker
+
+
+def parse_console(path, exp):
+    """Tracker (records only) from the QDELTA / FLIP lines of a hub console capture."""
+    records = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.strip().split(",")
+            if parts[0] not in ("QDELTA", "FLIP") or len(parts) != 5:
+                continue
+            rec = records.setdefault(int(parts[1]), {"ep": int(parts[1]), "cells": [], "flips": []})
+            if parts[0] == "QDELTA":
+                rec["cells"].append([int(parts[2]) * exp.num_actions + int(parts[3]), float(parts[4])])
+            else:
+                rec["flips"].append([int(parts[2]), int(parts[3]), int(parts[4])])
+    if 0 not in records:
+        raise ValueError("No QDELTA,0,... baseline in {} (run the hub script with Q_LOG = \"delta\")".format(path))
+    tracker = QDeltaTracker.__new__(QDeltaTracker)
+    tracker.shape = (exp.num_states, exp.num_actions)
+    tracker.decimals = DECIMALS
+    tracker.records = [records[ep] for ep in sorted(records)]
+    return tracker
+
+
+def print_summary(tracker, source):
+    st = tracker.stability()
+    cells = int(np.prod(tracker.shape))
+    logged = sum(len(rec["cells"]) for rec in tracker.records)
+    print("=" * 80)
+    print("Q-TABLE DELTAS – {} | {} episodes | {} cells".format(source, st["episodes"], cells))
+    print("=" * 80)
+    print("{:>8} {:>9} {:>7}".format("episode", "changed", "flips"))
+    for rec, changed, flips in zip(tracker.records[1:], st["changed"], st["flips"]):
+        print("{:8d} {:9d} {:7d}".format(rec["ep"], changed, flips))
+    print("-" * 80)
+    print("Greedy flips: {} in states {} | policy stable since episode {}".format(
+        st["total_flips"], st["flipping_states"] or "–", st["stable_since"]))
+    print("Logged cells: {} vs {} for full dumps ({:.1f}x smaller)".format(
+        logged, cells * (st["episodes"] + 1), cells * (st["episodes"] + 1) / max(logged, 1)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize or replay a sparse Q-table delta log.")
+    parser.add_argument("log", help="Train.py --q-deltas JSON lines, or a hub console capture")
+    parser.add_argument("--experiment", default=None, help="experiment key (needed for hub captures)")
+    parser.add_argument("--at", type=int, default=None, help="print the table after this episode")
+    args = parser.parse_args(argv)
+
+    if args.experiment:
+        tracker = parse_console(args.log, get_experiment(args.experiment))
+    else:
+        tracker = load(args.log)
+    if args.at is not None:
+        Q = tracker.reconstruct(args.at)
+        print("Q-table after episode {}:".format(args.at))
+        print(np.array2string(Q, precision=tracker.decimals, suppress_small=True))
+    else:
+        print_summary(tracker, args.log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
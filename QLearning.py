@@ -0,0 +1,257 @@
+# ==================== HOST-SIDE Q-LEARNING UPDATE KERNELS ====================
+# Vectorized (NumPy) versions of the update rules used by the robot scripts.
+# Every kernel updates a whole batch of transitions in one call, so the same code
+# serves one-step online learning on the host and large simulated sweeps.
+#
+#   Q-table:  float array of shape (states, actions)
+#             Double Q-learning uses shape (2, states, actions) – one table per estimator
+#   Mask:     optional bool array (states, actions), True = action allowed
+#             (the ACTION_MASK tables from the Experiment scripts, see action_mask())
+#
+# gamma may be a scalar or one discount per transition (semi-Markov steps of different
+# duration, see smdp_discount()).
+#
+# Batched updates read all targets from the table *before* the batch is applied and
+# accumulate repeated (state, action) pairs with np.add.at – feed single transitions
+# when strict sequential semantics matter.
+
+from collections import namedtuple
+
+import numpy as np
+
+# === TRANSITION BATCH ===
+# s, a, r, ns, done are 1-D arrays of equal length; na (next action) is only needed by SARSA
+Batch = namedtuple("Batch", ["s", "a", "r", "ns", "done", "na"])
+
+
+def make_batch(transitions):
+    """Build a Batch from (s, a, r, ns, done[, na]) tuples."""
+    cols = list(zip(*transitions))
+    na = np.asarray(cols[5], dtype=np.intp) if len(cols) > 5 else None
+    return Batch(np.asarray(cols[0], dtype=np.intp),
+                 np.asarray(cols[1], dtype=np.intp),
+                 np.asarray(cols[2], dtype=float),
+                 np.asarray(cols[3], dtype=np.intp),
+                 np.asarray(cols[4], dtype=bool),
+                 na)
+
+
+# === ACTION MASKS ===
+def action_mask(table):
+    """Convert a 0/1 ACTION_MASK table (list of lists) into a bool array."""
+    return np.asarray(table, dtype=bool)
+
+
+def masked(Q, mask=None):
+    """Q-values with disallowed actions set to -inf (every state needs one allowed action)."""
+    if mask is None:
+        return Q
+    return np.where(mask, Q, -np.inf)
+
+
+def greedy(Q, s, mask=None):
+    """Greedy action for each state in s (Double Q tables are summed first)."""
+    if Q.ndim == 3:
+        Q = Q.sum(axis=0)
+    return masked(Q, mask)[s].argmax(axis=-1)
+
+
+def policy_probs(Q, s, epsilon, mask=None):
+    """ε-greedy action probabilities over allowed actions, shape (len(s), actions)."""
+    if Q.ndim == 3:
+        Q = Q.sum(axis=0)
+    s = np.atleast_1d(s)
+    allowed = np.ones(Q[s].shape, dtype=bool) if mask is None else mask[s]
+    probs = epsilon * allowed / allowed.sum(axis=1, keepdims=True)
+    probs[np.arange(len(s)), masked(Q, mask)[s].argmax(axis=1)] += 1.0 - epsilon
+    return probs
+
+
+def smdp_discount(gamma, duration_ms, step_ms):
+    """Semi-Markov discount γ^(duration / step_ms): a step of step_ms is discounted by γ."""
+    return gamma ** (np.asarray(duration_ms, dtype=float) / step_ms)
+
+
+def _per_step(gamma, batch):
+    """gamma as one discount per transition."""
+    return np.broadcast_to(np.asarray(gamma, dtype=float), batch.r.shape)
+
+
+# === UPDATE KERNELS ===
+# Each kernel: kernel(Q, batch, alpha, gamma, mask=None, epsilon=0.0, rng=None, n=3,
+#                     traces=None, lam=0.8)
+# ignores the options it does not use, updates Q in place and returns the TD errors.
+
+def _apply(Q, s, a, target, alpha):
+    td = target - Q[s, a]
+    np.add.at(Q, (s, a), alpha * td)
+    return td
+
+
+def q_learning(Q, batch, alpha, gamma, mask=None, **_):
+    """One-step Q-learning: r + γ·max_a' Q[ns, a']."""
+    boot = masked(Q, mask)[batch.ns].max(axis=1)
+    target = batch.r + gamma * np.where(batch.done, 0.0, boot)
+    return _apply(Q, batch.s, batch.a, target, alpha)
+
+
+def double_q(Q, batch, alpha, gamma, mask=None, rng=None, **_):
+    """Double Q-learning: a coin flip picks the table to update, the other one evaluates."""
+    rng = np.random.default_rng() if rng is None else rng
+    upd = (rng.random(len(batch.s)) < 0.5).astype(np.intp)
+    best = masked(Q[upd, batch.ns], None if mask is None else mask[batch.ns]).argmax(axis=1)
+    boot = Q[1 - upd, batch.ns, best]
+    target = batch.r + gamma * np.where(batch.done, 0.0, boot)
+    td = target - Q[upd, batch.s, batch.a]
+    np.add.at(Q, (upd, batch.s, batch.a), alpha * td)
+    return td
+
+
+def sarsa(Q, batch, alpha, gamma, **_):
+    """On-policy SARSA: r + γ·Q[ns, na] using the action actually taken next."""
+    boot = Q[batch.ns, batch.na]
+    target = batch.r + gamma * np.where(batch.done, 0.0, boot)
+    return _apply(Q, batch.s, batch.a, target, alpha)
+
+
+def expected_sarsa(Q, batch, alpha, gamma, mask=None, epsilon=0.0, **_):
+    """Expected SARSA: r + γ·Σ π(a'|ns)·Q[ns, a'] under the ε-greedy policy."""
+    probs = policy_probs(Q, batch.ns, epsilon, mask)
+    boot = (probs * Q[batch.ns]).sum(axis=1)
+    target = batch.r + gamma * np.where(batch.done, 0.0, boot)
+    return _apply(Q, batch.s, batch.a, target, alpha)
+
+
+def n_step_targets(Q, batch, gamma, n, mask=None):
+    """n-step returns for a time-ordered trajectory batch, bootstrapped with max Q."""
+    T = len(batch.r)
+    t = np.arange(T)
+    ret = np.zeros(T)
+    disc = np.ones(T)
+    last = t.copy()
+    open_ = np.ones(T, dtype=bool)        # window still collecting rewards
+    gamma = _per_step(gamma, batch)
+    for k in range(n):
+        idx = t + k
+        use = open_ & (idx < T)
+        idx = np.minimum(idx, T - 1)
+        ret += np.where(use, disc * batch.r[idx], 0.0)
+        disc = np.where(use, disc * gamma[idx], disc)
+        last = np.where(use, idx, last)
+        open_ = use & ~batch.done[idx]
+    boot = masked(Q, mask)[batch.ns[last]].max(axis=1)
+    return ret + np.where(batch.done[last], 0.0, disc * boot)
+
+
+def n_step(Q, batch, alpha, gamma, mask=None, n=3, **_):
+    """n-step Q-learning over one trajectory (batch rows must be consecutive steps)."""
+    target = n_step_targets(Q, batch, gamma, n, mask)
+    return _apply(Q, batch.s, batch.a, target, alpha)
+
+
+# === ELIGIBILITY TRACES – WATKINS Q(λ) ===
+class Traces:
+    """Sparse replacing traces: parallel arrays holding only the active (state, action) pairs."""
+
+    def __init__(self, capacity=32, threshold=1e-3):
+        self.s = np.zeros(capacity, dtype=np.intp)
+        self.a = np.zeros(capacity, dtype=np.intp)
+        self.e = np.zeros(capacity)
+        self.n = 0                          # number of active entries
+        self.threshold = threshold          # traces below this are dropped
+
+    def clear(self):
+        """Cut all traces (exploratory action) – O(1), the arrays are reused."""
+        self.n = 0
+
+    def visit(self, s, a):
+        """Set the trace of (s, a) to 1 (replacing traces)."""
+        n = self.n
+        hit = np.flatnonzero((self.s[:n] == s) & (self.a[:n] == a))
+        if len(hit):
+            self.e[hit[0]] = 1.0
+            return
+        if n == len(self.e):
+            self.s, self.a, self.e = (np.resize(x, 2 * n) for x in (self.s, self.a, self.e))
+        self.s[n], self.a[n], self.e[n] = s, a, 1.0
+        self.n = n + 1
+
+    def decay(self, factor):
+        """Multiply every trace by factor and compact away the ones that died out."""
+        n = self.n
+        self.e[:n] *= factor
+        keep = np.flatnonzero(self.e[:n] >= self.threshold)
+        if len(keep) < n:
+            k = len(keep)
+            self.s[:k], self.a[:k], self.e[:k] = self.s[keep], self.a[keep], self.e[keep]
+            self.n = k
+
+
+def q_lambda(Q, batch, alpha, gamma, mask=None, traces=None, lam=0.8, **_):
+    """Watkins Q(λ) over a time-ordered trajectory; traces are cut on exploratory actions."""
+    traces = Traces() if traces is None else traces
+    vals = masked(Q, mask)
+    per_step = isinstance(gamma, np.ndarray)
+    td = np.zeros(len(batch.s))
+    for i in range(len(batch.s)):
+        s, a, ns = batch.s[i], batch.a[i], batch.ns[i]
+        if Q[s, a] < vals[s].max():
+            traces.clear()                  # non-greedy action: earlier steps get no credit
+        traces.visit(s, a)
+        boot = 0.0 if batch.done[i] else vals[ns].max()
+        g = gamma[i] if per_step else gamma
+        td[i] = batch.r[i] + g * boot - Q[s, a]
+        n = traces.n
+        Q[traces.s[:n], traces.a[:n]] += alpha * td[i] * traces.e[:n]
+        vals = masked(Q, mask)
+        if batch.done[i]:
+            traces.clear()
+        else:
+            traces.decay(g * lam)
+    return td
+
+
+# === RULE REGISTRY ===
+UPDATE_RULES = {
+    "q": q_learning,
+    "double_q": double_q,
+    "sarsa": sarsa,
+    "expected_sarsa": expected_sarsa,
+    "n_step": n_step,
+    "q_lambda": q_lambda,
+}
+
+
+def new_table(num_states, num_actions, rule="q", seed_values=None):
+    """Zero (or seeded) Q-table shaped for the given rule."""
+    Q = np.zeros((num_states, num_actions)) if seed_values is None else np.array(seed_values, dtype=float)
+    return np.stack([Q, Q.copy()]) if rule == "double_q" else Q
+
+
+def update(rule, Q, batch, alpha, gamma, **opts):
+    """Apply the named update rule to a batch; returns the TD errors."""
+    if rule not in UPDATE_RULES:
+        raise ValueError("Unknown update rule '{}' (choose from {})".format(rule, ", ".join(UPDATE_RULES)))
+    return UPDATE_RULES[rule](Q, batch, alpha, gamma, **opts)
+
+
+# === TABLE FILES (MEMORY-MAPPED) ===
+# Q-tables and visit counts saved as .npy can be mapped instead of loaded: processes that
+# map the same file share its pages through the OS page cache, so sweep workers do not
+# each hold a private copy of the same table.
+#   "r"   read-only (evaluation)
+#   "c"   copy-on-write – writes stay private to the process, only touched pages are copied
+#   "r+"  writes go back to the file
+TABLE_MODES = ("r", "c", "r+")
+
+
+def save_table(path, table):
+    """Write a table as .npy (the format open_table() can map)."""
+    np.save(path, np.asarray(table))
+
+
+def open_table(path, mode="r"):
+    """Memory-map a .npy table; see TABLE_MODES."""
+    if mode not in TABLE_MODES:
+        raise ValueError("Unknown table mode '{}' (choose from {})".format(mode, ", ".join(TABLE_MODES)))
+    return np.load(path, mmap_mode=mode)
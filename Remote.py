@@ -0,0 +1,330 @@
+# ==================== REMOTE TRAINING (HOST LEARNS, HUB ACTS) ====================
+# Runs the host training engine (Train.py, QLearning.py kernels) on the real robot:
+# HubServer.py on the hub only moves motors and reads sensors, this side computes states,
+# rewards and Q updates. Frames are a few bytes of binary (see HubServer.py), so a step
+# costs one motor move plus one short round trip.
+#
+# Pipelining: Train.train() sends the next action as soon as it is chosen and does the
+# Q update and logging while the hub is already moving (same order as the simulator run:
+# the next action is always chosen before the update).
+#
+# Usage:
+#   python Remote.py 2 --serial /dev/ttyACM0 --seed 7 --log run.jsonl --save-q q_exp2.json
+#   python Remote.py 3 --sim-server                       local socket stand-in (no hardware)
+#   python Remote.py 3 --serve 8765                       run the stand-in server alone
+#   python Remote.py 3 --connect localhost:8765           train against a server on a socket
+#
+# --serial needs pyserial (pip install pyserial).
+
+import argparse
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from Experiments import A, B, C, get_experiment
+from Simulator import BugSim, load_profile
+from Stats import live_printer
+from Train import make_streams, save_q, train, with_timing, write_csv
+
+MAGIC = 0xA5
+OP_PING, OP_CONFIG, OP_RESET, OP_STEP, OP_READ, OP_STOP = 0, 1, 2, 3, 4, 5
+STATUS = {0: "ok", 1: "bad action", 2: "not configured"}
+
+REQUEST = struct.Struct("<BBBb")
+REPLY = struct.Struct("<BBBBhHH3h")
+ACTION = struct.Struct("<Bhhh")
+PORT_INDEX = {A: 0, B: 1, C: 2}
+
+
+# === FRAMES ===
+def encode_request(op, seq, arg=0):
+    return REQUEST.pack(MAGIC, op, seq & 0xFF, arg)
+
+
+def encode_config(seq, exp):
+    """CONFIG frame: the experiment's motor targets, speeds and sleeps, plus distance samples."""
+    samples = exp.distance_samples if exp.uses_distance else 0
+    body = b"".join(ACTION.pack(PORT_INDEX[p], int(target), int(speed), int(sleep))
+                    for (p, target, speed), sleep in zip(exp.moves, exp.sleeps))
+    return encode_request(OP_CONFIG, seq, exp.num_actions) + bytes([samples]) + body
+
+
+def decode_reply(data):
+    """Reply frame → dict (raises ValueError on a bad frame)."""
+    magic, op, seq, status, dist, move_ms, step_ms, a, b, c = REPLY.unpack(data)
+    if magic != MAGIC:
+        raise ValueError("bad reply frame {!r}".format(data))
+    return {"op": op, "seq": seq, "status": status, "dist": dist, "move_ms": move_ms,
+            "step_ms": step_ms, "pos": {A: float(a), B: float(b), C: float(c)}}
+
+
+def encode_reply(op, seq, status, dist, move_ms, step_ms, pos):
+    return REPLY.pack(MAGIC, op, seq & 0xFF, status, int(dist), min(int(move_ms), 65535),
+                      min(int(step_ms), 65535), *(int(round(pos[p])) for p in (A, B, C)))
+
+
+# === LINKS ===
+class SocketLink:
+    """TCP link – the stand-in server, or a serial-to-TCP bridge."""
+
+    def __init__(self, host, port, timeout=30.0, sock=None):
+        self.name = "tcp:{}:{}".format(host, port)
+        self.sock = sock or socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    @classmethod
+    def wrap(cls, sock):
+        """Link over an already connected socket (e.g. one a server accepted)."""
+        host, port = sock.getpeername()[:2]
+        return cls(host, port, sock=sock)
+
+    def write(self, data):
+        self.sock.sendall(data)
+
+    def read(self, n):
+        data = b""
+        while len(data) < n:
+            chunk = self.sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("link closed")
+            data += chunk
+        return data
+
+    def close(self):
+        self.sock.close()
+
+
+class SerialLink:
+    """USB serial link to HubServer.py."""
+
+    def __init__(self, device, baud=115200, timeout=30.0):
+        try:
+            import serial
+        except ImportError:
+            raise ImportError("--serial needs pyserial: pip install pyserial")
+        self.name = "serial:{}".format(device)
+        self.port = serial.Serial(device, baud, timeout=timeout)
+
+    def write(self, data):
+        self.port.write(data)
+
+    def read(self, n):
+        data = self.port.read(n)
+        if len(data) < n:
+            raise TimeoutError("hub did not answer ({} of {} bytes)".format(len(data), n))
+        return data
+
+    def close(self):
+        self.port.close()
+
+
+# === REMOTE ROBOT (same interface as Simulator.BugSim) ===
+class RemoteBug:
+    """The real robot behind HubServer.py. step() = submit() + collect(); Train.train()
+    uses the split form to keep one step in flight."""
+
+    def __init__(self, exp, link):
+        self.exp = exp
+        self.link = link
+        self.profile = None                 # Real robot: no simulator profile in the log
+        self.faults = {}
+        self.clock_ms = 0.0
+        self.travelled = 0.0
+        self.state = 0
+        self.pos = {A: 0.0, B: 0.0, C: 0.0}
+        self.seq = 0
+        self.pending = []                   # (sequence, op) of requests not answered yet
+        self.start_dist = None
+        self._request(encode_config(self._next_seq(), exp), OP_CONFIG)
+        self._collect(OP_CONFIG)
+
+    def _next_seq(self):
+        self.seq = (self.seq + 1) & 0xFF
+        return self.seq
+
+    def _request(self, frame, op):
+        self.pending.append((frame[2], op))
+        self.link.write(frame)
+
+    def _collect(self, op):
+        seq, expected = self.pending.pop(0)
+        rep = decode_reply(self.link.read(REPLY.size))
+        if rep["seq"] != seq or rep["op"] != expected or expected != op:
+            raise ValueError("out-of-order reply: got op {} seq {}, expected op {} seq {}".format(
+                rep["op"], rep["seq"], expected, seq))
+        if rep["status"]:
+            raise ValueError("hub error: {}".format(STATUS.get(rep["status"], rep["status"])))
+        self.pos = rep["pos"]
+        self.clock_ms += rep["step_ms"]
+        return rep
+
+    def _observe(self, rep):
+        self.state = self.exp.get_state(self.pos)
+        d = rep["dist"] if self.exp.uses_distance else 0
+        if self.exp.uses_distance and self.start_dist is not None and d < 999:
+            self.travelled = self.start_dist - d
+        return d
+
+    def reset(self):
+        self._request(encode_request(OP_RESET, self._next_seq()), OP_RESET)
+        rep = self._collect(OP_RESET)
+        self.start_dist, self.travelled = None, 0.0
+        d = self._observe(rep)
+        self.start_dist = d if self.exp.uses_distance else None
+        if self.exp.start_state is not None:
+            self.state = self.exp.start_state
+        return self.state, d
+
+    def submit(self, a):
+        """Send a STEP without waiting for its reply."""
+        self._request(encode_request(OP_STEP, self._next_seq(), a), OP_STEP)
+
+    def collect(self):
+        """Reply of the oldest STEP in flight; returns (next state, distance reading, step ms)."""
+        rep = self._collect(OP_STEP)
+        d = self._observe(rep)
+        return self.state, d, rep["step_ms"]
+
+    def step(self, a):
+        self.submit(a)
+        return self.collect()
+
+    def close(self):
+        if self.pending:
+            raise ValueError("{} requests still in flight".format(len(self.pending)))
+        self._request(encode_request(OP_STOP, self._next_seq()), OP_STOP)
+        self._collect(OP_STOP)
+        self.link.close()
+
+
+# === SOCKET STAND-IN FOR THE HUB ===
+def serve_sim(exp, port, seed=0, profile=None, time_scale=0.0, latency_ms=0.0, ready=None):
+    """Answer HubServer.py frames from the simulator on a local TCP port (one client).
+
+    time_scale sleeps that fraction of each simulated step (motor time), latency_ms adds a
+    fixed delay per reply (link latency) – both only to exercise pipelining.
+    """
+    env_rng, _ = make_streams(seed)
+    sim = BugSim(exp, env_rng, profile)
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(("127.0.0.1", port))
+    server.listen(1)
+    if ready is not None:
+        ready.set()
+    conn, _ = server.accept()
+    link = SocketLink.wrap(conn)
+    try:
+        while True:
+            while link.read(1)[0] != MAGIC:
+                pass
+            _, op, seq, arg = REQUEST.unpack(bytes([MAGIC]) + link.read(3))
+            status, dist, move_ms, step_ms = 0, 0, 0.0, 0.0
+            if op == OP_CONFIG:
+                link.read(1 + arg * ACTION.size)
+            elif op == OP_RESET:
+                _, dist = sim.reset()
+            elif op == OP_STEP:
+                if not 0 <= arg < exp.num_actions:
+                    status = 1
+                else:
+                    _, dist, step_ms = sim.step(arg)
+                    move_ms = step_ms - exp.sleeps[arg]
+            elif op == OP_READ and exp.uses_distance:
+                dist = sim.read_distance()
+            if time_scale or latency_ms:
+                time.sleep((time_scale * step_ms + latency_ms) / 1000.0)
+            link.write(encode_reply(op, seq, status, dist, move_ms, step_ms, sim.pos))
+            if op == OP_STOP:
+                break
+    finally:
+        conn.close()
+        server.close()
+
+
+def start_sim_server(exp, port, **kwargs):
+    ready = threading.Event()
+    thread = threading.Thread(target=serve_sim, args=(exp, port), kwargs=dict(kwargs, ready=ready), daemon=True)
+    thread.start()
+    ready.wait()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train on the robot: hub acts (HubServer.py), host learns.")
+    parser.add_argument("experiment", help="1, 11, 2, 22, 3 or 33")
+    link = parser.add_mutually_exclusive_group(required=True)
+    link.add_argument("--serial", default=None, help="hub USB serial device (needs pyserial)")
+    link.add_argument("--connect", default=None, help="host:port of a HubServer socket bridge or stand-in")
+    link.add_argument("--sim-server", action="store_true", help="train against a local simulator stand-in")
+    link.add_argument("--serve", type=int, default=None, help="only run the simulator stand-in on this port")
+    parser.add_argument("--port", type=int, default=8765, help="stand-in port for --sim-server")
+    parser.add_argument("--time-scale", type=float, default=0.0, help="stand-in: sleep this fraction of motor time")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stand-in: extra delay per reply")
+    parser.add_argument("--no-pipeline", action="store_true", help="wait for every reply before updating")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rule", default=None)
+    parser.add_argument("--episodes", type=int, default=None)
+    parser.add_argument("--profile", default=None, help="stand-in simulator profile JSON")
+    parser.add_argument("--time-penalty", type=float, default=None)
+    parser.add_argument("--smdp", action="store_true", default=None)
+    parser.add_argument("--log", default=None)
+    parser.add_argument("--csv", default=None)
+    parser.add_argument("--save-q", default=None)
+    parser.add_argument("--live", action="store_true", help="print online learning-curve STATS per episode")
+    parser.add_argument("--abort-diverging", action="store_true", help="stop a diverging run early (with --live)")
+    args = parser.parse_args(argv)
+
+    exp = with_timing(get_experiment(args.experiment), args.time_penalty, args.smdp)
+    profile = load_profile(args.profile) if args.profile else None
+    seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+    stand_in = dict(seed=seed, profile=profile, time_scale=args.time_scale, latency_ms=args.latency_ms)
+    if args.serve is not None:
+        print("Stand-in hub for {} on port {}".format(exp.name, args.serve))
+        serve_sim(exp, args.serve, **stand_in)
+        return 0
+    if args.serial:
+        link = SerialLink(args.serial)
+    elif args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        link = SocketLink(host, int(port))
+    else:
+        start_sim_server(exp, args.port, **stand_in)
+        link = SocketLink("127.0.0.1", args.port)
+
+    print("Seed: {} | link: {} | pipeline: {}".format(seed, link.name, not args.no_pipeline))
+    robot = RemoteBug(exp, link)
+    live = live_printer(args.abort_diverging) if args.live else None
+
+    def on_episode(row):
+        print("Episode {} | Reward: {} | Cycles: {} | ε: {}".format(*row))
+        return live(row) if live else False
+
+    log = open(args.log, "w") if args.log else None
+    start = time.perf_counter()
+    try:
+        result = train(exp, seed, rule=args.rule, episodes=args.episodes, log=log, env=robot,
+                       pipeline=not args.no_pipeline,
+                       on_episode=on_episode)
+    finally:
+        if log:
+            log.close()
+    robot.close()
+    wall = time.perf_counter() - start
+    print("{} steps in {:.2f} s ({:.1f} ms per step, robot time {:.1f} s)".format(
+        result["steps"], wall, 1000.0 * wall / max(result["steps"], 1), result["sim_ms"] / 1000.0))
+    if args.csv:
+        write_csv(result["rows"], args.csv)
+        print("CSV saved as: {} (seed {})".format(args.csv, seed))
+    if args.save_q:
+        save_q(result, args.save_q)
+        print("Q-table saved as: {}".format(args.save_q))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# ==================== SIMULATED BUG ROBOT ====================
+# Host-side stand-in for the LEGO SPIKE hub: three motors (A = left legs, B = right legs,
+# C = body tilt) and the distance sensor on port F. Runs any definition from Experiments.py
+# so training, benchmarks and policy checks can run without touching the hardware.
+#
+# All randomness comes from the numpy Generator passed in – the same seed gives the same run.
+# Random numbers are drawn in blocks (RandomBlock) so fault-heavy runs stay fast.
+
+import json
+
+from Experiments import A, B, C, LOST_MM, START_MM
+
+# === SIMULATOR PROFILE ===
+# Per-robot physical behaviour. The defaults are hand-tuned guesses;
+# Calibrate.py fits a profile from logged runs of the real robot.
+DEFAULT_PROFILE = {
+    "position_noise": 2.0,     # Std of the final motor position (degrees)
+    "sensor_noise": 1.0,       # Std of a distance reading (mm)
+    "stroke_noise": 2.0,       # Std of forward displacement for a stroke (mm)
+    "displacement": {},        # "state,action" -> [mean mm, std mm] (overrides the experiment strokes)
+    "settle_ms": {},           # "action" -> [mean ms, std ms] extra time after the move completes
+    # Fault injection (all off by default)
+    "dropout_rate": 0.0,       # Chance a distance reading is lost (None/0/out of range → LOST_MM)
+    "stall_rate": 0.0,         # Chance a motor stalls part-way (ambiguous angle → STUCK state)
+    "overshoot_rate": 0.0,     # Chance a motor overshoots its target
+    "overshoot_deg": 15.0,     # Maximum overshoot (degrees)
+}
+FAULT_KEYS = ["dropout_rate", "stall_rate", "overshoot_rate"]
+
+BLOCK = 4096                   # Random numbers drawn per refill
+RESET_TOL = 5                  # Degrees off the start pose that need no reset move (hub scripts: RESET_TOL)
+
+
+def load_profile(path):
+    """Read a simulator profile JSON file (missing keys fall back to DEFAULT_PROFILE)."""
+    with open(path) as f:
+        profile = json.load(f)
+    return dict(DEFAULT_PROFILE, **profile)
+
+
+class RandomBlock:
+    """Pre-drawn blocks of standard normals and uniforms, consumed one at a time.
+
+    One vectorized draw per BLOCK samples instead of one Generator call per sample;
+    the sequence is still fully determined by the generator's seed.
+    """
+
+    def __init__(self, rng, size=BLOCK):
+        self.rng = rng
+        self.size = size
+        self._normals, self._uniforms = [], []
+        self._n = self._u = 0
+
+    def normal(self, std=1.0):
+        if self._n == len(self._normals):
+            self._normals = self.rng.standard_normal(self.size).tolist()
+            self._n = 0
+        self._n += 1
+        return std * self._normals[self._n - 1]
+
+    def uniform(self, low=0.0, high=1.0):
+        if self._u == len(self._uniforms):
+            self._uniforms = self.rng.random(self.size).tolist()
+            self._u = 0
+        self._u += 1
+        return low + (high - low) * self._uniforms[self._u - 1]
+
+
+class BugSim:
+    """Simulated robot running one experiment definition."""
+
+    def __init__(self, exp, rng, profile=None):
+        self.exp = exp
+        self.rng = rng
+        self.noise = RandomBlock(rng)
+        self.profile = dict(DEFAULT_PROFILE, **(profile or {}))
+        self.faults = {"dropouts": 0, "stalls": 0, "overshoots": 0}
+        self.pos = {A: 0.0, B: 0.0, C: 0.0}
+        self.true_dist = 0.0            # Real distance to the target (mm)
+        self.travelled = 0.0            # Forward distance covered this episode (mm)
+        self.clock_ms = 0.0             # Simulated wall-clock time
+        self.state = 0
+
+    # === SENSORS ===
+    def read_state(self):
+        """State from motor positions, same thresholds as the hub's get_state()."""
+        return self.exp.get_state(self.pos)
+
+    def read_distance(self):
+        """Filtered reading like the hub's read_dist(): median of the valid readings in the
+        window of exp.distance_samples; LOST_MM only if none is valid."""
+        valid = sorted(d for d in (self._sample() for _ in range(self.exp.distance_samples)) if d != LOST_MM)
+        return valid[len(valid) // 2] if valid else LOST_MM
+
+    def _sample(self):
+        """One raw reading with sensor noise; invalid readings become LOST_MM like safe_dist()."""
+        p = self.profile
+        if p["dropout_rate"] and self.noise.uniform() < p["dropout_rate"]:
+            self.faults["dropouts"] += 1
+            return LOST_MM
+        d = int(round(self.true_dist + self.noise.normal(p["sensor_noise"])))
+        return LOST_MM if d <= 0 or d > 1000 else d
+
+    # === MOTORS ===
+    def _move(self, port, target, speed):
+        p = self.profile
+        start = self.pos[port]
+        end = target
+        if p["stall_rate"] and self.noise.uniform() < p["stall_rate"]:
+            end = start + self.noise.uniform(0.2, 0.7) * (target - start)     # Stops part-way
+            self.faults["stalls"] += 1
+        elif p["overshoot_rate"] and self.noise.uniform() < p["overshoot_rate"]:
+            end = target + (1 if target >= start else -1) * self.noise.uniform(0.0, p["overshoot_deg"])
+            self.faults["overshoots"] += 1
+        self.pos[port] = end + self.noise.normal(p["position_noise"])
+        return 1000.0 * abs(target - start) / speed
+
+    def _displacement(self, s, a):
+        mean_std = self.profile["displacement"].get("{},{}".format(s, a))
+        if mean_std is None:
+            mean = self.exp.strokes.get((s, a), 0.0)
+            std = self.profile["stroke_noise"] if mean else 0.0
+        else:
+            mean, std = mean_std
+        return mean + (self.noise.normal(std) if std else 0.0)
+
+    def _settle(self, a):
+        mean_std = self.profile["settle_ms"].get(str(a))
+        if mean_std is None:
+            return 0.0
+        return max(0.0, mean_std[0] + self.noise.normal(mean_std[1]))
+
+    # === EPISODE INTERFACE ===
+    def reset(self):
+        """Move to the start pose like the hubs' smart reset: only motors more than RESET_TOL
+        off, concurrently (the slowest one sets the time). Returns (state, distance reading)."""
+        self.clock_ms += max([self._move(port, 0, 1000) for port in (C, A, B)
+                              if abs(self.pos[port]) > RESET_TOL] or [0.0])
+        self.travelled = 0.0
+        if self.exp.uses_distance:
+            self.true_dist = self.noise.uniform(*START_MM)
+        detected = self.read_state()
+        self.state = detected if self.exp.start_state is None else self.exp.start_state
+        return self.state, (self.read_distance() if self.exp.uses_distance else 0)
+
+    def step(self, a):
+        """Execute action a; returns (next state, distance reading, duration in ms)."""
+        port, target, speed = self.exp.moves[a]
+        duration = self._move(port, target, speed) + self._settle(a) + self.exp.sleeps[a]
+        forward = self._displacement(self.state, a)
+        self.travelled += forward
+        self.true_dist -= forward
+        self.clock_ms += duration
+        self.state = self.read_state()
+        return self.state, (self.read_distance() if self.exp.uses_distance else 0), duration
@@ -0,0 +1,167 @@
+# ==================== ONLINE LEARNING-CURVE STATISTICS ====================
+# Per-episode statistics updated in O(1) while training runs, the same way the hub
+# scripts compute them (update_stats() / print_stats() in every Experiment script):
+#
+#   mean, std        running mean and variance of the episode reward (Welford)
+#   ewma             exponentially weighted moving average (weight STATS_ALPHA on the newest)
+#   rolling          mean of the last STATS_WINDOW episodes (ring buffer + running sum)
+#   converged        the rolling mean moved less than CONVERGE_TOL for STATS_WINDOW episodes
+#   diverging        the EWMA stayed DIVERGE_DROP below its best for DIVERGE_EPISODES episodes
+#
+# Hub scripts print one line per episode:  STATS,episode,mean,std,ewma,rolling,status
+#
+# Usage (host receiver – live summaries from a hub console or a capture):
+#   python Stats.py hub_run.txt
+#   <hub console> | python Stats.py - --abort-diverging       exit 2 as soon as a run diverges
+#
+# Train.py and Remote.py print the same lines with --live.
+
+import argparse
+import math
+import re
+import sys
+
+STATS_WINDOW = 3            # Rolling window (episodes), same as Graphs.py
+STATS_ALPHA = 0.3           # EWMA weight of the newest episode
+CONVERGE_TOL = 0.1          # Converged: rolling mean steps stay within 10% (of its magnitude)
+DIVERGE_DROP = 0.5          # Diverging: EWMA more than 50% (of its best magnitude) below its best...
+DIVERGE_EPISODES = 5        # ...for this many episodes in a row
+
+LEARNING, CONVERGED, DIVERGING = "learning", "converged", "diverging"
+CSV_ROW = re.compile(r"^\s*(\d+),(-?[\d.]+),(-?\d+),([\d.]+)\s*$")      # Episode,Reward,Cycles,Epsilon
+
+
+class OnlineStats:
+    """Learning-curve statistics of a stream of episode rewards, O(1) per update."""
+
+    def __init__(self, window=STATS_WINDOW, alpha=STATS_ALPHA, tol=CONVERGE_TOL,
+                 drop=DIVERGE_DROP, patience=DIVERGE_EPISODES):
+        self.window = window
+        self.alpha = alpha
+        self.tol = tol
+        self.drop = drop
+        self.patience = patience
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma = 0.0
+        self.best = None                    # Best EWMA so far
+        self.ring = [0.0] * window
+        self.total = 0.0                    # Sum of the rewards in the ring
+        self.rolling = None
+        self.stable = 0                     # Episodes in a row the rolling mean barely moved
+        self.falling = 0                    # Episodes in a row the EWMA sat far below its best
+        self.status = LEARNING
+
+    def update(self, reward):
+        """Add one episode reward; returns the status (learning / converged / diverging)."""
+        self.n += 1
+        n = self.n
+        delta = reward - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (reward - self.mean)
+        self.ewma = reward if n == 1 else self.ewma + self.alpha * (reward - self.ewma)
+        i = (n - 1) % self.window
+        self.total += reward - self.ring[i]
+        self.ring[i] = reward
+        prev = self.rolling
+        self.rolling = self.total / min(n, self.window)
+        band = self.tol * max(abs(self.rolling), 1.0)
+        settled = n > self.window and abs(self.rolling - prev) <= band
+        self.stable = self.stable + 1 if settled else 0
+        if self.best is None or self.ewma > self.best:
+            self.best = self.ewma
+        below = self.ewma < self.best - self.drop * max(abs(self.best), 1.0)
+        self.falling = self.falling + 1 if below else 0
+        if self.falling >= self.patience:
+            self.status = DIVERGING
+        elif self.stable >= self.window:
+            self.status = CONVERGED
+        else:
+            self.status = LEARNING
+        return self.status
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def summary(self):
+        return {"episodes": self.n, "mean": self.mean, "std": self.std, "ewma": self.ewma,
+                "rolling": self.rolling, "status": self.status}
+
+    def line(self, episode):
+        """Same STATS line the hub scripts print."""
+        return "STATS,{},{:.2f},{:.2f},{:.2f},{:.2f},{}".format(
+            episode, self.mean, self.std, self.ewma, self.rolling, self.status)
+
+
+def live_printer(abort_diverging=False, out=sys.stdout):
+    """Train.train() on_episode callback: prints a STATS line, returns True to stop a diverging run."""
+    stats = OnlineStats()
+
+    def on_episode(row):
+        status = stats.update(row[1])
+        out.write(stats.line(row[0]) + "\n")
+        out.flush()
+        return abort_diverging and status == DIVERGING
+
+    on_episode.stats = stats
+    return on_episode
+
+
+def parse_stats_line(line):
+    """(episode, mean, std, ewma, rolling, status) from a hub STATS line, or None."""
+    parts = line.strip().split(",")
+    if len(parts) != 7 or parts[0] != "STATS":
+        return None
+    return (int(parts[1]), float(parts[2]), float(parts[3]), float(parts[4]), float(parts[5]), parts[6])
+
+
+def follow(lines, abort_diverging=False, out=sys.stdout):
+    """Echo hub STATS lines as they arrive; CSV rows from hubs without them are summarized here.
+
+    Each episode counts once: the CSV table a hub prints after its STATS lines repeats
+    episodes already seen and is skipped. Returns the last status (stops early on a
+    diverging run when abort_diverging is set).
+    """
+    stats = OnlineStats()
+    status = LEARNING
+    last_episode = 0
+    for line in lines:
+        parsed = parse_stats_line(line)
+        if parsed:
+            if parsed[0] <= last_episode:
+                continue
+            last_episode = parsed[0]
+            status = parsed[5]
+            out.write(line.strip() + "\n")
+        else:
+            match = CSV_ROW.match(line)
+            if not match or int(match.group(1)) <= last_episode:
+                continue                # Repeated rows (the CSV table after the STATS lines)
+            last_episode = int(match.group(1))
+            status = stats.update(float(match.group(2)))
+            out.write(stats.line(last_episode) + "\n")
+        out.flush()
+        if abort_diverging and status == DIVERGING:
+            out.write("DIVERGING – aborting\n")
+            break
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live learning-curve statistics from a hub console.")
+    parser.add_argument("console", help="console capture, or - to read the live console from stdin")
+    parser.add_argument("--abort-diverging", action="store_true", help="exit 2 as soon as the run diverges")
+    args = parser.parse_args(argv)
+
+    if args.console == "-":
+        status = follow(sys.stdin, args.abort_diverging)
+    else:
+        with open(args.console) as f:
+            status = follow(f, args.abort_diverging)
+    return 2 if args.abort_diverging and status == DIVERGING else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+# ==================== HOST TRAINING ENGINE (SIMULATED ROBOT) ====================
+# Trains any experiment from Experiments.py against Simulator.py using the update
+# kernels in QLearning.py, with explicit, seeded random streams:
+#
+#   seed ──► worker stream (one per parallel worker) ──► env stream   (simulator noise)
+#                                                    └─► agent stream (ε-greedy choices)
+#
+# Because the simulator only draws from the env stream, a logged run can be replayed
+# step by step: same seed + same logged actions = same states, readings and rewards.
+#
+# Usage:
+#   python Train.py 3 --seed 7 --log exp3_seed7.jsonl      train and log every step
+#   python Train.py 3 --seed 7 --workers 4                 4 independent runs in parallel
+#   python Train.py --replay exp3_seed7.jsonl              re-execute a logged run
+#   python Train.py 2 --seed 7 --save-q q_exp2.json         keep the learned Q-table (Evaluate.py input)
+#   python Train.py 3 --time-penalty 5 --smdp               reward progress per second, not per step
+#   python Train.py 3 --workers 8 --q-file q_seed.npy       workers share one mapped start table
+#   python Train.py 2 --live --abort-diverging             STATS line per episode, stop if diverging
+#   python Train.py 2 --q-deltas q_deltas.jsonl            sparse per-episode Q changes (QDelta.py)
+
+import argparse
+import copy
+import json
+import sys
+
+import numpy as np
+
+from Experiments import get_experiment
+from QLearning import Traces, action_mask, make_batch, new_table, open_table, save_table, smdp_discount, update
+from QDelta import QDeltaTracker
+from Simulator import BugSim, load_profile
+from Stats import live_printer
+
+EPISODIC_RULES = ["n_step"]     # Applied once per episode to the whole trajectory
+ON_POLICY_RULES = ["sarsa"]     # Bootstrap from the next action, so it is chosen before the update
+
+
+# === RANDOM STREAMS ===
+def make_streams(seed, worker=0):
+    """Independent (env, agent) generators for one worker of a seeded run."""
+    env, agent = np.random.SeedSequence(seed, spawn_key=(worker,)).spawn(2)
+    return np.random.default_rng(env), np.random.default_rng(agent)
+
+
+# === ACTION SELECTION (mirrors the hub scripts) ===
+def choose_action(exp, Q, mask, s, epsilon, rng, episode, last_action=-1):
+    """ε-greedy over allowed actions, plus the experiment's forced-action and anti-repeat rules."""
+    forced = exp.forced_action(episode, s) if exp.forced_action else None
+    if forced is not None:
+        return forced
+    values = Q.sum(axis=0)[s] if Q.ndim == 3 else Q[s]
+    allowed = np.flatnonzero(mask[s])
+    if rng.random() < epsilon:
+        a = int(rng.choice(allowed))
+    else:
+        best = values[allowed].max()
+        ties = allowed[values[allowed] == best]
+        a = int(rng.choice(ties)) if exp.random_ties else int(ties[0])
+    if exp.avoid_repeat and a == last_action and rng.random() < exp.avoid_repeat:
+        alt = (a + 2) % exp.num_actions
+        if mask[s][alt]:
+            a = alt
+    return a
+
+
+# === TIME-AWARE REWARD (TIME_PENALTY / SMDP_DISCOUNT in the hub scripts) ===
+def with_timing(exp, time_penalty=None, smdp=None):
+    """Copy of exp with the time-aware reward options overridden (None keeps the default)."""
+    exp = copy.copy(exp)
+    if time_penalty is not None:
+        exp.time_penalty = time_penalty
+    if smdp is not None:
+        exp.smdp = smdp
+    return exp
+
+
+def step_reward(exp, s, a, ns, old_d, new_d, ms):
+    """exp.reward minus the time penalty for a step that took ms of robot time."""
+    r, cycle, goal = exp.reward(s, a, ns, old_d, new_d)
+    if exp.time_penalty:
+        r -= exp.time_penalty * ms / 1000.0
+    return r, cycle, goal
+
+
+def step_gamma(exp, ms):
+    return float(smdp_discount(exp.gamma, ms, exp.step_ms)) if exp.smdp else exp.gamma
+
+
+# === TRAINING ===
+def train(exp, seed, worker=0, rule=None, episodes=None, profile=None, Q=None, log=None, on_episode=None,
+          env=None, pipeline=True, track_deltas=False):
+    """Train one run in simulation. Returns a result dict with episode rows and the final Q-table.
+
+    log: optional open text file; receives one JSON record per run, step and episode.
+    on_episode: optional callback(row) called after every episode (for live tools); returning True
+                stops training (Stats.live_printer() does so for a diverging run).
+    env: robot to train on instead of the simulator (Remote.RemoteBug). If it has submit()/collect()
+         and pipeline is on, the next action is sent before the Q update so the robot moves meanwhile.
+         Otherwise the next action is chosen after the update, as the hub scripts do (SARSA rules
+         always choose it first, their target needs it).
+    Q: start table, updated in place (may be a copy-on-write mapping from open_table()).
+    track_deltas: record changed cells and greedy flips per episode (result["deltas"], a QDeltaTracker).
+    """
+    rule = rule or exp.rule
+    episodes = episodes or exp.episodes
+    env_rng, agent_rng = make_streams(seed, worker)
+    sim = BugSim(exp, env_rng, profile) if env is None else env
+    pipeline = pipeline and hasattr(sim, "submit")
+    mask = action_mask(exp.mask)
+    shape = new_table(exp.num_states, exp.num_actions, rule).shape
+    if Q is None:
+        Q = new_table(exp.num_states, exp.num_actions, rule, exp.seed_q)
+    elif Q.shape != shape:
+        raise ValueError("Start Q-table has shape {}, rule '{}' on {} needs {}".format(Q.shape, rule, exp.name, shape))
+    visits = np.zeros((exp.num_states, exp.num_actions), dtype=np.int32)
+    deltas = QDeltaTracker(Q, mask) if track_deltas else None
+    traces = Traces()
+    epsilon = exp.epsilon
+    rows = []
+    total_steps = 0
+    if log:
+        log.write(json.dumps({"type": "run", "experiment": exp.key, "seed": seed, "worker": worker,
+                              "rule": rule, "episodes": episodes, "profile": sim.profile,
+                              "time_penalty": exp.time_penalty, "smdp": exp.smdp}) + "\n")
+
+    for ep in range(1, episodes + 1):
+        s, d = sim.reset()
+        traces.clear()
+        total, cycles, steps = 0.0, 0, 0
+        trajectory, discounts = [], []
+        a = choose_action(exp, Q, mask, s, epsilon, agent_rng, ep)
+        in_flight = False
+        for t in range(1, exp.max_steps + 1):
+            ns, new_d, ms = sim.collect() if in_flight else sim.step(a)
+            r, cycle, goal = step_reward(exp, s, a, ns, d, new_d, ms)
+            discounts.append(step_gamma(exp, ms))
+            visits[s, a] += 1
+            in_flight = pipeline and not goal and t < exp.max_steps
+            na = None
+            if in_flight or rule in ON_POLICY_RULES:
+                na = choose_action(exp, Q, mask, ns, epsilon, agent_rng, ep, a)
+            if in_flight:
+                sim.submit(na)              # Robot starts the next move while Q is updated
+            if rule not in EPISODIC_RULES:
+                step = (s, a, r, ns, goal) if na is None else (s, a, r, ns, goal, na)
+                update(rule, Q, make_batch([step]), exp.alpha, discounts[-1], mask=mask,
+                       epsilon=epsilon, rng=agent_rng, traces=traces, lam=exp.lam)
+                if exp.after_update:
+                    exp.after_update(Q if Q.ndim == 2 else Q[0], s)
+            if na is None:
+                na = choose_action(exp, Q, mask, ns, epsilon, agent_rng, ep, a)    # Hub order: from the updated Q
+            trajectory.append((s, a, r, ns, goal, na))
+            if log:
+                log.write(json.dumps({"type": "step", "ep": ep, "t": t, "s": int(s), "a": int(a),
+                                      "r": float(r), "ns": int(ns), "d": int(new_d), "ms": round(ms, 1)}) + "\n")
+            total += r
+            cycles += cycle
+            steps = t
+            if goal:
+                break
+            s, d, a = ns, new_d, na
+        if rule in EPISODIC_RULES:
+            update(rule, Q, make_batch(trajectory), exp.alpha, np.array(discounts), mask=mask)
+        total_steps += steps
+        if deltas is not None:
+            deltas.record(ep, Q)
+
+        row = (ep, round(total, 2), steps if exp.uses_distance else cycles, round(epsilon, 5))
+        rows.append(row)
+        if log:
+            log.write(json.dumps({"type": "episode", "ep": ep, "reward": row[1], "cycles": row[2],
+                                  "epsilon": row[3], "travelled": round(sim.travelled, 1)}) + "\n")
+        if on_episode and on_episode(row):
+            break
+        epsilon = max(exp.epsilon_min, epsilon * exp.epsilon_decay)
+
+    return {"experiment": exp.key, "seed": seed, "worker": worker, "rule": rule,
+            "rows": rows, "steps": total_steps, "sim_ms": sim.clock_ms, "faults": sim.faults, "Q": Q, "visits": visits, "deltas": deltas}
+
+
+def _train_worker(args):
+    key, seed, worker, rule, episodes, profile, time_penalty, smdp, q_file, track_deltas = args
+    Q = open_table(q_file, "c") if q_file else None
+    return train(with_timing(get_experiment(key), time_penalty, smdp), seed, worker, rule, episodes, profile, Q,
+                 track_deltas=track_deltas)
+
+
+def train_parallel(key, seed, workers, rule=None, episodes=None, profile=None, time_penalty=None, smdp=None,
+                   q_file=None, track_deltas=False):
+    """Run independent seeded workers (one stream each) across processes.
+
+    q_file: .npy start table, mapped copy-on-write by every worker instead of pickled to each.
+    track_deltas: record the Q-delta log of worker 0 (the run --csv and --save-q report).
+    """
+    jobs = [(key, seed, w, rule, episodes, profile, time_penalty, smdp, q_file, track_deltas and w == 0)
+            for w in range(workers)]
+    from multiprocessing import Pool     # Only parallel runs pay for the import
+
+    with Pool(min(workers, 8)) as pool:
+        return pool.map(_train_worker, jobs)
+
+
+# === REPLAY ===
+def read_log(path):
+    """Split a JSON-lines run log into (run header, step records)."""
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    header = records[0]
+    if header.get("type") != "run":
+        raise ValueError("{} does not start with a run header".format(path))
+    return header, [r for r in records if r["type"] == "step"]
+
+
+def replay(path, verbose=False):
+    """Re-execute a logged run's actions against the simulator; returns mismatching steps."""
+    header, steps = read_log(path)
+    exp = with_timing(get_experiment(header["experiment"]), header.get("time_penalty"), header.get("smdp"))
+    env_rng, _ = make_streams(header["seed"], header["worker"])
+    sim = BugSim(exp, env_rng, header["profile"])
+    mismatches = []
+    episode = 0
+    s = d = None
+    for rec in steps:
+        if rec["ep"] != episode:
+            episode = rec["ep"]
+            s, d = sim.reset()
+        ns, new_d, ms = sim.step(rec["a"])
+        r = step_reward(exp, s, rec["a"], ns, d, new_d, ms)[0]
+        if ns != rec["ns"] or new_d != rec["d"] or abs(r - rec["r"]) > 1e-9:
+            mismatches.append((rec["ep"], rec["t"], {"ns": ns, "d": new_d, "r": r}, rec))
+        elif verbose:
+            print("ep {ep:3d} t {t:3d} | s {s} a {a} → {ns} | r {r:+.2f}".format(**rec))
+        s, d = ns, new_d
+    return mismatches
+
+
+def write_csv(rows, path):
+    """Same CSV layout the hub scripts print (Graphs.py input)."""
+    with open(path, "w") as f:
+        f.write("Episode,Reward,Cycles,Epsilon\n")
+        for row in rows:
+            f.write("{},{},{},{}\n".format(*row))
+
+
+def save_q(result, path):
+    """Learned Q-table as JSON tagged with the run it came from, or as .npy (+ .visits.npy) to map later."""
+    if path.endswith(".npy"):
+        save_table(path, result["Q"])
+        save_table(path[:-4] + ".visits.npy", result["visits"])
+        return
+    with open(path, "w") as f:
+        json.dump({"experiment": result["experiment"], "seed": result["seed"], "worker": result["worker"],
+                   "rule": result["rule"], "Q": np.round(result["Q"], 6).tolist()}, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train an experiment in the simulator.")
+    parser.add_argument("experiment", nargs="?", help="1, 11, 2, 22, 3 or 33")
+    parser.add_argument("--seed", type=int, default=None, help="run seed (random if omitted; always printed)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rule", default=None, help="update rule (default: the experiment's)")
+    parser.add_argument("--episodes", type=int, default=None)
+    parser.add_argument("--profile", default=None, help="simulator profile JSON (from Calibrate.py)")
+    parser.add_argument("--time-penalty", type=float, default=None, help="reward lost per second of step time")
+    parser.add_argument("--smdp", action="store_true", default=None, help="discount by step duration (γ per step_ms)")
+    parser.add_argument("--log", default=None, help="write a JSON-lines step log (single worker)")
+    parser.add_argument("--csv", default=None, help="write the episode CSV")
+    parser.add_argument("--save-q", default=None, help="write the learned Q-table (first worker) as JSON or .npy")
+    parser.add_argument("--q-file", default=None, help="start from this .npy Q-table (mapped copy-on-write)")
+    parser.add_argument("--q-deltas", default=None, help="write changed Q cells and greedy flips per episode")
+    parser.add_argument("--live", action="store_true", help="print online learning-curve STATS per episode")
+    parser.add_argument("--abort-diverging", action="store_true", help="stop a diverging run early (with --live)")
+    parser.add_argument("--replay", default=None, help="replay a step log against the simulator")
+    parser.add_argument("--verbose", action="store_true", help="print every replayed step")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        mismatches = replay(args.replay, args.verbose)
+        for ep, t, got, rec in mismatches[:10]:
+            print("MISMATCH ep {} t {}: replay {} vs log {}".format(ep, t, got, rec))
+        print("Replay {}: {} mismatching steps".format(args.replay, len(mismatches)))
+        return 1 if mismatches else 0
+    if not args.experiment:
+        parser.error("experiment is required unless --replay is given")
+    if args.workers > 1:
+        single = [flag for flag, on in (("--log", args.log), ("--live", args.live),
+                                        ("--abort-diverging", args.abort_diverging)) if on]
+        if single:
+            parser.error("{} only supported with a single worker (drop --workers)".format(", ".join(single)))
+
+    seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+    profile = load_profile(args.profile) if args.profile else None
+    print("Seed: {}".format(seed))
+    if args.workers > 1:
+        results = train_parallel(args.experiment, seed, args.workers, args.rule, args.episodes, profile,
+                                 args.time_penalty, args.smdp, args.q_file, bool(args.q_deltas))
+    else:
+        log = open(args.log, "w") if args.log else None
+        try:
+            exp = with_timing(get_experiment(args.experiment), args.time_penalty, args.smdp)
+            Q = open_table(args.q_file, "c") if args.q_file else None
+            live = live_printer(args.abort_diverging) if args.live else None
+            results = [train(exp, seed, 0, args.rule, args.episodes, profile, Q, log=log, on_episode=live,
+                             track_deltas=bool(args.q_deltas))]
+        finally:
+            if log:
+                log.close()
+    for res in results:
+        final = res["rows"][-1]
+        print("worker {} | episodes {} | final reward {} | steps {}".format(
+            res["worker"], len(res["rows"]), final[1], res["steps"]))
+    if args.csv:
+        write_csv(results[0]["rows"], args.csv)
+        print("CSV saved as: {} (seed {})".format(args.csv, seed))
+    if args.q_deltas:
+        results[0]["deltas"].save(args.q_deltas)
+        print("Q deltas saved as: {}".format(args.q_deltas))
+    if args.save_q:
+        save_q(results[0], args.save_q)
+        print("Q-table saved as: {}".format(args.save_q))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())